@@ -0,0 +1,54 @@
+import os
+import time
+import argparse
+from src.config.config_loading import ConfigLoader
+from src.info_tracking.info_tracking import InfoTracker
+from src.pipeline.stage_graph import StageGraph
+from src.pipeline.hft_stages import HftStages
+from src.pipeline.artifact_store import ArtifactStore
+
+
+def current_keys(config: ConfigLoader) -> dict:
+    """ The artifact store keys of the stages under the current configurations, by key. """
+    graph = StageGraph(config=config, info_tracker=InfoTracker(), stages=HftStages.create())
+    return {key: name for name, key in graph.stage_keys().items()}
+
+
+def print_entries(entries: list, keys: dict) -> None:
+    print(f"{'key':<14}{'stage':<14}{'size MB':>10}  {'created':<18}{'last used':<18}current")
+    for entry in entries:
+        created = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry["created"]))
+        last_access = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry["last_access"]))
+        print(f"{entry['key'][:12]:<14}{entry['stage']:<14}{entry['size'] / 1024 ** 2:>10.1f}  "
+              f"{created:<18}{last_access:<18}{'yes' if entry['key'] in keys else ''}")
+    print(f"{len(entries)} entries, {sum(entry['size'] for entry in entries) / 1024 ** 2:.1f} MB")
+
+
+if __name__ == "__main__":
+    CONFIG_PATH = os.path.join("src", "config", "config.yaml")
+
+    parser = argparse.ArgumentParser(description="Inspect and clean up the artifact store of the pipeline stages.")
+    parser.add_argument("--config", default=CONFIG_PATH, help="Path of the configuration file.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    inspect = commands.add_parser("inspect", help="List the stored entries, most recently used first.")
+    inspect.add_argument("--stage", help="List the entries of this stage only.")
+
+    gc = commands.add_parser("gc", help="Remove the entries of other configurations that were not used recently. "
+                                        "Run it while no pipeline is writing to the store.")
+    gc.add_argument("--keep-days", type=float, help="Keep the entries used within these days. "
+                                                    "Defaults to the configured days.")
+    gc.add_argument("--dry-run", action="store_true", help="List the entries to remove without removing them.")
+    args = parser.parse_args()
+
+    config = ConfigLoader(args.config)
+    store = ArtifactStore(config=config)
+    keys = current_keys(config=config)
+
+    if args.command == "inspect":
+        entries = [entry for entry in store.entries() if args.stage is None or entry["stage"] == args.stage]
+        print_entries(entries=entries, keys=keys)
+    else:
+        removed = store.collect_garbage(keep_keys=set(keys), keep_days=args.keep_days, dry_run=args.dry_run)
+        print_entries(entries=removed, keys=keys)
+        print("Would remove the entries above." if args.dry_run else "Removed the entries above.")
@@ -0,0 +1,23 @@
+import os
+import argparse
+from src.config.config_loading import ConfigLoader
+from src.benchmarking.pipeline_benchmark import PipelineBenchmark
+
+
+if __name__ == "__main__":
+    CONFIG_PATH = os.path.join("src", "config", "config.yaml")
+
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline stages on synthetic OHLC data.")
+    parser.add_argument("--config", default=CONFIG_PATH, help="Path of the configuration file.")
+    parser.add_argument("--sizes", type=int, nargs="+", help="Rows to benchmark. Defaults to the configured sizes.")
+    parser.add_argument("--update-baseline", action="store_true", help="Store the results as the new baseline.")
+    args = parser.parse_args()
+
+    benchmark = PipelineBenchmark(
+        config=ConfigLoader(args.config),
+        sizes=args.sizes,
+        update_baseline=args.update_baseline
+    )
+    # Fail the run if any stage regressed against the baseline.
+    if benchmark.regressions:
+        raise SystemExit(1)
@@ -1,20 +1,64 @@
+import os
+import argparse
 from src.config.config_loading import ConfigLoader
-from src.data_loading.data_loading import DataLoader
+from src.info_tracking.info_tracking import InfoTracker
+from src.pipeline.stage_graph import StageGraph
+from src.pipeline.hft_stages import HftStages
 
 
 class RunHFTproject:
-    def __init__(self, config_path):
+    """
+    Run the HFT project as a lazy graph of stages.
+    Only the target stages and the stages they depend on run. The outputs of completed stages are stored,
+    so a rerun, e.g. after a crash or a change in the tuning configurations, resumes from the first stage
+    whose inputs changed. A run can also resume from a named stage, or rerun a named stage and the stages after it.
+    """
+
+    def __init__(self,
+                 config_path: str,
+                 targets: list = ("exploration", "tuning"),
+                 skip: list = (),
+                 resume_from: str = None,
+                 rerun_from: str = None):
         config = ConfigLoader(config_path)
-        self.run = DataLoader(config=config)\
-            .data_engineering()\
-            .data_exploration()\
-            .label_creation()\
-            .split_data_in_train_test()\
-            .scale_data()\
-            .reshape_data_for_modelling()\
-            .build_model_n_tuner()
+        info_tracker = InfoTracker()
+
+        self.run = StageGraph(
+            config=config,
+            info_tracker=info_tracker,
+            stages=HftStages.create(),
+            resume_from=resume_from,
+            rerun_from=rerun_from
+        )
+        self.run.run(targets=targets, skip=skip)
+
+        # Export the timing and memory report of every stage.
+        info_tracker.export_run_report(
+            path=os.path.join(config.paths.path2save_models, config.model.name)
+        )
 
 
 if __name__ == "__main__":
-    CONFIG_PATH = "src\\config\\config.yaml"
-    run = RunHFTproject(config_path=CONFIG_PATH)
+    CONFIG_PATH = os.path.join("src", "config", "config.yaml")
+    STAGES = [stage.name for stage in HftStages.create()]
+
+    parser = argparse.ArgumentParser(description="Run the HFT project pipeline.")
+    parser.add_argument("--config", default=CONFIG_PATH, help="Path of the configuration file.")
+    parser.add_argument("--run", nargs="+", default=["exploration", "tuning"], choices=STAGES,
+                        help="Stages to run, together with the stages they depend on.")
+    parser.add_argument("--skip", nargs="+", default=[], choices=STAGES,
+                        help="Stages to leave out, e.g. exploration.")
+    parser.add_argument("--resume-from", choices=STAGES,
+                        help="Load the stored outputs of the stages before this one instead of running them, "
+                             "the latest ones if none are stored under the current configurations.")
+    parser.add_argument("--rerun-from", choices=STAGES,
+                        help="Run this stage and every stage after it, even if their outputs are stored.")
+    args = parser.parse_args()
+
+    run = RunHFTproject(
+        config_path=args.config,
+        targets=args.run,
+        skip=args.skip,
+        resume_from=args.resume_from,
+        rerun_from=args.rerun_from
+    )
@@ -0,0 +1,24 @@
+import os
+import argparse
+from src.config.config_loading import ConfigLoader
+from src.pipeline.hft_stages import HftStages
+from src.pipeline.multi_instrument import MultiInstrumentRunner
+
+
+if __name__ == "__main__":
+    CONFIG_PATH = os.path.join("src", "config", "config.yaml")
+    STAGES = [stage.name for stage in HftStages.create()]
+
+    parser = argparse.ArgumentParser(description="Run the pipeline for many instruments in parallel.")
+    parser.add_argument("--config", default=CONFIG_PATH, help="Path of the configuration file.")
+    parser.add_argument("--sources", nargs="+", metavar="SYMBOL=LINK",
+                        help="Instruments to run. Defaults to the configured sources.")
+    parser.add_argument("--run", nargs="+", choices=STAGES,
+                        help="Stages to run for every instrument. Defaults to the configured targets.")
+    args = parser.parse_args()
+
+    sources = dict(source.split("=", 1) for source in args.sources) if args.sources else None
+    runner = MultiInstrumentRunner(config=ConfigLoader(args.config), sources=sources, targets=args.run)
+    # Fail the run if any instrument failed.
+    if runner.failures:
+        raise SystemExit(1)
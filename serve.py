@@ -0,0 +1,16 @@
+import os
+import asyncio
+import argparse
+from src.config.config_loading import ConfigLoader
+from src.inference.inference_server import InferenceServer
+
+
+if __name__ == "__main__":
+    CONFIG_PATH = os.path.join("src", "config", "config.yaml")
+
+    parser = argparse.ArgumentParser(description="Serve online predictions of the best BiLSTM model.")
+    parser.add_argument("--config", default=CONFIG_PATH, help="Path of the configuration file.")
+    args = parser.parse_args()
+
+    server = InferenceServer(config=ConfigLoader(args.config))
+    asyncio.run(server.serve())
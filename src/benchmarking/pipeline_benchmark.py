@@ -0,0 +1,220 @@
+import os
+import copy
+import json
+import tempfile
+import numpy as np
+import pandas as pd
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from ..config.config_loading import ConfigLoader
+from ..info_tracking.info_tracking import InfoTracker
+from ..benchmarking.synthetic_data import SyntheticOhlcGenerator
+from ..data_preprocessing.s1_data_engineering import DataEngineer
+from ..data_preprocessing.s3_labels_creation import LabelCreator
+from ..data_preprocessing.s4_data_splitting import TrainTestSplitter
+from ..data_preprocessing.s5_data_scaling import DataScaler
+
+
+def verify_precision(config: ConfigLoader,
+                     engineered_data: pd.DataFrame,
+                     labeller: LabelCreator,
+                     scaler: DataScaler) -> None:
+    """
+    Check the labels and the scaled data of the pipeline against the float64 path. The labels must be equal,
+    and the scaled data must match within the precision tolerance.
+    """
+    features_dtype = config.precision.features
+    if features_dtype == "float64":
+        return
+
+    config = copy.deepcopy(config)
+    config.precision.features = "float64"
+    labeller64 = LabelCreator(data=engineered_data, config=config, info_tracker=InfoTracker())
+
+    if not (labeller64.data.index.equals(labeller.data.index)
+            and np.array_equal(labeller64.data[config.df_features.labels], labeller.data[config.df_features.labels])
+            and np.array_equal(labeller64.horizon_labels.to_numpy(), labeller.horizon_labels.to_numpy())):
+        raise ValueError("The labels differ from the labels of the float64 path.")
+
+    scaler64 = labeller64.split_data_in_train_test().scale_data()
+    max_error = 0.0
+    for scaled, scaled64 in ((scaler.scaled_train_data, scaler64.scaled_train_data),
+                             (scaler.scaled_test_data, scaler64.scaled_test_data)):
+        reference = scaled64.to_numpy(dtype=np.float64)
+        error = np.abs(scaled.to_numpy(dtype=np.float64) - reference) / (1 + np.abs(reference))
+        max_error = max(max_error, float(np.nanmax(error, initial=0.0)))
+
+    if max_error > config.precision.tolerance:
+        raise ValueError(f"The {features_dtype} scaled data differs from the float64 path by {max_error:.2e}, "
+                         f"more than the tolerance.")
+    print(f"The labels match the float64 path and the scaled data matches it within a relative difference "
+          f"of {max_error:.2e}")
+
+
+def verify_walk_forward(config: ConfigLoader, labelled_data: pd.DataFrame) -> None:
+    """
+    Check that the last walk-forward fold scales its test rows as the "DataScaler" scales the test data of
+    the same split. The quantile sketch of the robust method is approximate, so it is not checked.
+    """
+    if config.scaling_method.method == "robust":
+        print("The walk-forward check is skipped, as the robust method scales the folds with approximate quantiles.")
+        return
+
+    config = copy.deepcopy(config)
+    config.data_splitting.mode = "walk_forward"
+    splitter = TrainTestSplitter(data=labelled_data, config=config, info_tracker=InfoTracker())
+    max_error = splitter.walk_forward().verify_last_fold(scaled_test_data=splitter.scale_data().scaled_test_data)
+    print(f"The last walk-forward fold matches the scaled test data within a relative difference of {max_error:.2e}")
+
+
+def run_pipeline_on_synthetic_data(config: ConfigLoader, n_rows: int) -> list:
+    """
+    Run the stages from "DataEngineer" up to "LstmReshaper" on n_rows of synthetic data and
+    return the stage reports of the info tracker. Every artifact is written to a temporary directory.
+    If verify is set, the results are checked after the stages, outside their reports.
+    """
+    bparams = config.benchmark
+    data = SyntheticOhlcGenerator(
+        config=config,
+        seed=bparams.seed,
+        nan_fraction=bparams.nan_fraction,
+        duplicate_fraction=bparams.duplicate_fraction,
+        unsorted_fraction=bparams.unsorted_fraction
+    ).generate(n_rows=n_rows)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        config = copy.deepcopy(config)
+        config.paths.path2save_data = os.path.join(temp_dir, "data")
+        config.paths.path2save_exploration = os.path.join(temp_dir, "exploration")
+        config.paths.path2save_models = os.path.join(temp_dir, "models")
+
+        info_tracker = InfoTracker()
+        engineer = DataEngineer(data=data, config=config, info_tracker=info_tracker)
+        # The raw data is not needed anymore. The engineered data is kept for the checks only.
+        del data
+        engineered_data = engineer.data if bparams.verify else None
+
+        if bparams.skip_exploration:
+            labeller = LabelCreator(data=engineer.data, config=config, info_tracker=info_tracker)
+        else:
+            labeller = engineer.data_exploration().label_creation()
+        del engineer
+
+        scaler = labeller.split_data_in_train_test().scale_data()
+        scaler.reshape_data_for_modelling()
+
+        if bparams.verify:
+            verify_precision(config=config, engineered_data=engineered_data, labeller=labeller, scaler=scaler)
+            verify_walk_forward(config=config, labelled_data=labeller.data)
+
+    return info_tracker.stage_reports
+
+
+class PipelineBenchmark:
+    """
+    Benchmark the throughput and the peak memory of the pipeline stages on synthetic data of several sizes.
+    Every size runs in a fresh process, so the peak memory of one size does not hide the peak of the next.
+    The results are saved and compared against a stored baseline.
+    """
+
+    def __init__(self, config: ConfigLoader, sizes: list = None, update_baseline: bool = False):
+        self.__config = config
+        self.__sizes = sizes or config.benchmark.sizes
+        self.__results: dict = {}
+        self.__regressions: list = []
+
+        self.__run_sizes()
+        self.__compare_with_baseline()
+        self.__save_results(update_baseline=update_baseline)
+
+    @property
+    def config(self):
+        return self.__config
+
+    @property
+    def results(self):
+        return self.__results
+
+    @property
+    def regressions(self):
+        return self.__regressions
+
+    @staticmethod
+    def __summarise_stage(report: dict) -> dict:
+        """ Keep the benchmark figures of a stage report. """
+        wall_time = report["wall_time_s"]
+        return {
+            "input_rows": report["input_rows"],
+            "wall_time_s": wall_time,
+            "cpu_time_s": report["cpu_time_s"],
+            "rows_per_s": report["input_rows"] / wall_time if wall_time > 0 else None,
+            "peak_rss_bytes": report["peak_rss_bytes"],
+            "peak_rss_increase_bytes": report["peak_rss_increase_bytes"]
+        }
+
+    def __run_sizes(self) -> None:
+        """ Run the pipeline once per size, each time in a fresh process. """
+        context = mp.get_context("spawn")
+
+        for n_rows in self.__sizes:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                reports = executor.submit(run_pipeline_on_synthetic_data, self.config, n_rows).result()
+
+            self.__results[str(n_rows)] = {
+                report["stage"]: self.__summarise_stage(report=report)
+                for report in reports
+            }
+
+    def __compare_with_baseline(self) -> None:
+        """
+        Compare the throughput and the peak memory of every stage with the baseline and print the results.
+        A stage regresses if its throughput drops by more than the tolerance, or if the peak RSS increase
+        of the stage grows by more than the memory tolerance.
+        """
+        bparams = self.config.benchmark
+        baseline = {}
+        if os.path.isfile(bparams.baseline_path):
+            with open(bparams.baseline_path) as file:
+                baseline = json.load(file)
+
+        for size, stages in self.__results.items():
+            for stage, figures in stages.items():
+                base_figures = baseline.get(size, {}).get(stage)
+                ratio = memory_ratio = None
+                if base_figures and base_figures["rows_per_s"] and figures["rows_per_s"]:
+                    ratio = figures["rows_per_s"] / base_figures["rows_per_s"]
+                    if ratio < 1 - bparams.tolerance:
+                        self.__regressions.append(
+                            {"size": size, "stage": stage, "metric": "throughput", "ratio": ratio}
+                        )
+
+                peak_rss = figures["peak_rss_increase_bytes"]
+                base_peak_rss = base_figures.get("peak_rss_increase_bytes") if base_figures else None
+                if peak_rss is not None and base_peak_rss is not None:
+                    # Increases below 1 MB are sampling noise, so they are compared as 1 MB.
+                    memory_ratio = max(peak_rss, 1024 ** 2) / max(base_peak_rss, 1024 ** 2)
+                    if memory_ratio > 1 + bparams.memory_tolerance:
+                        self.__regressions.append(
+                            {"size": size, "stage": stage, "metric": "peak memory", "ratio": memory_ratio}
+                        )
+
+                print(f"{int(size):>11,} rows | {stage:<17} | "
+                      f"{figures['rows_per_s'] or 0:>14,.0f} rows/s | "
+                      f"{f'{ratio:.2f}x' if ratio is not None else '-':>6} | "
+                      f"{(peak_rss or 0) / 1024 ** 2:>9.1f} MB peak RSS increase | "
+                      f"{f'{memory_ratio:.2f}x' if memory_ratio is not None else '-':>6} | "
+                      f"{'baseline' if base_figures else 'no baseline'}")
+
+        for regression in self.__regressions:
+            print(f"Regression: {regression['stage']} at {regression['size']} rows "
+                  f"has {regression['ratio']:.2f}x the baseline {regression['metric']}")
+
+    def __save_results(self, update_baseline: bool) -> None:
+        """ Save the results and, if requested, store them as the new baseline. """
+        bparams = self.config.benchmark
+        paths = [bparams.results_path] + ([bparams.baseline_path] if update_baseline else [])
+
+        for path in paths:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "w") as file:
+                json.dump(self.__results, file, indent=2)
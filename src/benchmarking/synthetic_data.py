@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+from ..config.config_loading import ConfigLoader
+
+
+class SyntheticOhlcGenerator:
+    """
+    Deterministic generator of synthetic OHLC bars, shaped like the raw data the pipeline loads.
+    Prices follow a random walk and the data can be made dirty on purpose, with injected NaN values,
+    duplicated timestamps and unsorted rows, so every data engineering step has work to do.
+    """
+
+    def __init__(self,
+                 config: ConfigLoader,
+                 seed: int,
+                 nan_fraction: float = 0.0,
+                 duplicate_fraction: float = 0.0,
+                 unsorted_fraction: float = 0.0,
+                 start_date: str = "2016-01-01",
+                 frequency: str = "1min"):
+        self.__config = config
+        self.__seed = seed
+        self.__nan_fraction = nan_fraction
+        self.__duplicate_fraction = duplicate_fraction
+        self.__unsorted_fraction = unsorted_fraction
+        self.__start_date = start_date
+        self.__frequency = frequency
+
+    @property
+    def config(self):
+        return self.__config
+
+    def __create_prices(self, rng: np.random.Generator, n_rows: int) -> dict:
+        """ Create random walk Close prices and Open, High and Low prices that are consistent with them. """
+        dff = self.config.df_features
+
+        close = 100 * np.exp(np.cumsum(rng.normal(loc=0, scale=0.0005, size=n_rows)))
+        open_ = np.empty(n_rows)
+        open_[0] = close[0]
+        open_[1:] = close[:-1]
+
+        spread = np.abs(rng.normal(loc=0, scale=0.0003, size=n_rows)) * close
+        high = np.maximum(open_, close) + spread
+        low = np.minimum(open_, close) - spread
+
+        return {dff.open: open_, dff.high: high, dff.low: low, dff.close: close}
+
+    def __inject_nans(self, rng: np.random.Generator, prices: dict, n_rows: int) -> None:
+        """ Replace random prices with NaN values. The first and last rows are kept, so every gap is bounded. """
+        n_nans = int(n_rows * self.__nan_fraction)
+        if n_nans == 0 or n_rows < 3:
+            return
+        for values in prices.values():
+            values[rng.integers(1, n_rows - 1, size=n_nans)] = np.nan
+
+    def generate(self, n_rows: int) -> pd.DataFrame:
+        """ Generate n_rows of raw data, including the injected duplicates. """
+        dff = self.config.df_features
+        rng = np.random.default_rng(self.__seed)
+
+        dates = pd.date_range(start=self.__start_date, periods=n_rows, freq=self.__frequency, tz="UTC")
+        prices = self.__create_prices(rng=rng, n_rows=n_rows)
+        self.__inject_nans(rng=rng, prices=prices, n_rows=n_rows)
+
+        # Rows to repeat with the same timestamps.
+        n_duplicates = int(n_rows * self.__duplicate_fraction)
+        rows = np.arange(n_rows)
+        if n_duplicates > 0:
+            rows = np.concatenate([rows, rng.integers(0, n_rows, size=n_duplicates)])
+
+        # Move a fraction of the rows to random positions.
+        n_unsorted = int(len(rows) * self.__unsorted_fraction)
+        if n_unsorted > 1:
+            positions = rng.choice(len(rows), size=n_unsorted, replace=False)
+            rows[positions] = rows[rng.permutation(positions)]
+
+        data = {dff.date: dates[rows]}
+        data.update({col: values[rows] for col, values in prices.items()})
+        # An extra feature, that the data engineering removes, as in the raw data.
+        data["volume"] = rng.integers(1, 1000, size=len(rows)).astype(float)
+        return pd.DataFrame(data)
@@ -14,6 +14,51 @@ class DataLink:
         )
 
 
+@dataclass
+class DataLoading:
+    mode: str
+    engine: str
+    chunk_size: int
+
+    @classmethod
+    def read_config(cls: t.Type["DataLoading"], obj: dict):
+        return cls(
+            mode=obj["data_loading"]["mode"],
+            engine=obj["data_loading"]["engine"],
+            chunk_size=obj["data_loading"]["chunk_size"]
+        )
+
+
+@dataclass
+class DataCaching:
+    enabled: bool
+    file_format: str
+    max_size_mb: int
+    max_entries: int
+
+    @classmethod
+    def read_config(cls: t.Type["DataCaching"], obj: dict):
+        return cls(
+            enabled=obj["data_cache"]["enabled"],
+            file_format=obj["data_cache"]["format"],
+            max_size_mb=obj["data_cache"]["max_size_mb"],
+            max_entries=obj["data_cache"]["max_entries"]
+        )
+
+
+@dataclass
+class ArtifactStoring:
+    reuse: bool
+    keep_days: float
+
+    @classmethod
+    def read_config(cls: t.Type["ArtifactStoring"], obj: dict):
+        return cls(
+            reuse=obj["artifact_store"]["reuse"],
+            keep_days=obj["artifact_store"]["keep_days"]
+        )
+
+
 @dataclass
 class Paths:
     path2save_exploration: str
@@ -42,6 +87,29 @@ class Model:
         )
 
 
+@dataclass
+class Exploration:
+    chart_mode: str
+    max_points: int
+    downsampling: str
+    eda_report: bool
+    eda_mode: str
+    eda_max_rows: int
+    eda_time_budget_s: float
+
+    @classmethod
+    def read_config(cls: t.Type["Exploration"], obj: dict):
+        return cls(
+            chart_mode=obj["exploration"]["chart_mode"],
+            max_points=obj["exploration"]["max_points"],
+            downsampling=obj["exploration"]["downsampling"],
+            eda_report=obj["exploration"]["eda_report"],
+            eda_mode=obj["exploration"]["eda_mode"],
+            eda_max_rows=obj["exploration"]["eda_max_rows"],
+            eda_time_budget_s=obj["exploration"]["eda_time_budget_s"]
+        )
+
+
 @dataclass
 class DataFeatures:
     date: str
@@ -67,23 +135,69 @@ class DataFeatures:
 class DataEngineering:
     fill_method: str
     poly_order: int
+    max_gap: int
+    copy_free: bool
+    track_memory: bool
 
     @classmethod
     def read_config(cls: t.Type["DataEngineering"], obj: dict):
         return cls(
             fill_method=obj["data_engineering"]["fill_method"],
-            poly_order=obj["data_engineering"]["poly_order"]
+            poly_order=obj["data_engineering"]["poly_order"],
+            max_gap=obj["data_engineering"]["max_gap"],
+            copy_free=obj["data_engineering"]["copy_free"],
+            track_memory=obj["data_engineering"]["track_memory"]
         )
 
 
 @dataclass
 class LabelTolerance:
     tollerance: int
+    horizons: list
+    tolerances: list
 
     @classmethod
     def read_config(cls: t.Type["LabelTolerance"], obj: dict):
+        horizons = obj["label_tolerance"]["horizons"]
+        if not horizons or any(not isinstance(horizon, int) or horizon < 1 for horizon in horizons):
+            raise ValueError("An invalid horizons list is given.")
+
+        return cls(
+            tollerance=obj["label_tolerance"]["tolerance"],
+            horizons=horizons,
+            tolerances=obj["label_tolerance"]["tolerances"]
+        )
+
+
+@dataclass
+class DataSplitting:
+    mode: str
+    test_size: float
+    n_folds: int
+    train_window: str
+
+    @classmethod
+    def read_config(cls: t.Type["DataSplitting"], obj: dict):
         return cls(
-            tollerance=obj["label_tolerance"]["tolerance"]
+            mode=obj["data_splitting"]["mode"],
+            test_size=obj["data_splitting"]["test_size"],
+            n_folds=obj["data_splitting"]["n_folds"],
+            train_window=obj["data_splitting"]["train_window"]
+        )
+
+
+@dataclass
+class Precision:
+    features: str
+    verify: bool
+    tolerance: float
+
+    @classmethod
+    def read_config(cls: t.Type["Precision"], obj: dict):
+        return cls(
+            features=obj["precision"]["features"],
+            verify=obj["precision"]["verify"],
+            tolerance=obj["precision"]["tolerance"]
         )
 
 
@@ -91,12 +205,18 @@ class LabelTolerance:
 class ScalingMethod:
     method: str
     minmax_range: int
+    mode: str
+    chunk_size: int
+    sketch_size: int
 
     @classmethod
     def read_config(cls: t.Type["ScalingMethod"], obj: dict):
         return cls(
             method=obj["scaling_method"],
-            minmax_range=obj["min_max_scaler_range"]
+            minmax_range=obj["min_max_scaler_range"],
+            mode=obj["scaling_mode"],
+            chunk_size=obj["scaling_chunk_size"],
+            sketch_size=obj["scaling_sketch_size"]
         )
 
 
@@ -123,6 +243,72 @@ class LstmGeneralParams:
         )
 
 
+@dataclass
+class LstmTrainingParams:
+    input_pipeline: str
+    batch_size: int
+    epochs: int
+
+    @classmethod
+    def read_config(cls: t.Type["LstmTrainingParams"], obj: dict):
+        return cls(
+            input_pipeline=obj["BiLSTM"]["Training_params"]["input_pipeline"],
+            batch_size=obj["BiLSTM"]["Training_params"]["batch_size"],
+            epochs=obj["BiLSTM"]["Training_params"]["epochs"]
+        )
+
+
+@dataclass
+class LstmTuner:
+    strategy: str
+    max_trials: int
+    time_budget_minutes: float
+    hyperband_factor: int
+    early_stopping_patience: int
+
+    @classmethod
+    def read_config(cls: t.Type["LstmTuner"], obj: dict):
+        return cls(
+            strategy=obj["BiLSTM"]["Tuner"]["strategy"],
+            max_trials=obj["BiLSTM"]["Tuner"]["max_trials"],
+            time_budget_minutes=obj["BiLSTM"]["Tuner"]["time_budget_minutes"],
+            hyperband_factor=obj["BiLSTM"]["Tuner"]["hyperband_factor"],
+            early_stopping_patience=obj["BiLSTM"]["Tuner"]["early_stopping_patience"]
+        )
+
+
+@dataclass
+class LstmParallelTuning:
+    n_workers: int
+    intra_op_threads: int
+    inter_op_threads: int
+
+    @classmethod
+    def read_config(cls: t.Type["LstmParallelTuning"], obj: dict):
+        return cls(
+            n_workers=obj["BiLSTM"]["Parallel_tuning"]["n_workers"],
+            intra_op_threads=obj["BiLSTM"]["Parallel_tuning"]["intra_op_threads"],
+            inter_op_threads=obj["BiLSTM"]["Parallel_tuning"]["inter_op_threads"]
+        )
+
+
+@dataclass
+class LstmExport:
+    formats: list
+    quantizations: list
+    calibration_windows: int
+    benchmark_windows: int
+
+    @classmethod
+    def read_config(cls: t.Type["LstmExport"], obj: dict):
+        return cls(
+            formats=obj["BiLSTM"]["Export"]["formats"],
+            quantizations=obj["BiLSTM"]["Export"]["quantizations"],
+            calibration_windows=obj["BiLSTM"]["Export"]["calibration_windows"],
+            benchmark_windows=obj["BiLSTM"]["Export"]["benchmark_windows"]
+        )
+
+
 @dataclass
 class LstmHyperParams:
     lstm_units_min: int
@@ -156,18 +342,98 @@ class LstmHyperParams:
         )
 
 
+@dataclass
+class Benchmark:
+    sizes: list
+    seed: int
+    nan_fraction: float
+    duplicate_fraction: float
+    unsorted_fraction: float
+    skip_exploration: bool
+    tolerance: float
+    memory_tolerance: float
+    verify: bool
+    baseline_path: str
+    results_path: str
+
+    @classmethod
+    def read_config(cls: t.Type["Benchmark"], obj: dict):
+        return cls(
+            sizes=obj["benchmark"]["sizes"],
+            seed=obj["benchmark"]["seed"],
+            nan_fraction=obj["benchmark"]["nan_fraction"],
+            duplicate_fraction=obj["benchmark"]["duplicate_fraction"],
+            unsorted_fraction=obj["benchmark"]["unsorted_fraction"],
+            skip_exploration=obj["benchmark"]["skip_exploration"],
+            tolerance=obj["benchmark"]["tolerance"],
+            memory_tolerance=obj["benchmark"]["memory_tolerance"],
+            verify=obj["benchmark"]["verify"],
+            baseline_path=obj["benchmark"]["baseline_path"],
+            results_path=obj["benchmark"]["results_path"]
+        )
+
+
+@dataclass
+class Inference:
+    host: str
+    port: int
+    latency_window: int
+    max_batch_size: int
+    max_delay_ms: float
+
+    @classmethod
+    def read_config(cls: t.Type["Inference"], obj: dict):
+        return cls(
+            host=obj["inference"]["host"],
+            port=obj["inference"]["port"],
+            latency_window=obj["inference"]["latency_window"],
+            max_batch_size=obj["inference"]["max_batch_size"],
+            max_delay_ms=obj["inference"]["max_delay_ms"]
+        )
+
+
+@dataclass
+class MultiInstrument:
+    sources: dict
+    targets: list
+    n_workers: int
+    memory_per_worker_mb: int
+
+    @classmethod
+    def read_config(cls: t.Type["MultiInstrument"], obj: dict):
+        return cls(
+            sources=obj["multi_instrument"]["sources"] or {},
+            targets=obj["multi_instrument"]["targets"],
+            n_workers=obj["multi_instrument"]["n_workers"],
+            memory_per_worker_mb=obj["multi_instrument"]["memory_per_worker_mb"]
+        )
+
+
 class ConfigLoader(object):
 
     def __init__(self, config_path):
         config_file = Helper.read_yaml_file(path=config_path)
 
         self.data_link = DataLink.read_config(obj=config_file)
+        self.data_loading = DataLoading.read_config(obj=config_file)
+        self.data_cache = DataCaching.read_config(obj=config_file)
+        self.artifact_store = ArtifactStoring.read_config(obj=config_file)
         self.paths = Paths.read_config(obj=config_file)
         self.model = Model.read_config(obj=config_file)
+        self.exploration = Exploration.read_config(obj=config_file)
         self.df_features = DataFeatures.read_config(obj=config_file)
         self.dataengin = DataEngineering.read_config(obj=config_file)
         self.labeltolerance = LabelTolerance.read_config(obj=config_file)
+        self.data_splitting = DataSplitting.read_config(obj=config_file)
         self.scaling_method = ScalingMethod.read_config(obj=config_file)
+        self.precision = Precision.read_config(obj=config_file)
         self.lstm_general_params = LstmGeneralParams.read_config(obj=config_file)
+        self.lstm_training_params = LstmTrainingParams.read_config(obj=config_file)
+        self.lstm_tuner = LstmTuner.read_config(obj=config_file)
+        self.lstm_parallel_tuning = LstmParallelTuning.read_config(obj=config_file)
         self.lstm_hyper_params = LstmHyperParams.read_config(obj=config_file)
+        self.lstm_export = LstmExport.read_config(obj=config_file)
+        self.benchmark = Benchmark.read_config(obj=config_file)
+        self.inference = Inference.read_config(obj=config_file)
+        self.multi_instrument = MultiInstrument.read_config(obj=config_file)
 
@@ -0,0 +1,176 @@
+import os
+import typing as t
+import json
+import time
+import hashlib
+import dataclasses
+import urllib.request
+import pandas as pd
+import pyarrow.feather as feather
+from ..config.config_loading import ConfigLoader
+
+
+class DataCache:
+    """
+    Local columnar cache of the engineered data.
+    Each entry is keyed by a fingerprint of the data source and the configuration sections
+    that affect the data engineering, so any change in them results in a new entry.
+    The entries are kept under the data path and the least recently used ones are evicted
+    when the size or the number of entries exceeds the configured limits.
+    The key is created once, so the same cache object must be used to look up and to store an entry.
+    Remote sources that cannot be validated have no key, and their data is neither looked up nor cached.
+    """
+
+    def __init__(self, config: ConfigLoader):
+        self.__config = config
+        self.__directory = os.path.join(config.paths.path2save_data, "engineered_cache")
+        self.__index_path = os.path.join(self.__directory, "cache_index.json")
+        self.__key = self.__create_key()
+
+        if self.__key is None:
+            print(f"The data source cannot be validated, so its engineered data is not cached: {config.data_link.link}")
+
+    @property
+    def config(self):
+        return self.__config
+
+    @property
+    def key(self):
+        return self.__key
+
+    @property
+    def file_path(self):
+        return os.path.join(self.__directory, f"{self.__key}.{self.__config.data_cache.file_format}")
+
+    @staticmethod
+    def fingerprint_source(link: str) -> t.Optional[str]:
+        """
+        Fingerprint the data source.
+        Local files are identified by their path, size and modification time, so they are not re-read.
+        Remote sources are identified by their link together with the ETag, Last-Modified and Content-Length
+        headers of a HEAD request, so a changed file gets a new fingerprint. Remote sources that cannot be
+        validated have no fingerprint, so nothing is cached or stored for them.
+        """
+        if os.path.isfile(link):
+            stats = os.stat(link)
+            return f"{os.path.abspath(link)}|{stats.st_size}|{stats.st_mtime_ns}"
+
+        try:
+            with urllib.request.urlopen(urllib.request.Request(link, method="HEAD"), timeout=10) as response:
+                validators = [response.headers.get(name) for name in ("ETag", "Last-Modified", "Content-Length")]
+        except (OSError, ValueError):
+            validators = []
+
+        if not any(validators):
+            return None
+        return "|".join([link] + [value or "" for value in validators])
+
+    def __create_key(self) -> t.Optional[str]:
+        """
+        Hash the source fingerprint together with the data features and data engineering configurations.
+        There is no key if the source has no fingerprint.
+        """
+        config = self.__config
+        source = self.fingerprint_source(link=config.data_link.link)
+        if source is None:
+            return None
+
+        key_content = {
+            "source": source,
+            "data_fuatures_in_use": dataclasses.asdict(config.df_features),
+            "data_engineering": dataclasses.asdict(config.dataengin)
+        }
+        serialised = json.dumps(key_content, sort_keys=True, default=str)
+        return hashlib.sha256(serialised.encode("utf-8")).hexdigest()
+
+    def __read_index(self) -> dict:
+        """ Read the cache index. An empty index is returned if there is no index yet. """
+        if not os.path.isfile(self.__index_path):
+            return {}
+        with open(self.__index_path) as file:
+            return json.load(file)
+
+    def __write_index(self, index: dict) -> None:
+        """ Write the cache index. """
+        os.makedirs(self.__directory, exist_ok=True)
+        with open(self.__index_path, "w") as file:
+            json.dump(index, file, indent=2)
+
+    def has_entry(self) -> bool:
+        """ Check if the engineered data for the current key is cached. """
+        if self.__key is None:
+            return False
+        return self.__key in self.__read_index() and os.path.isfile(self.file_path)
+
+    def load(self) -> (pd.DataFrame, dict):
+        """
+        Load the cached engineered data and the info that was tracked when the entry was created.
+        Feather files are memory-mapped, so the data is paged in from disk on demand.
+        """
+        index = self.__read_index()
+        entry = index[self.__key]
+
+        if self.__config.data_cache.file_format == "feather":
+            table = feather.read_table(self.file_path, memory_map=True)
+            data = table.to_pandas(split_blocks=True)
+        else:
+            data = pd.read_parquet(self.file_path, memory_map=True)
+
+        # Restore the timestamps index.
+        data.set_index(keys=entry["index_name"], inplace=True)
+        data.index.name = entry["index_name"]
+
+        # Mark the entry as recently used.
+        entry["last_access"] = time.time()
+        self.__write_index(index=index)
+        return data, entry["info"]
+
+    def store(self, data: pd.DataFrame, info: dict) -> None:
+        """ Store the engineered data and the tracked info, then evict the least recently used entries. """
+        if self.__key is None:
+            return
+        file_format = self.__config.data_cache.file_format
+        os.makedirs(self.__directory, exist_ok=True)
+
+        # Columnar formats need a default index, so the timestamps index is stored as a column.
+        index_name = data.index.name or "index"
+        data2store = data.reset_index()
+
+        if file_format == "feather":
+            # Uncompressed files can be memory-mapped without decompression.
+            feather.write_feather(data2store, self.file_path, compression="uncompressed")
+        elif file_format == "parquet":
+            data2store.to_parquet(self.file_path, index=False)
+        else:
+            raise ValueError("An invalid cache file format is given.")
+
+        index = self.__read_index()
+        index[self.__key] = {
+            "file": os.path.basename(self.file_path),
+            "size": os.path.getsize(self.file_path),
+            "last_access": time.time(),
+            "index_name": index_name,
+            "info": info
+        }
+        self.__evict(index=index)
+        self.__write_index(index=index)
+
+    def __evict(self, index: dict) -> None:
+        """ Remove the least recently used entries until the size and the number of entries are within the limits. """
+        config = self.__config.data_cache
+        max_size = config.max_size_mb * 1024 ** 2
+
+        # Oldest access first. The current entry is never evicted.
+        lru_keys = sorted(
+            (key for key in index if key != self.__key),
+            key=lambda key: index[key]["last_access"]
+        )
+        for key in lru_keys:
+            total_size = sum(entry["size"] for entry in index.values())
+            if total_size <= max_size and len(index) <= config.max_entries:
+                break
+
+            entry = index.pop(key)
+            entry_path = os.path.join(self.__directory, entry["file"])
+            if os.path.isfile(entry_path):
+                os.remove(entry_path)
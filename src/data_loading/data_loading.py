@@ -1,15 +1,20 @@
 import pandas as pd
 from ..config.config_loading import ConfigLoader
 from ..info_tracking.info_tracking import InfoTracker
+from ..data_loading.data_cache import DataCache
 from ..data_preprocessing.s1_data_engineering import DataEngineer
 
 
 class DataLoader(object):
 
-    def __init__(self, config: ConfigLoader):
+    @InfoTracker.track_stage(outputs=("data",))
+    def __init__(self, config: ConfigLoader, info_tracker: InfoTracker = None):
         self.__config = config
-        self.__data: pd.DataFrame = pd.read_csv(self.__config.data_link.link)
-        self.__info_tracker = InfoTracker()
+        self.__info_tracker = info_tracker if info_tracker is not None else InfoTracker()
+        # One cache object, so the engineered data is stored under the key it was looked up with.
+        self.__data_cache = DataCache(config=config) if config.data_cache.enabled else None
+        self.__from_cache: bool = False
+        self.__data: pd.DataFrame = self.__read_data()
 
     @property
     def config(self):
@@ -23,9 +28,98 @@ class DataLoader(object):
     def info_tracker(self):
         return self.__info_tracker
 
+    @property
+    def data_cache(self):
+        return self.__data_cache
+
+    @property
+    def from_cache(self):
+        return self.__from_cache
+
+    def __read_data(self) -> pd.DataFrame:
+        """ Read the raw data based on the loading mode, set in the configurations. """
+
+        config = self.__config
+
+        # if the engineered data is cached, load it instead of the raw data
+        if self.__data_cache is not None and self.__data_cache.has_entry():
+            data, info = self.__data_cache.load()
+            self.__info_tracker.missing_values = info["missing_values"]
+            self.__info_tracker.duplicated_values = info["duplicated_values"]
+            self.__from_cache = True
+            return data
+
+        # if loading mode is default, read the whole file as it is
+        if config.data_loading.mode == "default":
+            return pd.read_csv(config.data_link.link)
+
+        # if loading mode is streaming, read only the features in use with pinned data types
+        elif config.data_loading.mode == "streaming":
+            return self.__stream_data()
+
+        else:
+            raise ValueError("An invalid data loading mode is given.")
+
+    def __stream_data(self) -> pd.DataFrame:
+        """
+        Read only the data features in use, with pinned numeric data types.
+        Parse the timestamps as UTC at read time.
+        With the c engine the file is read in chunks, so only one chunk is ever held in its raw form.
+        The pyarrow engine does not support chunks, so the file is read in one go with multiple threads.
+        """
+        config = self.__config
+        dff = config.df_features
+        engine = config.data_loading.engine
+
+        if engine not in ("c", "pyarrow"):
+            raise ValueError("An invalid parser engine is given.")
+
+        # Read the header only and keep the desired features that exist in the file.
+        # The labels are created later, so they are not expected in the raw data.
+        desired_features = list(dff.__dict__.values())
+        header = pd.read_csv(config.data_link.link, nrows=0).columns
+        features2read = [col for col in header if col in desired_features]
+
+        # Pin the data type of the price features.
+        price_features = [dff.open, dff.high, dff.low, dff.close]
+        dtypes = {col: "float64" for col in features2read if col in price_features}
+
+        if engine == "pyarrow":
+            data = pd.read_csv(
+                config.data_link.link,
+                usecols=features2read,
+                dtype=dtypes,
+                engine=engine
+            )
+            return self.__parse_timestamps(data=data)
+
+        # Parse every chunk while it is small and concatenate the typed chunks at the end.
+        chunks = [
+            self.__parse_timestamps(data=chunk)
+            for chunk
+            in pd.read_csv(
+                config.data_link.link,
+                usecols=features2read,
+                dtype=dtypes,
+                engine=engine,
+                chunksize=config.data_loading.chunk_size
+            )
+        ]
+        return pd.concat(chunks, ignore_index=True)
+
+    def __parse_timestamps(self, data: pd.DataFrame) -> pd.DataFrame:
+        """ Convert the date feature to UTC timestamps. """
+        date_col = self.__config.df_features.date
+
+        if date_col in data.columns:
+            data[date_col] = pd.to_datetime(data[date_col], utc=True)
+        return data
+
     def data_engineering(self) -> DataEngineer:
         return DataEngineer(
             data=self.__data,
             config=self.__config,
-            info_tracker=self.__info_tracker
+            info_tracker=self.__info_tracker,
+            data_cache=self.__data_cache,
+            from_cache=self.__from_cache
         )
@@ -0,0 +1,186 @@
+import os
+import json
+import time
+import multiprocessing as mp
+import numpy as np
+import pandas as pd
+from ydata_profiling import ProfileReport
+from ..config.config_loading import ConfigLoader
+from ..info_tracking.info_tracking import InfoTracker
+
+
+def create_profile_report(data: pd.DataFrame, path: str) -> None:
+    """ Profile the data and save the report. Runs in its own process, so it can be stopped. """
+    # The correlations are part of the core statistics, so the minimal report is enough.
+    profile = ProfileReport(data, title="Pandas Profiling Report", minimal=True)
+    profile.to_file(path)
+
+
+class BoundedEdaProfiler:
+    """
+    Exploratory Data Analysis with a time and row budget.
+    The core statistics (missing values, quantiles, correlations, return distribution and gaps between
+    timestamps) are computed with vectorised code over the full data and saved as JSON.
+    The full profiling report runs only on a time-stratified sample, in a worker process that is stopped
+    when the time budget is spent.
+    """
+
+    def __init__(self,
+                 data: pd.DataFrame,
+                 config: ConfigLoader,
+                 info_tracker: InfoTracker):
+        self.__data = data
+        self.__config = config
+        self.__info_tracker = info_tracker
+
+        self.__quantiles = [0.0, 0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99, 1.0]
+        self.__start_time = time.perf_counter()
+        self.__core_statistics: dict = {}
+
+        self.__calc_core_statistics()
+        self.__save_core_statistics()
+        self.__create_sampled_report()
+
+    @property
+    def config(self):
+        return self.__config
+
+    @property
+    def data(self):
+        return self.__data
+
+    @property
+    def info_tracker(self):
+        return self.__info_tracker
+
+    @property
+    def core_statistics(self):
+        return self.__core_statistics
+
+    def __calc_feature_statistics(self, values: np.ndarray) -> dict:
+        """ Missing values, mean, standard deviation and quantiles of every feature, over all features at once. """
+        columns = list(self.data.columns)
+        quantiles = np.nanquantile(values, self.__quantiles, axis=0)
+
+        return {
+            "rows": len(values),
+            "missing_values": dict(zip(columns, np.isnan(values).sum(axis=0).tolist())),
+            "mean": dict(zip(columns, np.nanmean(values, axis=0).tolist())),
+            "std": dict(zip(columns, np.nanstd(values, axis=0).tolist())),
+            "quantiles": {
+                col: dict(zip(map(str, self.__quantiles), quantiles[:, i].tolist()))
+                for i, col in enumerate(columns)
+            },
+            "correlations": pd.DataFrame(values, columns=columns).corr().to_dict()
+        }
+
+    def __calc_return_statistics(self) -> dict:
+        """ Distribution of the log returns of the Close price. """
+        close = self.data[self.config.df_features.close].to_numpy(dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns = np.diff(np.log(close))
+        returns = returns[np.isfinite(returns)]
+
+        if len(returns) < 2:
+            return {}
+
+        mean = returns.mean()
+        std = returns.std()
+        standardised = (returns - mean) / std if std > 0 else np.zeros_like(returns)
+        return {
+            "mean": float(mean),
+            "std": float(std),
+            "skewness": float(np.mean(standardised ** 3)),
+            "excess_kurtosis": float(np.mean(standardised ** 4) - 3),
+            "zero_returns_share": float(np.mean(returns == 0)),
+            "quantiles": dict(zip(map(str, self.__quantiles), np.quantile(returns, self.__quantiles).tolist()))
+        }
+
+    def __calc_gap_statistics(self, n_largest: int = 10) -> dict:
+        """ Statistics of the time gaps between consecutive timestamps, in seconds. """
+        index = self.data.index
+        if len(index) < 2:
+            return {}
+
+        gaps = np.diff(index.asi8) / 1e9
+        median_gap = float(np.median(gaps))
+        largest = np.argsort(gaps)[::-1][:n_largest]
+
+        return {
+            "median_s": median_gap,
+            "mean_s": float(gaps.mean()),
+            "max_s": float(gaps.max()),
+            "gaps_over_twice_the_median": int(np.sum(gaps > 2 * median_gap)),
+            "largest": [
+                {"start": str(index[i]), "end": str(index[i + 1]), "seconds": float(gaps[i])}
+                for i in largest
+            ]
+        }
+
+    def __calc_core_statistics(self) -> None:
+        """ Compute the core statistics over the full data. """
+        values = self.data.to_numpy(dtype=float)
+
+        self.__core_statistics = {
+            "features": self.__calc_feature_statistics(values=values),
+            "raw_missing_values": {
+                col: int(val) for col, val in (self.info_tracker.missing_values or {}).items()
+            },
+            "returns": self.__calc_return_statistics(),
+            "gaps": self.__calc_gap_statistics()
+        }
+
+    def __save_core_statistics(self) -> None:
+        """ Save the core statistics as JSON. """
+        path = os.path.join(self.config.paths.path2save_exploration, "eda_core_statistics.json")
+        with open(path, "w") as file:
+            json.dump(self.__core_statistics, file, indent=2)
+
+    def __stratified_sample(self) -> pd.DataFrame:
+        """
+        Sample at most the row budget from the data, with the same share of rows from every month,
+        so every period of the history is represented in the sample.
+        """
+        data = self.data
+        max_rows = self.config.exploration.eda_max_rows
+
+        if len(data) <= max_rows:
+            return data
+
+        months = data.index.year * 12 + data.index.month
+        sample = data.groupby(months).sample(
+            frac=max_rows / len(data),
+            random_state=self.config.lstm_general_params.seed
+        )
+        return sample.sort_index()
+
+    def __create_sampled_report(self) -> None:
+        """
+        Run the profiling report on the stratified sample with the rest of the time budget.
+        The report is skipped if the core statistics spent the budget, and stopped if it would overrun it.
+        """
+        exploration = self.config.exploration
+        elapsed = time.perf_counter() - self.__start_time
+
+        if elapsed >= exploration.eda_time_budget_s:
+            print(f"The EDA time budget was spent on the core statistics ({elapsed:.0f} s). "
+                  f"The profiling report is skipped.")
+            return
+
+        report = mp.get_context("spawn").Process(
+            target=create_profile_report,
+            kwargs=dict(
+                data=self.__stratified_sample(),
+                path=os.path.join(self.config.paths.path2save_exploration, "EDanalysis.html")
+            )
+        )
+        report.start()
+        report.join(timeout=exploration.eda_time_budget_s - (time.perf_counter() - self.__start_time))
+
+        if report.is_alive():
+            report.terminate()
+            report.join()
+            print(f"The EDA time budget of {exploration.eda_time_budget_s} s was spent. "
+                  f"The profiling report is stopped.")
+        elif report.exitcode != 0:
+            raise RuntimeError(f"The profiling report failed with exit code {report.exitcode}.")
@@ -0,0 +1,128 @@
+import numpy as np
+
+
+class GapInterpolator:
+    """
+    Fill the runs of NaNs of many columns at once, each from a bounded neighbourhood of valid values.
+    The runs are found once with a vectorised mask over all the columns, and every run is filled from the
+    values around it only, so the cost grows with the number of missing values and not with the rows.
+    The linear method joins the valid values on both sides of a run. The polynomial method fits a polynomial
+    of the given order through the order + 1 nearest valid values, split over both sides of the run,
+    and falls back to the linear method if other runs are too close. Rows are taken as equally spaced.
+    Runs longer than the max gap, if one is set, are left as they are. Runs at the start of a column are left
+    as they are too, and runs at its end are filled with the last valid value by the linear method only.
+    """
+
+    def __init__(self, method: str = "linear", poly_order: int = 2, max_gap: int = 0):
+        if method not in ("linear", "polynomial"):
+            raise ValueError("An invalid fill method is given.")
+        if method == "polynomial" and poly_order < 1:
+            raise ValueError("The polynomial order must be at least 1.")
+
+        self.__method = method
+        self.__poly_order = poly_order
+        self.__max_gap = max_gap
+        self.__n_gaps = 0
+
+    @property
+    def n_gaps(self):
+        """ Number of runs found by the last interpolation. """
+        return self.__n_gaps
+
+    @staticmethod
+    def find_gaps(mask: np.ndarray) -> (np.ndarray, np.ndarray, np.ndarray):
+        """
+        The column, the first row and the row after the last of every run of True values of a 2D mask,
+        ordered by column and row.
+        """
+        n_rows, n_columns = mask.shape
+        padded = np.zeros((n_columns, n_rows + 2), dtype=np.int8)
+        padded[:, 1:-1] = mask.T
+
+        edges = np.diff(padded, axis=1)
+        columns, starts = np.nonzero(edges == 1)
+        _, ends = np.nonzero(edges == -1)
+        return columns, starts, ends
+
+    @staticmethod
+    def __expand(columns: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> (np.ndarray, np.ndarray, np.ndarray):
+        """ The gap, the row and the column of every missing value of the given runs. """
+        lengths = ends - starts
+        gaps = np.repeat(np.arange(len(starts)), lengths)
+        # Offset of every row within its run.
+        offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        return gaps, starts[gaps] + offsets, columns[gaps]
+
+    def __fill_linear(self, values: np.ndarray, columns: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> None:
+        """ Join the valid values just before and just after every run. """
+        gaps, rows, cols = self.__expand(columns=columns, starts=starts, ends=ends)
+        left, right = starts - 1, ends
+
+        weights = (rows - left[gaps]) / (right[gaps] - left[gaps])
+        left_values = values[left[gaps], cols]
+        values[rows, cols] = left_values + weights * (values[right[gaps], cols] - left_values)
+
+    def __fill_polynomial(self,
+                          values: np.ndarray,
+                          columns: np.ndarray,
+                          starts: np.ndarray,
+                          ends: np.ndarray) -> None:
+        """
+        Fit a polynomial through the nearest valid values on both sides of every run.
+        Runs whose neighbourhood reaches another run or the edges of the data are filled linearly instead.
+        """
+        n_points = self.__poly_order + 1
+        n_left = (n_points + 1) // 2
+        n_right = n_points - n_left
+
+        # The rows of the neighbourhood of every run, n_left before it and n_right after it.
+        points = np.concatenate([
+            starts[:, None] - np.arange(n_left, 0, -1),
+            ends[:, None] + np.arange(n_right)
+        ], axis=1)
+
+        complete = (points[:, 0] >= 0) & (points[:, -1] < len(values))
+        complete[complete] = ~np.isnan(values[points[complete], columns[complete, None]]).any(axis=1)
+
+        if (~complete).any():
+            self.__fill_linear(values=values, columns=columns[~complete], starts=starts[~complete],
+                               ends=ends[~complete])
+        if not complete.any():
+            return
+
+        columns, starts, ends, points = columns[complete], starts[complete], ends[complete], points[complete]
+
+        # Positions relative to the run and scaled to its neighbourhood, so the systems are well conditioned.
+        origins = starts - 1
+        scales = (points[:, -1] - points[:, 0]).astype(float)
+        x = (points - origins[:, None]) / scales[:, None]
+        vandermonde = x[:, :, None] ** np.arange(n_points)
+        coefficients = np.linalg.solve(vandermonde, values[points, columns[:, None]][:, :, None])[:, :, 0]
+
+        gaps, rows, cols = self.__expand(columns=columns, starts=starts, ends=ends)
+        x_missing = (rows - origins[gaps]) / scales[gaps]
+        values[rows, cols] = np.sum(coefficients[gaps] * x_missing[:, None] ** np.arange(n_points), axis=1)
+
+    def interpolate(self, values: np.ndarray) -> np.ndarray:
+        """ Fill the runs of NaNs of a 2D float array in place, column by column, and return it. """
+        columns, starts, ends = self.find_gaps(mask=np.isnan(values))
+        self.__n_gaps = len(starts)
+
+        # Runs at the start of a column and runs longer than the max gap are left as they are.
+        keep = starts > 0
+        if self.__max_gap > 0:
+            keep &= (ends - starts) <= self.__max_gap
+        columns, starts, ends = columns[keep], starts[keep], ends[keep]
+
+        # Runs at the end of a column have a valid value before them only.
+        at_end = ends == len(values)
+        if self.__method == "linear" and at_end.any():
+            gaps, rows, cols = self.__expand(columns=columns[at_end], starts=starts[at_end], ends=ends[at_end])
+            values[rows, cols] = values[starts[at_end][gaps] - 1, cols]
+        columns, starts, ends = columns[~at_end], starts[~at_end], ends[~at_end]
+
+        if self.__method == "linear":
+            self.__fill_linear(values=values, columns=columns, starts=starts, ends=ends)
+        else:
+            self.__fill_polynomial(values=values, columns=columns, starts=starts, ends=ends)
+        return values
@@ -0,0 +1,81 @@
+import pandas as pd
+from ..config.config_loading import ConfigLoader
+
+
+class ResamplingPyramid:
+    """
+    Multi-resolution view of the data, built with one pass over the raw bars.
+    The raw bars are aggregated once to the base resolution, keeping the sum and the count of every feature
+    as well as the first, highest, lowest and last price. Every coarser resolution is derived from the base
+    level, so the means are weighted by the number of raw bars and match a direct resampling of the raw data.
+    The prices keep the convention of the original daily candles: right-closed bins, labelled with their end.
+    The levels are cached, so each resolution is computed only once.
+    """
+
+    def __init__(self, data: pd.DataFrame, config: ConfigLoader, base_resolution: str = "D"):
+        self.__config = config
+        self.__base_resolution = base_resolution
+        self.__levels: dict = {}
+
+        self.__levels[base_resolution] = self.__aggregate_raw_data(data=data)
+
+    @property
+    def config(self):
+        return self.__config
+
+    @property
+    def base_resolution(self):
+        return self.__base_resolution
+
+    @property
+    def resolutions(self):
+        return list(self.__levels)
+
+    def __aggregate_raw_data(self, data: pd.DataFrame) -> dict:
+        """ Aggregate the raw bars to the base resolution. """
+        dff = self.config.df_features
+        resampler = data.resample(self.__base_resolution)
+        candles = data.resample(self.__base_resolution, closed="right", label="right")
+
+        return {
+            "sum": resampler.sum(min_count=1),
+            "count": resampler.count(),
+            "open": candles[dff.open].first(),
+            "high": candles[dff.high].max(),
+            "low": candles[dff.low].min(),
+            "close": candles[dff.close].last()
+        }
+
+    def level(self, resolution: str) -> dict:
+        """ Return the aggregates of a resolution, deriving them from the base level the first time. """
+        if resolution not in self.__levels:
+            base = self.__levels[self.__base_resolution]
+            # The base candles are labelled with the end of their bin, so they are moved back to its start.
+            candles = {
+                key: base[key].shift(-1, freq=self.__base_resolution) for key in ("open", "high", "low", "close")
+            }
+            self.__levels[resolution] = {
+                "sum": base["sum"].resample(resolution).sum(min_count=1),
+                "count": base["count"].resample(resolution).sum(),
+                "open": candles["open"].resample(resolution).first(),
+                "high": candles["high"].resample(resolution).max(),
+                "low": candles["low"].resample(resolution).min(),
+                "close": candles["close"].resample(resolution).last()
+            }
+        return self.__levels[resolution]
+
+    def means(self, resolution: str) -> pd.DataFrame:
+        """ Mean of every feature per period. Periods without bars are NaN. """
+        aggregates = self.level(resolution=resolution)
+        return aggregates["sum"] / aggregates["count"].where(aggregates["count"] > 0)
+
+    def ohlc(self, resolution: str) -> pd.DataFrame:
+        """ Open, High, Low and Close prices per period. Periods without bars are NaN. """
+        dff = self.config.df_features
+        aggregates = self.level(resolution=resolution)
+        return pd.DataFrame({
+            dff.open: aggregates["open"],
+            dff.high: aggregates["high"],
+            dff.low: aggregates["low"],
+            dff.close: aggregates["close"]
+        })
@@ -1,24 +1,48 @@
 import pandas as pd
 from ..config.config_loading import ConfigLoader
+from ..data_loading.data_cache import DataCache
+from ..helper.helper import Helper
 from ..info_tracking.info_tracking import InfoTracker
-from ..data_preprocessing.s2_data_exploration import DataExplorator
+from ..data_preprocessing.gap_interpolation import GapInterpolator
 
 
 class DataEngineer:
 
+    @InfoTracker.track_stage(inputs=("data",), outputs=("data",))
     def __init__(self,
                  data: pd.DataFrame,
                  config: ConfigLoader,
-                 info_tracker: InfoTracker):
+                 info_tracker: InfoTracker,
+                 data_cache: DataCache = None,
+                 from_cache: bool = False):
+        """
+        Engineer the given data.
+        In copy-free mode the given data frame is modified in place: its unused columns are deleted, its missing
+        values are filled and its index is set to the timestamps. Do not use it afterwards, use the data property.
+        """
         self.__config = config
         self.__data = data
         self.__info_tracker = info_tracker
 
-        self.__remove_unused_data()
-        self.__fix_data_type()
-        self.__replace_missing_values()
-        self.__index_and_sort_by_timestamps()
-        self.__remove_duplicates()
+        # In copy-free mode every step works in place on the given data frame.
+        self.__copy_free: bool = config.dataengin.copy_free
+
+        # The given data is already engineered if it comes from the cache.
+        if not from_cache:
+            # Tracing the allocations slows the engineering down, so the peak memory is measured on demand only.
+            if config.dataengin.track_memory:
+                with Helper.measure_peak_memory() as memory:
+                    self.__engineer()
+
+                # Store the peak memory of the data engineering in the info tracker.
+                self.info_tracker.engineering_peak_memory = memory["peak"]
+                print(f"Data engineering peak memory (copy free: {self.__copy_free}): "
+                      f"{memory['peak'] / 1024 ** 2:.1f} MB")
+            else:
+                self.__engineer()
+
+            if data_cache is not None:
+                self.__store_in_cache(data_cache=data_cache)
 
     @property
     def config(self):
@@ -32,9 +56,21 @@ class DataEngineer:
     def info_tracker(self):
         return self.__info_tracker
 
+    def __engineer(self) -> None:
+        """ Run the data engineering steps. """
+        self.__remove_unused_data()
+        self.__fix_data_type()
+        self.__replace_missing_values()
+        self.__index_and_sort_by_timestamps()
+        self.__remove_duplicates()
+
+    def __working_data(self) -> pd.DataFrame:
+        """ Return the data to work on. This is the data itself in copy-free mode and a copy of it otherwise. """
+        return self.data if self.__copy_free else self.data.copy()
+
     def __remove_unused_data(self) -> None:
         """ Remove unused data features and keep only the data features that are in interest """
-        data = self.data.copy()
+        data = self.__working_data()
         config = self.config
 
         # set up existing and desired data features
@@ -45,31 +81,33 @@ class DataEngineer:
         features2drop = set(df_features).difference(desired_features)
 
         # Drop the features that are included into the difference set from the given dataset
-        data.drop(columns=list(features2drop), inplace=True)
+        # Deleting the features one by one does not rebuild the remaining ones
+        for col in features2drop:
+            del data[col]
 
         self.__data = data
 
     def __fix_data_type(self) -> None:
-        """ Fix the data type of the data features. """
+        """ Fix the data type of the data features. Features that already have the right data type are skipped. """
 
-        data = self.data.copy()
+        data = self.__working_data()
 
         # for each feature in data
         for col in data.columns:
             # if feature is date
             if col == "date":
-                val = pd.to_datetime(data[col], utc=True)
-                data[col] = val
+                if not isinstance(data[col].dtype, pd.DatetimeTZDtype):
+                    data[col] = pd.to_datetime(data[col], utc=True)
             # if feature is other than date
             else:
-                val = pd.to_numeric(data[col])
-                data[col] = val
+                if not pd.api.types.is_numeric_dtype(data[col]):
+                    data[col] = pd.to_numeric(data[col])
         self.__data = data
 
     def __count_missing_values(self) -> dict:
         """ Count the missing values for each data feature and store them in a dictionary. """
 
-        data = self.data.copy()
+        data = self.data
         nan_dict = {}
 
         for col in data.columns:
@@ -78,45 +116,41 @@ class DataEngineer:
         return nan_dict
 
     def __replace_missing_values(self) -> None:
-        """ Replace the NaN values based on predetermined method, set in the configurations. """
+        """
+        Replace the NaN values based on predetermined method, set in the configurations.
+        All the features with missing values are filled together, each run of NaNs from the values around it only.
+        """
 
         config = self.config
-        data = self.data.copy()
 
         # count missing values
         nan_amount = self.__count_missing_values()
         self.info_tracker.missing_values = nan_amount
 
-        # if there is even one missing value
-        if sum(nan_amount.values()) > 0:
-
-            # if filling method is polynomial
-            if config.dataengin.fill_method == "polynomial":
-                [
-                    data[col].interpolate(
-                        method=config.dataengin.fill_method,
-                        order=config.dataengin.poly_order,
-                        direction="both",
-                        inplace=True
-                    )
-                    for col
-                    in data.columns
-                ]
-
-            # if filling method is linear
-            elif config.dataengin.fill_method == "linear":
-                [
-                    data[col].interpolate(
-                        method=config.dataengin.fill_method,
-                        direction="both",
-                        inplace=True
-                    )
-                    for col
-                    in data.columns
-                ]
+        # if there is not even one missing value, there is nothing to replace
+        if sum(nan_amount.values()) == 0:
+            return
 
-            else:
-                raise ValueError("An invalid fill method is given.")
+        interpolator = GapInterpolator(
+            method=config.dataengin.fill_method,
+            poly_order=config.dataengin.poly_order,
+            max_gap=config.dataengin.max_gap
+        )
+
+        data = self.__working_data()
+
+        # interpolate only the numeric features with missing values
+        features = [
+            col for col, amount in nan_amount.items()
+            if amount > 0 and pd.api.types.is_numeric_dtype(data[col])
+        ]
+        if not features:
+            self.__data = data
+            return
+
+        filled = interpolator.interpolate(values=data[features].to_numpy(dtype=float))
+        for i, col in enumerate(features):
+            data[col] = filled[:, i]
 
         self.__data = data
 
@@ -126,28 +160,41 @@ class DataEngineer:
         # Set date column as index
         # BUT date column is NOT removed - It is required for duplicate detection
         self.data.set_index(keys=self.__config.df_features.date, drop=False, inplace=True)
-        # sort data
-        self.data.sort_index(ascending=True, inplace=True)
+        # sort data - already sorted data is left untouched
+        if not self.data.index.is_monotonic_increasing:
+            self.data.sort_index(ascending=True, inplace=True)
 
     def __count_duplicates(self) -> int:
         """ Count duplicated rows using timestamps. """
 
         config = self.config
-        data = self.data.copy()
 
-        dupli_amount = data[config.df_features.date].duplicated(False).sum()
+        dupli_amount = self.data[config.df_features.date].duplicated(False).sum()
         return dupli_amount
 
     def __remove_duplicates(self) -> None:
         """ Remove duplicates identified based on the Date feature. Drops the Date feature at the end. """
 
         config = self.config
-        data = self.data.copy()
 
         # Count duplicated rows
         dupl_amount = self.__count_duplicates()
         self.info_tracker.duplicated_values = dupl_amount
 
+        if self.__copy_free:
+            data = self.data
+
+            # keep the first valid row of each timestamp - rows are only filtered if there are duplicates
+            if dupl_amount > 0:
+                data = data[~data.index.duplicated(keep="first")]
+
+            # drop the date column as it is not used anymore
+            del data[config.df_features.date]
+            self.__data = data
+            return
+
+        data = self.data.copy()
+
         # make sure that timestamp is set as index before removing duplicated rows
         data[config.df_features.date] = data.index
 
@@ -164,7 +211,18 @@ class DataEngineer:
         )
         self.__data = data
 
-    def data_exploration(self) -> DataExplorator:
+    def __store_in_cache(self, data_cache: DataCache) -> None:
+        """ Store the engineered data in the cache, together with the tracked missing and duplicated values. """
+        info = {
+            "missing_values": {col: int(val) for col, val in self.info_tracker.missing_values.items()},
+            "duplicated_values": int(self.info_tracker.duplicated_values)
+        }
+        data_cache.store(data=self.data, info=info)
+
+    def data_exploration(self):
+        # The exploration imports the plotting and profiling packages, so it is imported only when it runs.
+        from ..data_preprocessing.s2_data_exploration import DataExplorator
+
         return DataExplorator(
             data=self.data,
             config=self.config,
@@ -3,6 +3,9 @@ import pandas as pd
 import plotly.graph_objects as go
 from ydata_profiling import ProfileReport
 from ..config.config_loading import ConfigLoader
+from ..helper.downsampling import Downsampler
+from ..data_preprocessing.resampling_pyramid import ResamplingPyramid
+from ..data_preprocessing.eda_profiling import BoundedEdaProfiler
 from ..info_tracking.info_tracking import InfoTracker
 from ..data_preprocessing.s3_labels_creation import LabelCreator
 
@@ -16,6 +19,7 @@ class DataExplorator:
         3. Explanatory Data Analysis report
     """
 
+    @InfoTracker.track_stage(inputs=("data",))
     def __init__(self,
                  data: pd.DataFrame,
                  config: ConfigLoader,
@@ -24,10 +28,21 @@ class DataExplorator:
         self.__data = data
         self.__info_tracker = info_tracker
 
+        # In downsampled mode the traces are downsampled to a point budget and rendered with WebGL,
+        # and the multi-resolution chart shows the raw bars too, which only a point budget keeps bounded.
+        # All the charts reference one plotly.js file, written next to them, instead of embedding it.
+        self.__downsampled: bool = config.exploration.chart_mode == "downsampled"
+        self.__scatter = go.Scattergl if self.__downsampled else go.Scatter
+        self.__include_plotlyjs = "directory" if self.__downsampled else True
+
+        # Aggregate the raw data once - every chart reads its resolution from the pyramid.
+        self.__resampling_pyramid = ResamplingPyramid(data=data, config=config)
+
         os.makedirs(config.paths.path2save_exploration, exist_ok=True)
         self.__crate_candlestick_chart()
         self.__plot_multiple_data_resolutions()
-        # self.__create_eda_report()
+        if config.exploration.eda_report:
+            self.__create_eda_report()
 
     @property
     def config(self):
@@ -41,10 +56,13 @@ class DataExplorator:
     def info_tracker(self):
         return self.__info_tracker
 
-    def __filter_data_in_interest(self, start_date: str, end_date: str) -> pd.DataFrame:
-        """ Filter the data based on the start and and end date. """
+    @property
+    def resampling_pyramid(self):
+        return self.__resampling_pyramid
 
-        df = self.data.copy()
+    @staticmethod
+    def __filter_data_in_interest(df: pd.DataFrame, start_date: str, end_date: str) -> pd.DataFrame:
+        """ Filter the given data based on the start and and end date. """
 
         # convert start and end date to datetime
         start_date = pd.to_datetime(start_date, utc=True)
@@ -67,16 +85,31 @@ class DataExplorator:
 
         return filtered_df
 
+    def __downsample(self, df: pd.DataFrame, col: str) -> pd.DataFrame:
+        """ Downsample the rows of the given data, based on the given feature, in downsampled mode only. """
+        exploration = self.config.exploration
+
+        if not self.__downsampled or len(df) <= exploration.max_points:
+            return df
+
+        positions = Downsampler.downsample(
+            method=exploration.downsampling,
+            x=df.index.asi8,
+            y=df[col].to_numpy(),
+            n_points=exploration.max_points
+        )
+        return df.iloc[positions]
+
     def __crate_candlestick_chart(self, start_date: str = "2016-01-01", end_date: str = "2016-04-01") -> None:
 
         dff = self.config.df_features
 
-        # Filter data based on given start and end dates
-        df = self.__filter_data_in_interest(start_date=start_date, end_date=end_date)
+        # Daily Open, High, Low and Close prices from the pyramid
+        df = self.resampling_pyramid.ohlc("D")
 
-        # resample data to daily resolution anad drop rows with nan values
-        df = df.resample("D", label='right', closed='right').last()
-        df.dropna(inplace=True)
+        # Filter data based on given start and end dates and drop days with nan values
+        df = self.__filter_data_in_interest(df=df, start_date=start_date, end_date=end_date)
+        df = df.dropna()
 
         # calculate difference between open and close
         df["diff_oc"] = df[dff.open] - df[dff.close]
@@ -95,8 +128,11 @@ class DataExplorator:
         df["direction"] = 0
         df.loc[df["diff_oc"] < 0, 'direction'] = 1
 
+        # keep the points that preserve the shape of the chart
+        df = self.__downsample(df=df, col="oc_avg")
+
         # make a plotly trace for open and close prices
-        trace_oc = go.Scatter(
+        trace_oc = self.__scatter(
             mode="markers",
             x=df.index,
             y=df["oc_avg"],
@@ -111,7 +147,7 @@ class DataExplorator:
             hoverlabel=dict(
                 bgcolor="#D0D0CE"
             ),
-            marker=go.scatter.Marker(
+            marker=dict(
                 symbol="line-ns",  # A wide (width=5) line represents the box in the candlestick chart
                 opacity=1,
                 size=abs(df["diff_oc"]) * 2,
@@ -124,7 +160,7 @@ class DataExplorator:
         )
 
         # make a plotly trace for high and low
-        trace_hl = go.Scatter(
+        trace_hl = self.__scatter(
             mode="markers",
             x=df.index,
             y=df["oc_avg"],
@@ -139,7 +175,7 @@ class DataExplorator:
             hoverlabel=dict(
                 bgcolor="#D0D0CE"
             ),
-            marker=go.scatter.Marker(
+            marker=dict(
                 symbol="line-ns",  # A thin (width=1) line represents the low-high interval in the candlestick chart
                 size=abs(df["diff_hl"]) * 2,
                 line=dict(
@@ -151,7 +187,7 @@ class DataExplorator:
         )
 
         # make a plotly trace for overall mean of Close-Open price
-        trace_mean = go.Scatter(
+        trace_mean = self.__scatter(
             mode="lines",
             x=df.index,
             y=df["close_avg"],
@@ -210,27 +246,54 @@ class DataExplorator:
 
         # create the figure and save it
         fig = go.Figure(data=[trace_oc, trace_hl, trace_mean], layout=layout)
-        fig.write_html(os.path.join(self.config.paths.path2save_exploration, "candlestick_chart.html"))
+        fig.write_html(
+            os.path.join(self.config.paths.path2save_exploration, "candlestick_chart.html"),
+            include_plotlyjs=self.__include_plotlyjs
+        )
 
     def __plot_multiple_data_resolutions(self,  start_date: str = "", end_date: str = "") -> None:
         """
         Create and save line plot with multiple resolutions of the given data.
-        The resolutions are weekly, monthly, quarterly and yearly.
+        The resolutions are weekly, monthly, quarterly and yearly, together with the raw bars in downsampled mode.
         It can focus on a specific time interval if start and end dates are given.
         """
         dff = self.config.df_features
 
-        # Filter data based on given start and end dates
-        df = self.__filter_data_in_interest(start_date=start_date, end_date=end_date)
-
-        # Prepare weekly, monthly, quarterly and yearly resolutions
-        weekly_res = df.resample('W').mean()
-        monthly_res = df.resample('M').mean()
-        quarter_res = df.resample('BQ').mean()
-        yearly_res = df.resample('Y').mean()
+        # Prepare weekly, monthly, quarterly and yearly resolutions from the pyramid
+        # and filter them based on given start and end dates
+        pyramid = self.resampling_pyramid
+        weekly_res = self.__filter_data_in_interest(pyramid.means('W'), start_date=start_date, end_date=end_date)
+        monthly_res = self.__filter_data_in_interest(pyramid.means('M'), start_date=start_date, end_date=end_date)
+        quarter_res = self.__filter_data_in_interest(pyramid.means('BQ'), start_date=start_date, end_date=end_date)
+        yearly_res = self.__filter_data_in_interest(pyramid.means('Y'), start_date=start_date, end_date=end_date)
+
+        # keep the points that preserve the shape of each resolution
+        weekly_res = self.__downsample(df=weekly_res, col=dff.close)
+        monthly_res = self.__downsample(df=monthly_res, col=dff.close)
+        quarter_res = self.__downsample(df=quarter_res, col=dff.close)
+        yearly_res = self.__downsample(df=yearly_res, col=dff.close)
+
+        traces = []
+
+        # In downsampled mode, add the raw bars - the high frequency series the point budget is meant for
+        if self.__downsampled:
+            raw_res = self.__filter_data_in_interest(self.data[[dff.close]], start_date=start_date, end_date=end_date)
+            raw_res = self.__downsample(df=raw_res, col=dff.close)
+
+            # Create raw resolution trace
+            traces.append(self.__scatter(
+                mode="lines",
+                x=raw_res.index,
+                y=raw_res[dff.close],
+                line=dict(
+                    color="#A2AAAD",
+                    width=1
+                ),
+                name="Raw resolution"
+            ))
 
         # Create weekly resolution trace
-        weekly_trace = go.Scatter(
+        weekly_trace = self.__scatter(
             mode="lines",
             x=weekly_res.index,
             y=weekly_res[dff.close],
@@ -242,7 +305,7 @@ class DataExplorator:
         )
 
         # Create monthly resolution trace
-        monthly_trace = go.Scatter(
+        monthly_trace = self.__scatter(
             mode="lines",
             x=monthly_res.index,
             y=monthly_res[dff.close],
@@ -254,7 +317,7 @@ class DataExplorator:
         )
 
         # Create quarterly resolution trace
-        quarter_trace = go.Scatter(
+        quarter_trace = self.__scatter(
             mode="lines",
             x=quarter_res.index,
             y=quarter_res[dff.close],
@@ -266,7 +329,7 @@ class DataExplorator:
         )
 
         # Create yearly resolution trace
-        yearly_trace = go.Scatter(
+        yearly_trace = self.__scatter(
             mode="lines",
             x=yearly_res.index,
             y=yearly_res[dff.close],
@@ -319,11 +382,23 @@ class DataExplorator:
         )
 
         # create the figure and save it
-        fig = go.Figure(data=[weekly_trace, monthly_trace, quarter_trace, yearly_trace], layout=layout)
-        fig.write_html(os.path.join(self.config.paths.path2save_exploration, "multiple_resolutions_chart.html"))
+        fig = go.Figure(data=traces + [weekly_trace, monthly_trace, quarter_trace, yearly_trace], layout=layout)
+        fig.write_html(
+            os.path.join(self.config.paths.path2save_exploration, "multiple_resolutions_chart.html"),
+            include_plotlyjs=self.__include_plotlyjs
+        )
 
     def __create_eda_report(self) -> None:
-        """ Create Exploratory Data Analysis. """
+        """
+        Create Exploratory Data Analysis.
+        In bounded mode, the core statistics run over the full data and the profiling report on a sample.
+        """
+        if self.config.exploration.eda_mode == "bounded":
+            BoundedEdaProfiler(data=self.data, config=self.config, info_tracker=self.info_tracker)
+            return
+        elif self.config.exploration.eda_mode != "full":
+            raise ValueError("An invalid EDA mode is given.")
+
         df = self.data.copy()
 
         profile = ProfileReport(df, title="Pandas Profiling Report")
@@ -1,11 +1,14 @@
+import numpy as np
 import pandas as pd
 from ..config.config_loading import ConfigLoader
+from ..helper.precision import PrecisionPolicy
 from ..info_tracking.info_tracking import InfoTracker
 from ..data_preprocessing.s4_data_splitting import TrainTestSplitter
 
 
 class LabelCreator:
 
+    @InfoTracker.track_stage(inputs=("data",), outputs=("data", "horizon_labels"))
     def __init__(self,
                  data: pd.DataFrame,
                  config: ConfigLoader,
@@ -14,8 +17,9 @@ class LabelCreator:
         self.__config = config
         self.__info_tracker = info_tracker
 
-        self.__shifted_col: str = "Shifted"
-        self.__diff_col: str = "Diff"
+        # Marks the rows without a valid label, e.g. the last rows of each horizon.
+        self.__invalid_label: int = -1
+        self.__horizon_labels: pd.DataFrame = pd.DataFrame()
 
         self.__create_labels()
 
@@ -31,54 +35,96 @@ class LabelCreator:
     def info_tracker(self):
         return self.__info_tracker
 
-    def __calc_price_difference(self) -> pd.DataFrame:
+    @property
+    def horizon_labels(self):
+        return self.__horizon_labels
+
+    @staticmethod
+    def label_name(label_col: str, horizon: int, tolerance: float) -> str:
+        """ Name of the label feature that corresponds to the given horizon and tolerance. """
+        return f"{label_col}_h{horizon}_t{tolerance}"
+
+    @staticmethod
+    def __calc_price_difference(close: np.ndarray, horizon: int) -> np.ndarray:
         """
-        Create a new feature filled with the shifted Close prices by 1.
-        Use the shifted and original Close features to calculate the percent difference.
-        Add the 2 new features (shifted close and difference %) in the given dataset.
+        Calculate the look-ahead percentage difference of Close price between the timestamp that is
+        "horizon" steps after each timestamp and the timestamp itself, close[t + horizon] / close[t] - 1.
+        The last "horizon" differences are NaN as there is no future price to compare with yet.
         """
-        temp_df = self.data.copy()
-        dff = self.config.df_features
+        diff = np.full(len(close), np.nan)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            diff[:len(close) - horizon] = (close[horizon:] / close[:len(close) - horizon]) - 1
+        return diff
 
-        # Shift Close prices by 1 step
-        temp_df[self.__shifted_col] = temp_df[dff.close].shift(1)
+    @staticmethod
+    def classify(diff: np.ndarray, tollerance: float, invalid_label: int = -1) -> np.ndarray:
+        """
+        Create 3 classes based on the 3 conditions below, considering the tollerance factor.
+        Differences that meet none of the conditions, e.g. NaN values, are marked as invalid.
+        """
+        diff = np.asarray(diff)
+        labels = np.full(diff.shape, invalid_label, dtype=np.int8)
 
-        # Calculate the precentage difference of Close price between the original and shifted timestamps
-        temp_df[self.__diff_col] = (temp_df[dff.close] / temp_df[self.__shifted_col]) - 1
-        return temp_df
+        # condition 1 - BUY if % diff is higher than the tollerance threshold
+        labels[diff > tollerance] = 1
+
+        # condition 2 - SELL if % diff is lower than the tollerance threshold
+        labels[diff < -tollerance] = 0
+
+        # condition 3 - DO NOTHING if % diff is neither lower nor higher than the tollerance threshold
+        labels[(diff < tollerance) & (diff > -tollerance)] = 2
+        return labels
 
     def __create_labels(self) -> None:
         """
-        Call the _calc_price_difference to get the 2 new features (shifted close and % difference).
-        Create 3 classes based on the 3 conditions below and put them into the label feature.
-        To create the classes also consider the tollerance factor (set it up in config).
-        Drop the unused features (shifted close and difference).
-        Drop the row with Nan values generated because of the shifting action.
+        Create the labels of every horizon and tolerance set in config, in one pass over the Close prices.
+        The labels of the first horizon and the main tolerance are the labels used for training.
+        Keep only the rows with a valid training label and no NaN values.
+        The labels of all the horizons and tolerances are kept separately as int8 features.
         """
         config = self.config
-        label_col = config.df_features.labels
+        dff = config.df_features
+        label_col = dff.labels
+        label_config = config.labeltolerance
 
-        # data with shifted prices and price difference features
-        data_with_shift_n_diff = self.__calc_price_difference()
-        df = data_with_shift_n_diff
+        # The labels match the float64 path only if the prices are float64.
+        precision = PrecisionPolicy(config=config)
+        if precision.verify:
+            precision.verify_prices(prices=self.data[dff.close])
 
-        # tollerance factor
-        tollerance = config.labeltolerance.tollerance
+        # Close prices as a plain array - no helper features are added to the data.
+        close = self.data[dff.close].to_numpy(dtype=float)
 
-        # condition 1 - BUY if % diff is higher than the tollerance threshold
-        df.loc[df[self.__diff_col] > tollerance, label_col] = 1
+        # tollerance factors - the main tollerance always comes first
+        tolerances = [label_config.tollerance] + [
+            tol for tol in label_config.tolerances if tol != label_config.tollerance
+        ]
 
-        # condition 2 - SELL if % diff is lower than the tollerance threshold
-        df.loc[df[self.__diff_col] < -tollerance, label_col] = 0
+        horizon_labels = {}
+        for horizon in label_config.horizons:
+            diff = self.__calc_price_difference(close=close, horizon=horizon)
 
-        # condition 3 - DO NOTHING if % diff is neither lower nor higher than the tollerance threshold
-        df.loc[(df[self.__diff_col] < tollerance) &
-               (df[self.__diff_col] > -tollerance), label_col] = 2
+            for tollerance in tolerances:
+                horizon_labels[self.label_name(label_col, horizon, tollerance)] = self.classify(
+                    diff=diff,
+                    tollerance=tollerance,
+                    invalid_label=self.__invalid_label
+                )
 
-        # drop Nan values as well as price difference and shifted columns
-        df.dropna(inplace=True)
+        labels = horizon_labels[self.label_name(label_col, label_config.horizons[0], label_config.tollerance)]
 
-        self.__data = df.drop(columns=[self.__diff_col, self.__shifted_col])
+        # drop rows without a valid label as well as rows with Nan values
+        valid_rows = (labels != self.__invalid_label) & self.data.notna().all(axis=1).to_numpy()
+        valid_rows = np.flatnonzero(valid_rows)
+
+        data = self.data.take(valid_rows)
+        data[label_col] = labels[valid_rows]
+
+        self.__data = data
+        self.__horizon_labels = pd.DataFrame(
+            data={name: values[valid_rows] for name, values in horizon_labels.items()},
+            index=data.index
+        )
 
     def split_data_in_train_test(self) -> TrainTestSplitter:
         return TrainTestSplitter(
@@ -1,13 +1,19 @@
+import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from ..config.config_loading import ConfigLoader
 from ..info_tracking.info_tracking import InfoTracker
 
 from ..data_preprocessing.s5_data_scaling import DataScaler
+from ..data_preprocessing.walk_forward import WalkForwardValidator
 
 
 class TrainTestSplitter:
 
+    @InfoTracker.track_stage(
+        inputs=("data",),
+        outputs=("train_data", "test_data", "train_labels", "test_labels")
+    )
     def __init__(self,
                  data: pd.DataFrame,
                  config: ConfigLoader,
@@ -20,8 +26,14 @@ class TrainTestSplitter:
         self.__test_data: pd.DataFrame = pd.DataFrame()
         self.__train_labels: pd.Series = pd.Series()
         self.__test_labels: pd.Series = pd.Series()
+        self.__folds: list = []
 
-        self.__split_data_into_train_n_test()
+        if config.data_splitting.mode == "holdout":
+            self.__split_data_into_train_n_test()
+        elif config.data_splitting.mode == "walk_forward":
+            self.__split_data_walk_forward()
+        else:
+            raise ValueError("An invalid data splitting mode is given.")
 
     @property
     def config(self):
@@ -47,6 +59,11 @@ class TrainTestSplitter:
     def test_labels(self):
         return self.__test_labels
 
+    @property
+    def folds(self):
+        """ The (train rows, test rows) slices of every walk-forward fold. """
+        return self.__folds
+
     def __separate_data_n_labels(self) -> (pd.DataFrame, pd.Series):
         """ Separate data and labels. Also drop labels from the data dataframe. """
 
@@ -62,7 +79,7 @@ class TrainTestSplitter:
         x_train, x_test, y_train, y_test = train_test_split(
             data,
             labels,
-            test_size=0.3,
+            test_size=self.__config.data_splitting.test_size,
             shuffle=False
         )
         self.__train_data = x_train
@@ -70,6 +87,53 @@ class TrainTestSplitter:
         self.__train_labels = y_train
         self.__test_labels = y_test
 
+    @staticmethod
+    def walk_forward_folds(n_rows: int, n_folds: int, test_size: float, expanding: bool = True) -> list:
+        """
+        Row slices of the walk-forward folds.
+        The last test_size share of the rows is split into n_folds consecutive test blocks. Each fold trains on
+        the rows before its test block - all of them for an expanding window, or as many as the first fold
+        for a rolling window. With one fold, this is the holdout split.
+        """
+        test_rows = int(np.ceil(n_rows * test_size)) // n_folds
+        first_test_start = n_rows - n_folds * test_rows
+
+        if test_rows == 0 or first_test_start <= 0:
+            raise ValueError("There are not enough rows for the walk-forward folds.")
+
+        folds = []
+        for fold in range(n_folds):
+            test_start = first_test_start + fold * test_rows
+            train_start = 0 if expanding else test_start - first_test_start
+            folds.append((slice(train_start, test_start), slice(test_start, test_start + test_rows)))
+        return folds
+
+    def __split_data_walk_forward(self) -> None:
+        """
+        Create the walk-forward folds. The train and test sets of the last fold become the train and test sets
+        of the pipeline, so the following stages run as in the holdout mode.
+        """
+        data, labels = self.__separate_data_n_labels()
+        ds = self.__config.data_splitting
+
+        self.__folds = self.walk_forward_folds(
+            n_rows=len(data),
+            n_folds=ds.n_folds,
+            test_size=ds.test_size,
+            expanding=ds.train_window == "expanding"
+        )
+
+        train_rows, test_rows = self.__folds[-1]
+        self.__train_data = data.iloc[train_rows]
+        self.__test_data = data.iloc[test_rows]
+        self.__train_labels = labels.iloc[train_rows]
+        self.__test_labels = labels.iloc[test_rows]
+
+    def walk_forward(self) -> WalkForwardValidator:
+        """ Iterate over the scaled windows of every walk-forward fold. """
+        data, labels = self.__separate_data_n_labels()
+        return WalkForwardValidator(data=data, labels=labels, folds=self.folds, config=self.config)
+
     def scale_data(self) -> DataScaler:
         return DataScaler(
             config=self.config,
@@ -3,12 +3,18 @@ import pandas as pd
 import joblib
 from sklearn.preprocessing import RobustScaler, MinMaxScaler, StandardScaler
 from ..config.config_loading import ConfigLoader
+from ..helper.precision import PrecisionPolicy
 from ..info_tracking.info_tracking import InfoTracker
+from ..data_preprocessing.streaming_scaler import StreamingScaler
 from ..model_development.BiDirectional_LSTM.sliding_window_for_LSTM import LstmReshaper
 
 
 class DataScaler:
 
+    @InfoTracker.track_stage(
+        inputs=("train_data", "test_data", "train_labels", "test_labels"),
+        outputs=("scaled_train_data", "scaled_test_data")
+    )
     def __init__(self,
                  config: ConfigLoader,
                  train_data: pd.DataFrame,
@@ -20,15 +26,18 @@ class DataScaler:
         self.__train_data = train_data
         self.__test_data = test_data
         self.__info_tracker = info_tracker
+        self.__precision = PrecisionPolicy(config=config)
 
+        self.__scaler = None
         self.__scaled_train_data: pd.DataFrame = pd.DataFrame()
         self.__scaled_test_data: pd.DataFrame = pd.DataFrame()
 
         self.__scale_train_test()
         self.__store_train_test_in_tracking()
 
-        self.__scaled_train_data[config.df_features.labels] = train_labels
-        self.__scaled_test_data[config.df_features.labels] = test_labels
+        labels_dtype = self.__precision.labels_dtype
+        self.__scaled_train_data[config.df_features.labels] = train_labels.astype(labels_dtype)
+        self.__scaled_test_data[config.df_features.labels] = test_labels.astype(labels_dtype)
 
     @property
     def config(self):
@@ -38,6 +47,11 @@ class DataScaler:
     def info_tracker(self):
         return self.__info_tracker
 
+    @property
+    def scaler(self):
+        """ The scaler fitted on the train data. """
+        return self.__scaler
+
     @property
     def scaled_train_data(self):
         return self.__scaled_train_data
@@ -61,35 +75,97 @@ class DataScaler:
             scaler = StandardScaler()
         return scaler
 
+    @staticmethod
+    def scaler_path(config: ConfigLoader) -> str:
+        """ Path of the saved scaler. """
+        scaler_path = os.path.join(
+            config.paths.path2save_models,
+            config.model.name
+        )
+        os.makedirs(scaler_path, exist_ok=True)
+        return os.path.join(scaler_path, f"{config.scaling_method.method}_scaler.pkl")
+
+    @staticmethod
+    def save_scaler(config: ConfigLoader, scaler) -> None:
+        """ Save a fitted scaler, where the streaming mode and the online predictor look for it. """
+        if isinstance(scaler, StreamingScaler):
+            scaler.save(DataScaler.scaler_path(config))
+        else:
+            joblib.dump(scaler, DataScaler.scaler_path(config))
+
+    def __fit_streaming_scaler(self) -> StreamingScaler:
+        """
+        Fit the train data chunk by chunk.
+        A saved scaler state is updated with the train rows newer than the ones it was fitted on, so new days
+        of data do not need a pass over the full history. The state is refitted if it was fitted with another
+        method or other features, or on rows that are not part of the train data any more.
+        """
+        sm = self.config.scaling_method
+        self.info_tracker.scaling_method = sm.method
+        scaler_path = self.scaler_path(self.config)
+
+        scaler = None
+        if os.path.exists(scaler_path):
+            saved = StreamingScaler.load(scaler_path)
+            if (
+                isinstance(saved, StreamingScaler) and
+                saved.is_compatible(method=sm.method, columns=self.__train_data.columns, minmax_range=sm.minmax_range) and
+                saved.last_timestamp is not None and
+                saved.last_timestamp <= self.__train_data.index.max()
+            ):
+                scaler = saved
+
+        if scaler is None:
+            scaler = StreamingScaler(
+                method=sm.method,
+                chunk_size=sm.chunk_size,
+                sketch_size=sm.sketch_size,
+                minmax_range=sm.minmax_range,
+                seed=self.config.lstm_general_params.seed
+            )
+
+        n_rows = scaler.n_rows
+        scaler.update(self.__train_data)
+        print(f"The scaler is fitted on {scaler.n_rows - n_rows} new rows, {scaler.n_rows} rows in total.")
+
+        self.save_scaler(config=self.config, scaler=scaler)
+        return scaler
+
     def __fit_scaler(self):
         """ Fit the train data in the selected scaler. """
 
+        if self.config.scaling_method.mode == "streaming":
+            return self.__fit_streaming_scaler()
+
         # Choose a scaler.
         scaler = self.__choose_scaler()
 
         # Fit the train data ONLY!!!
         scaler.fit(self.__train_data)
 
-        # Prepare path to save scaler.
-        scaler_path = os.path.join(
-            self.config.paths.path2save_models,
-            self.config.model.name
-        )
-        os.makedirs(scaler_path, exist_ok=True)
-
         # Save the fitted scaler
-        joblib.dump(scaler, os.path.join(scaler_path, f"{self.config.scaling_method.method}_scaler.pkl"))
+        self.save_scaler(config=self.config, scaler=scaler)
         return scaler
 
     def __scale_train_test(self):
         """ Scale the train and test data. """
 
         # Get the fitted scaler
-        scaler = self.__fit_scaler()
-
-        # Use the fitted scaled to transform the train and test data
-        scaled_train_data = scaler.transform(self.__train_data)
-        scaled_test_data = scaler.transform(self.__test_data)
+        scaler = self.__scaler = self.__fit_scaler()
+
+        # Use the fitted scaled to transform the train and test data, in the dtype of the precision policy
+        chunk_size = self.config.scaling_method.chunk_size
+        scaled_train_data = self.__precision.transform(scaler, self.__train_data, chunk_size=chunk_size)
+        scaled_test_data = self.__precision.transform(scaler, self.__test_data, chunk_size=chunk_size)
+
+        # Check the reduced precision scaling against the float64 one
+        if self.__precision.verify:
+            max_error = max(
+                self.__precision.verify_scaling(scaler, self.__train_data, scaled_train_data, chunk_size=chunk_size),
+                self.__precision.verify_scaling(scaler, self.__test_data, scaled_test_data, chunk_size=chunk_size)
+            )
+            print(f"The {self.__precision.features_dtype} scaling matches the float64 one "
+                  f"within a relative difference of {max_error:.2e}")
 
         # Convert to Pandas df with timestamps for better control and synchronisation.
         self.__scaled_train_data = pd.DataFrame(data=scaled_train_data, index=self.__train_data.index)
@@ -100,12 +176,13 @@ class DataScaler:
         self.info_tracker.train_data = self.__train_data
         self.info_tracker.test_data = self.__test_data
 
-    def reshape_data_for_modelling(self):
+    def reshape_data_for_modelling(self, materialize: bool = False):
         return LstmReshaper(
             config=self.config,
             info_tracker=self.info_tracker,
             scaled_train_data=self.scaled_train_data,
-            scaled_test_data=self.scaled_test_data
+            scaled_test_data=self.scaled_test_data,
+            materialize=materialize
         )
 
 
@@ -0,0 +1,267 @@
+import os
+import glob
+import typing as t
+from collections import deque
+import joblib
+import numpy as np
+import pandas as pd
+import pyarrow.feather as feather
+from ..config.config_loading import ConfigLoader
+from ..data_preprocessing.s3_labels_creation import LabelCreator
+
+
+class StreamingFeatureState:
+    """
+    Incremental data engineering and labelling of new ticks, without going back to the history.
+    The labels look "horizon" ticks ahead, as in the "LabelCreator" object, so a row is returned only once
+    the ticks of its longest label horizon arrived. The state is the last timestamp, the last value of every
+    feature and the rows that wait for their labels, so each tick costs O(1):
+        - ticks at or before the last timestamp are dropped, which keeps the first tick of every timestamp,
+        - missing values are forward filled with the last value of the feature,
+        - the oldest waiting row is labelled with the Close prices of the ticks after it, and returned.
+    The batch data engineering interpolates between both neighbours of a gap. A stream has no next value yet,
+    so gaps are forward filled instead.
+    """
+
+    def __init__(self, config: ConfigLoader, features: t.Sequence[str]):
+        self.__config = config
+        self.__features = list(features)
+        self.__close_position = self.__features.index(config.df_features.close)
+
+        label_config = config.labeltolerance
+        self.__invalid_label = -1
+        self.__horizons = list(label_config.horizons)
+        self.__tolerances = [label_config.tollerance] + [
+            tol for tol in label_config.tolerances if tol != label_config.tollerance
+        ]
+        self.__main_label = LabelCreator.label_name(
+            config.df_features.labels, self.__horizons[0], label_config.tollerance
+        )
+
+        self.__last_timestamp = None
+        self.__last_values = np.full(len(self.__features), np.nan)
+        # The rows that wait for the ticks of their longest label horizon.
+        self.__pending_timestamps = deque(maxlen=max(self.__horizons))
+        self.__pending_values = deque(maxlen=max(self.__horizons))
+
+        # Tick counters.
+        self.__n_ticks = 0
+        self.__duplicated_ticks = 0
+        self.__late_ticks = 0
+        self.__filled_values = 0
+
+    @classmethod
+    def from_history(cls, config: ConfigLoader, data: pd.DataFrame) -> "StreamingFeatureState":
+        """
+        Create the state that continues from the last rows of the engineered data.
+        The last rows of the history have no labels yet, so they wait for the new ticks and are returned with them.
+        """
+        features = [col for col in data.columns if col != config.df_features.labels]
+        state = cls(config=config, features=features)
+
+        pending = data[features].iloc[-max(state.__horizons):]
+        state.__last_timestamp = data.index[-1]
+        state.__last_values = data[features].iloc[-1].to_numpy(dtype=float)
+        state.__pending_timestamps.extend(pending.index)
+        state.__pending_values.extend(pending.to_numpy(dtype=float))
+        return state
+
+    @property
+    def config(self):
+        return self.__config
+
+    @property
+    def features(self):
+        return self.__features
+
+    @property
+    def last_timestamp(self):
+        return self.__last_timestamp
+
+    @property
+    def counters(self):
+        return {
+            "ticks": self.__n_ticks,
+            "duplicated_ticks": self.__duplicated_ticks,
+            "late_ticks": self.__late_ticks,
+            "filled_values": self.__filled_values
+        }
+
+    def __labels(self, closes: np.ndarray) -> dict:
+        """
+        Labels of every horizon and tolerance of the first of the given Close prices,
+        against the Close prices "horizon" ticks after it.
+        """
+        labels = {}
+        for horizon in self.__horizons:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                diff = closes[horizon] / closes[0] - 1
+
+            for tollerance in self.__tolerances:
+                labels[LabelCreator.label_name(self.config.df_features.labels, horizon, tollerance)] = int(
+                    LabelCreator.classify(diff=diff, tollerance=tollerance, invalid_label=self.__invalid_label)
+                )
+        return labels
+
+    def update(self, timestamp, bar: dict) -> t.Optional[t.Tuple[pd.Timestamp, dict]]:
+        """
+        Engineer one tick and label the oldest waiting row with it. The timestamp of the labelled row and its
+        features, labels and training label are returned, or None if the tick is a duplicate, arrived after
+        a newer one or no row has all the ticks of its labels yet.
+        """
+        timestamp = pd.Timestamp(timestamp)
+        self.__n_ticks += 1
+
+        if self.__last_timestamp is not None and timestamp <= self.__last_timestamp:
+            if timestamp == self.__last_timestamp:
+                self.__duplicated_ticks += 1
+            else:
+                self.__late_ticks += 1
+            return None
+
+        values = np.array([bar.get(col, np.nan) for col in self.__features], dtype=float)
+        missing = np.isnan(values)
+        if missing.any():
+            values[missing] = self.__last_values[missing]
+            self.__filled_values += int(missing.sum())
+
+        result = None
+        if len(self.__pending_values) == self.__pending_values.maxlen:
+            closes = np.array([row[self.__close_position] for row in self.__pending_values]
+                              + [values[self.__close_position]])
+            labels = self.__labels(closes=closes)
+
+            row = dict(zip(self.__features, self.__pending_values[0].tolist()))
+            row.update(labels)
+            row[self.config.df_features.labels] = labels[self.__main_label]
+            result = (self.__pending_timestamps[0], row)
+
+        self.__last_timestamp = timestamp
+        self.__last_values = values
+        self.__pending_timestamps.append(timestamp)
+        self.__pending_values.append(values)
+        return result
+
+    def update_frame(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Engineer a chunk of new ticks at once, e.g. a new day of data, and return the rows labelled with it.
+        The result is the same as updating the state tick by tick, in the order of the chunk.
+        """
+        n_rows = len(data)
+        if n_rows == 0:
+            return pd.DataFrame(columns=self.__features)
+
+        timestamps = data.index.asi8
+        self.__n_ticks += n_rows
+
+        # A tick is kept only if it is newer than the state and than every tick before it in the chunk.
+        newest = np.maximum.accumulate(timestamps)
+        state_newest = self.__last_timestamp.value if self.__last_timestamp is not None else np.iinfo(np.int64).min
+        previous_newest = np.empty(n_rows, dtype=np.int64)
+        previous_newest[0] = state_newest
+        previous_newest[1:] = np.maximum(newest[:-1], state_newest)
+        keep = timestamps > previous_newest
+
+        self.__duplicated_ticks += int(np.sum(timestamps == previous_newest))
+        self.__late_ticks += int(np.sum(timestamps < previous_newest))
+
+        chunk = data.loc[keep, self.__features]
+        if chunk.empty:
+            return chunk
+
+        # Forward fill, starting from the last values of the state.
+        values = chunk.to_numpy(dtype=float)
+        self.__filled_values += int(np.isnan(values).sum())
+        filled = pd.DataFrame(np.vstack([self.__last_values, values])).ffill().to_numpy()[1:]
+
+        # The waiting rows in front of the chunk. Every row that has the ticks of its longest horizon is labelled.
+        index = pd.DatetimeIndex(list(self.__pending_timestamps)).append(chunk.index)
+        rows = np.vstack(list(self.__pending_values) + [filled])
+        n_labelled = max(len(rows) - self.__pending_values.maxlen, 0)
+
+        result = pd.DataFrame(rows[:n_labelled], index=index[:n_labelled], columns=self.__features)
+        closes = rows[:, self.__close_position]
+        for horizon in self.__horizons:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                diff = closes[horizon:horizon + n_labelled] / closes[:n_labelled] - 1
+
+            for tollerance in self.__tolerances:
+                result[LabelCreator.label_name(self.config.df_features.labels, horizon, tollerance)] = \
+                    LabelCreator.classify(diff=diff, tollerance=tollerance, invalid_label=self.__invalid_label)
+
+        result[self.config.df_features.labels] = result[self.__main_label]
+
+        self.__last_timestamp = chunk.index[-1]
+        self.__last_values = filled[-1]
+        self.__pending_timestamps.extend(index[n_labelled:])
+        self.__pending_values.extend(rows[n_labelled:])
+        return result
+
+    def save(self, path: str) -> None:
+        """ Save the state. """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        joblib.dump(self, path)
+
+    @staticmethod
+    def load(path: str) -> "StreamingFeatureState":
+        """ Load a saved state. """
+        return joblib.load(path)
+
+
+class FeatureStore:
+    """
+    Append-only store of engineered and labelled rows, for training.
+    Every append writes one new feather part, so the rows already stored are never read or rewritten.
+    The streaming feature state is kept next to the parts, so appends continue where the last one stopped.
+    """
+
+    def __init__(self, config: ConfigLoader):
+        self.__config = config
+        self.__directory = os.path.join(config.paths.path2save_data, config.model.name, "feature_store")
+
+    @property
+    def config(self):
+        return self.__config
+
+    @property
+    def directory(self):
+        return self.__directory
+
+    @property
+    def state_path(self):
+        return os.path.join(self.__directory, "feature_state.pkl")
+
+    def __part_paths(self) -> list:
+        return sorted(glob.glob(os.path.join(self.__directory, "part-*.feather")))
+
+    def append(self, data: pd.DataFrame, state: StreamingFeatureState) -> int:
+        """
+        Append the rows engineered by the given state and save the state with them.
+        Only the rows with a valid training label and no NaN values are stored, as in the "LabelCreator" object,
+        and only their features and training label. Returns the number of stored rows.
+        """
+        label_col = self.config.df_features.labels
+        data = data[state.features + [label_col]]
+        data = data[(data[label_col] != -1) & data.notna().all(axis=1)]
+
+        if not data.empty:
+            os.makedirs(self.__directory, exist_ok=True)
+            part_path = os.path.join(self.__directory, f"part-{len(self.__part_paths()):06d}.feather")
+            feather.write_feather(data.reset_index(), part_path)
+
+        state.save(self.state_path)
+        return len(data)
+
+    def load(self) -> pd.DataFrame:
+        """ Load all the stored rows. The parts are memory-mapped. """
+        parts = [feather.read_feather(path, memory_map=True) for path in self.__part_paths()]
+        if not parts:
+            return pd.DataFrame()
+        data = pd.concat(parts, ignore_index=True)
+        return data.set_index(data.columns[0])
+
+    def load_state(self) -> t.Optional[StreamingFeatureState]:
+        """ The saved streaming feature state, or None if nothing was appended yet. """
+        if not os.path.isfile(self.state_path):
+            return None
+        return StreamingFeatureState.load(self.state_path)
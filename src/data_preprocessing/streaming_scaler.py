@@ -0,0 +1,199 @@
+import os
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import MinMaxScaler, StandardScaler
+
+
+class QuantileSketch:
+    """
+    Approximate quantiles of a stream with bounded memory, in the style of the KLL sketch.
+    Values are kept in levels of compactors. When a level holds more than the capacity, it is sorted and
+    every other value, starting at a random offset, is promoted to the next level with twice the weight.
+    The memory is O(capacity * log(n / capacity)) and the rank error shrinks as the capacity grows.
+    """
+
+    def __init__(self, capacity: int = 2000, seed: int = None):
+        self.__capacity = capacity
+        self.__rng = np.random.default_rng(seed)
+        self.__levels: list = []
+        self.__count = 0
+
+    @property
+    def count(self):
+        return self.__count
+
+    def __compact(self, level: int) -> None:
+        """ Promote half of the values of a level to the next one. """
+        values = np.sort(self.__levels[level])
+        offset = self.__rng.integers(2)
+
+        if level + 1 == len(self.__levels):
+            self.__levels.append(np.empty(0))
+
+        # An odd value out stays on its level, so the total weight is kept.
+        keep = values[-1:] if len(values) % 2 else values[:0]
+        paired = values[:len(values) - len(keep)]
+        self.__levels[level + 1] = np.concatenate([self.__levels[level + 1], paired[offset::2]])
+        self.__levels[level] = keep
+
+    def update(self, values: np.ndarray) -> None:
+        """ Add the finite values of a chunk to the sketch. """
+        values = np.asarray(values, dtype=float)
+        values = values[np.isfinite(values)]
+        if not len(values):
+            return
+
+        if not self.__levels:
+            self.__levels.append(np.empty(0))
+        self.__levels[0] = np.concatenate([self.__levels[0], values])
+        self.__count += len(values)
+
+        level = 0
+        while level < len(self.__levels):
+            if len(self.__levels[level]) > self.__capacity:
+                self.__compact(level=level)
+            level += 1
+
+    def quantiles(self, q) -> np.ndarray:
+        """ Approximate quantiles, for q in [0, 1]. """
+        values = np.concatenate(self.__levels)
+        weights = np.concatenate([
+            np.full(len(level_values), 2.0 ** level) for level, level_values in enumerate(self.__levels)
+        ])
+        order = np.argsort(values)
+        cumulative = np.cumsum(weights[order])
+
+        # The value at which the cumulative weight first reaches the requested rank.
+        ranks = np.asarray(q, dtype=float) * cumulative[-1]
+        positions = np.minimum(np.searchsorted(cumulative, ranks), len(values) - 1)
+        return values[order][positions]
+
+
+class StreamingScaler:
+    """
+    Scaler fitted chunk by chunk, whose state can be saved and updated with new data later on.
+    The standard and minmax methods use the partial_fit of the scikit-learn scalers, which is exact.
+    The robust method keeps a quantile sketch per feature and scales with the approximate median and IQR.
+    The timestamp of the last fitted row is part of the state, so an update skips the rows already fitted.
+    """
+
+    def __init__(self,
+                 method: str,
+                 chunk_size: int = 100000,
+                 sketch_size: int = 2000,
+                 minmax_range=(0, 1),
+                 seed: int = None):
+        self.__method = method
+        self.__chunk_size = chunk_size
+        self.__minmax_range = minmax_range
+        self.__last_timestamp = None
+        self.__columns = None
+
+        self.__scaler = None
+        self.__sketches = None
+        self.__sketch_size = sketch_size
+        self.__seed = seed
+
+        if method == "minmax":
+            self.__scaler = MinMaxScaler(feature_range=minmax_range)
+        elif method != "robust":
+            self.__scaler = StandardScaler()
+
+    @property
+    def method(self):
+        return self.__method
+
+    @property
+    def columns(self):
+        return self.__columns
+
+    @property
+    def last_timestamp(self):
+        return self.__last_timestamp
+
+    @property
+    def n_rows(self):
+        if self.__sketches is not None:
+            return self.__sketches[0].count
+        return int(np.max(getattr(self.__scaler, "n_samples_seen_", 0)))
+
+    def is_compatible(self, method: str, columns, minmax_range=(0, 1)) -> bool:
+        """ Whether the saved state was fitted with the same method, range and features. """
+        return (
+            self.__method == method and
+            (method != "minmax" or list(self.__minmax_range) == list(minmax_range)) and
+            (self.__columns is None or self.__columns == list(columns))
+        )
+
+    def __partial_fit(self, values: np.ndarray) -> None:
+        """ Fit one chunk of values. """
+        if self.__method != "robust":
+            self.__scaler.partial_fit(values)
+            return
+
+        if self.__sketches is None:
+            self.__sketches = [
+                QuantileSketch(capacity=self.__sketch_size, seed=self.__seed) for _ in range(values.shape[1])
+            ]
+        for i, sketch in enumerate(self.__sketches):
+            sketch.update(values[:, i])
+
+    def update(self, data: pd.DataFrame) -> "StreamingScaler":
+        """ Fit the rows newer than the last fitted timestamp, chunk by chunk. """
+        if self.__columns is None:
+            self.__columns = list(data.columns)
+        elif self.__columns != list(data.columns):
+            raise ValueError("The features differ from the ones the scaler was fitted with.")
+
+        if self.__last_timestamp is not None:
+            # Sorted data is sliced without a copy. Otherwise only the new rows are copied.
+            if data.index.is_monotonic_increasing:
+                data = data.iloc[data.index.searchsorted(self.__last_timestamp, side="right"):]
+            else:
+                data = data.loc[data.index > self.__last_timestamp]
+        if data.empty:
+            return self
+
+        # Only one chunk at a time is converted to float64, so the memory stays bounded by the chunk size.
+        for start in range(0, len(data), self.__chunk_size):
+            self.__partial_fit(values=data.iloc[start:start + self.__chunk_size].to_numpy(dtype=float))
+
+        self.__last_timestamp = data.index.max()
+        return self
+
+    def __robust_center_n_scale(self):
+        """ Median and interquartile range of every feature from the sketches. """
+        quantiles = np.array([sketch.quantiles([0.25, 0.5, 0.75]) for sketch in self.__sketches])
+        scale = quantiles[:, 2] - quantiles[:, 0]
+        # Constant features are left unscaled, as in the RobustScaler.
+        scale[scale == 0] = 1.0
+        return quantiles[:, 1], scale
+
+    def affine_parameters(self) -> (np.ndarray, np.ndarray):
+        """ Multiplier and shift of every feature, so the scaled values are values * multiplier + shift. """
+        if self.__method == "robust":
+            center, scale = self.__robust_center_n_scale()
+            return 1.0 / scale, -center / scale
+        if self.__method == "minmax":
+            return self.__scaler.scale_, self.__scaler.min_
+        return 1.0 / self.__scaler.scale_, -self.__scaler.mean_ / self.__scaler.scale_
+
+    def transform(self, data) -> np.ndarray:
+        """ Scale the data with the fitted state. """
+        values = np.asarray(data, dtype=float)
+        if self.__method != "robust":
+            return self.__scaler.transform(values)
+
+        center, scale = self.__robust_center_n_scale()
+        return (values - center) / scale
+
+    def save(self, path: str) -> None:
+        """ Save the scaler state. """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        joblib.dump(self, path)
+
+    @staticmethod
+    def load(path: str) -> "StreamingScaler":
+        """ Load a saved scaler state. """
+        return joblib.load(path)
@@ -0,0 +1,141 @@
+from dataclasses import dataclass
+import typing as t
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from ..config.config_loading import ConfigLoader
+from ..helper.precision import PrecisionPolicy
+from ..data_preprocessing.streaming_scaler import StreamingScaler
+
+
+@dataclass
+class WalkForwardFold:
+    """ The scaled sliding windows of one walk-forward fold. """
+    fold: int
+    train_rows: slice
+    test_rows: slice
+    train_windows: np.ndarray
+    train_labels: np.ndarray
+    test_windows: np.ndarray
+    test_labels: np.ndarray
+
+
+class WalkForwardValidator:
+    """
+    Walk-forward folds over one shared copy of the data.
+    The sliding window view is built once over a single scaled buffer, and every fold is a slice of it,
+    so the windows of the overlapping segments are never rebuilt or copied.
+    The train and test rows of every fold are rescaled in place with the scaler of the fold, so both are scaled
+    consistently and the last fold matches the train/test split of the pipeline. With an expanding train window,
+    the streaming scaler is only updated with the new train rows of each fold. A rolling train window drops
+    old rows, so its scaler is refitted.
+    The windows of a fold are views over the shared buffer, so they are valid until the next fold is created.
+    """
+
+    def __init__(self,
+                 data: pd.DataFrame,
+                 labels: pd.Series,
+                 folds: t.List[t.Tuple[slice, slice]],
+                 config: ConfigLoader):
+        self.__config = config
+        self.__data = data
+        self.__folds = folds
+
+        window_length = config.lstm_general_params.window_length
+        self.__window_length = window_length
+        # The features keep their dtype and are not copied - the scaler converts them chunk by chunk.
+        self.__features = data.to_numpy(copy=False)
+        self.__targets = labels.to_numpy()
+
+        # One scaled buffer and one window view for all the folds.
+        self.__scaled = np.empty(self.__features.shape, dtype=PrecisionPolicy(config=config).features_dtype)
+        self.__windows = sliding_window_view(self.__scaled, window_shape=window_length, axis=0).swapaxes(1, 2)
+
+    @property
+    def config(self):
+        return self.__config
+
+    @property
+    def folds(self):
+        return self.__folds
+
+    def __create_scaler(self) -> StreamingScaler:
+        sm = self.config.scaling_method
+        return StreamingScaler(
+            method=sm.method,
+            chunk_size=sm.chunk_size,
+            sketch_size=sm.sketch_size,
+            minmax_range=sm.minmax_range,
+            seed=self.config.lstm_general_params.seed
+        )
+
+    def __scale_rows(self, scaler: StreamingScaler, rows: slice) -> None:
+        """ Scale the given rows into the shared buffer, chunk by chunk. """
+        chunk_size = self.config.scaling_method.chunk_size
+        for start in range(rows.start, rows.stop, chunk_size):
+            stop = min(start + chunk_size, rows.stop)
+            self.__scaled[start:stop] = scaler.transform(self.__features[start:stop])
+
+    def __windows_of(self, rows: slice) -> (np.ndarray, np.ndarray):
+        """
+        The windows and labels of a segment, as in the sliding window process of the "LstmReshaper" object.
+        The last window of the segment is skipped and the label of a window is the label of its last row.
+        """
+        start = rows.start
+        stop = max(rows.stop - self.__window_length, start)
+        labels = self.__targets[start + self.__window_length - 1:stop + self.__window_length - 1]
+        return self.__windows[start:stop], labels
+
+    def __iter__(self) -> t.Iterator[WalkForwardFold]:
+        expanding = self.config.data_splitting.train_window == "expanding"
+        scaler = self.__create_scaler()
+        fitted_until = 0
+
+        for fold, (train_rows, test_rows) in enumerate(self.__folds):
+            if expanding:
+                # Fit the train rows the scaler has not seen yet.
+                scaler.update(self.__data.iloc[fitted_until:train_rows.stop])
+            else:
+                # Refit on the rolling train rows.
+                scaler = self.__create_scaler()
+                scaler.update(self.__data.iloc[train_rows])
+            fitted_until = train_rows.stop
+
+            # Rescale the train and test rows of this fold with the scaler of the fold.
+            self.__scale_rows(scaler=scaler, rows=slice(train_rows.start, test_rows.stop))
+
+            train_windows, train_labels = self.__windows_of(rows=train_rows)
+            test_windows, test_labels = self.__windows_of(rows=test_rows)
+
+            yield WalkForwardFold(
+                fold=fold,
+                train_rows=train_rows,
+                test_rows=test_rows,
+                train_windows=train_windows,
+                train_labels=train_labels,
+                test_windows=test_windows,
+                test_labels=test_labels
+            )
+
+    def __len__(self):
+        return len(self.__folds)
+
+    def verify_last_fold(self, scaled_test_data: pd.DataFrame) -> float:
+        """
+        Check that the last fold is the train/test split of the pipeline. The folds are walked through and
+        the scaled test rows of the last fold are compared with the scaled test data of the "DataScaler".
+        The largest difference relative to the "DataScaler" values is returned, or an error is raised
+        if it exceeds the tolerance.
+        """
+        for _ in self:
+            pass
+
+        test_rows = self.__folds[-1][1]
+        reference = scaled_test_data.iloc[:, :self.__scaled.shape[1]].to_numpy(dtype=np.float64)
+        error = np.abs(self.__scaled[test_rows] - reference) / (1 + np.abs(reference))
+        max_error = float(np.nanmax(error, initial=0.0))
+
+        if max_error > self.config.precision.tolerance:
+            raise ValueError(f"The last walk-forward fold differs from the scaled test data by {max_error:.2e}, "
+                             f"more than the tolerance.")
+        return max_error
@@ -0,0 +1,81 @@
+import numpy as np
+
+
+class Downsampler:
+    """
+    Shape-preserving downsampling of chart traces to a point budget.
+    Every method returns the sorted positions of the points to keep, so any feature that
+    belongs to the trace (hover data, marker sizes, colours) can be taken at the same positions.
+    """
+
+    @staticmethod
+    def lttb(x: np.ndarray, y: np.ndarray, n_points: int) -> np.ndarray:
+        """
+        Largest-Triangle-Three-Buckets.
+        Keeps the first and last points and, from each bucket in between, the point that forms the largest
+        triangle with the point kept from the previous bucket and the average point of the next bucket.
+        """
+        n_rows = len(y)
+        if n_points >= n_rows or n_points < 3:
+            return np.arange(n_rows)
+
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+
+        # Bucket edges for the points between the first and the last one.
+        edges = np.linspace(1, n_rows - 1, n_points - 1).astype(int)
+
+        positions = np.empty(n_points, dtype=int)
+        positions[0] = 0
+        positions[-1] = n_rows - 1
+        previous = 0
+
+        for i in range(n_points - 2):
+            start, stop = edges[i], edges[i + 1]
+
+            # Average point of the next bucket - the last point for the last bucket.
+            next_start, next_stop = stop, edges[i + 2] if i + 2 < len(edges) else n_rows
+            avg_x = x[next_start:next_stop].mean()
+            avg_y = y[next_start:next_stop].mean()
+
+            # Twice the triangle area between the previous point, every bucket point and the next average.
+            areas = np.abs(
+                (x[previous] - avg_x) * (y[start:stop] - y[previous]) -
+                (x[previous] - x[start:stop]) * (avg_y - y[previous])
+            )
+            previous = start + int(np.argmax(areas))
+            positions[i + 1] = previous
+
+        return positions
+
+    @staticmethod
+    def min_max(y: np.ndarray, n_points: int) -> np.ndarray:
+        """ Keeps the lowest and the highest point of each bucket, so every spike survives the downsampling. """
+        n_rows = len(y)
+        if n_points >= n_rows or n_points < 2:
+            return np.arange(n_rows)
+
+        y = np.asarray(y, dtype=float)
+        edges = np.linspace(0, n_rows, n_points // 2 + 1).astype(int)
+
+        positions = []
+        for start, stop in zip(edges[:-1], edges[1:]):
+            if stop > start:
+                bucket = y[start:stop]
+                positions.extend([start + int(np.argmin(bucket)), start + int(np.argmax(bucket))])
+
+        return np.unique(positions)
+
+    @classmethod
+    def downsample(cls, method: str, x: np.ndarray, y: np.ndarray, n_points: int) -> np.ndarray:
+        """ Downsample with the given method, lttb or minmax. Points with NaN values are left out. """
+        y = np.asarray(y, dtype=float)
+        finite = np.flatnonzero(np.isfinite(y))
+
+        if method == "lttb":
+            positions = cls.lttb(x=np.asarray(x)[finite], y=y[finite], n_points=n_points)
+        elif method == "minmax":
+            positions = cls.min_max(y=y[finite], n_points=n_points)
+        else:
+            raise ValueError("An invalid downsampling method is given.")
+        return finite[positions]
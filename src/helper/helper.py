@@ -1,5 +1,21 @@
+import os
+import sys
+import threading
+import tracemalloc
+from contextlib import contextmanager
 import yaml
 
+try:
+    import resource
+except ImportError:
+    # The resource module is not available on Windows.
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
 
 class Helper:
     """ A class that contains all the helper functions. """
@@ -11,3 +27,87 @@ class Helper:
             constent = yaml.load(file, Loader=yaml.FullLoader)
             file.close()
         return constent
+
+    @staticmethod
+    @contextmanager
+    def measure_peak_memory():
+        """
+        Measures the peak memory allocated while the context is active, including NumPy arrays.
+        Yields a dictionary that holds the peak in bytes, once the context exits.
+        """
+        already_tracing = tracemalloc.is_tracing()
+        if not already_tracing:
+            tracemalloc.start()
+        start_memory, _ = tracemalloc.get_traced_memory()
+        memory = {"peak": 0}
+        try:
+            yield memory
+        finally:
+            _, peak_memory = tracemalloc.get_traced_memory()
+            memory["peak"] = max(peak_memory - start_memory, 0)
+            if not already_tracing:
+                tracemalloc.stop()
+
+    @staticmethod
+    def peak_rss_bytes():
+        """ Returns the peak resident set size of the current process in bytes, or None if it cannot be measured. """
+        if resource is not None:
+            peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            # The peak RSS is in bytes on macOS and in kilobytes on Linux.
+            return peak_rss if sys.platform == "darwin" else peak_rss * 1024
+        if psutil is not None:
+            return getattr(psutil.Process().memory_info(), "peak_wset", None)
+        return None
+
+    @staticmethod
+    def current_rss_bytes(process=None):
+        """ Returns the resident set size of the current process in bytes, or None if it cannot be measured. """
+        if psutil is not None:
+            return (process or psutil.Process()).memory_info().rss
+        try:
+            with open("/proc/self/statm") as file:
+                return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError, AttributeError):
+            return None
+
+    @staticmethod
+    @contextmanager
+    def measure_peak_rss(interval: float = 0.005):
+        """
+        Measures the peak resident set size while the context is active, by sampling it in a background thread.
+        Unlike the high-water mark of the process, the peak belongs to the context only, and it adds no overhead
+        to the allocations. Spikes shorter than the sampling interval may be missed.
+        Yields a dictionary that holds the RSS at the start and the peak in bytes, or None if the RSS cannot
+        be measured, once the context exits.
+        """
+        process = psutil.Process() if psutil is not None else None
+        memory = {"start": Helper.current_rss_bytes(process), "peak": None}
+        if memory["start"] is None:
+            yield memory
+            return
+
+        peak = [memory["start"]]
+        stop = threading.Event()
+
+        def sample():
+            while not stop.wait(interval):
+                peak[0] = max(peak[0], Helper.current_rss_bytes(process))
+
+        thread = threading.Thread(target=sample, daemon=True)
+        thread.start()
+        try:
+            yield memory
+        finally:
+            stop.set()
+            thread.join()
+            memory["peak"] = max(peak[0], Helper.current_rss_bytes(process))
+
+    @staticmethod
+    def available_memory_bytes():
+        """ Returns the memory available to new processes in bytes, or None if it cannot be measured. """
+        if psutil is not None:
+            return psutil.virtual_memory().available
+        try:
+            return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+        except (ValueError, OSError, AttributeError):
+            return None
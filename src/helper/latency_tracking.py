@@ -0,0 +1,39 @@
+import numpy as np
+
+
+class LatencyTracker:
+    """
+    Latencies of the most recent calls, kept in a preallocated ring buffer.
+    Recording is O(1) and allocation free, so it can sit on the hot path. Percentiles are computed on request.
+    """
+
+    def __init__(self, capacity: int = 10000):
+        self.__latencies = np.zeros(capacity, dtype=np.float64)
+        self.__position = 0
+        self.__count = 0
+
+    @property
+    def count(self):
+        """ Number of calls recorded since the start. """
+        return self.__count
+
+    def record(self, seconds: float) -> None:
+        """ Record the latency of one call. """
+        self.__latencies[self.__position] = seconds
+        self.__position = (self.__position + 1) % len(self.__latencies)
+        self.__count += 1
+
+    def summary(self) -> dict:
+        """ p50, p99, mean and max latency of the recent calls, in milliseconds. """
+        latencies = self.__latencies[:min(self.__count, len(self.__latencies))] * 1000
+        if not len(latencies):
+            return {"count": 0}
+
+        p50, p99 = np.percentile(latencies, [50, 99])
+        return {
+            "count": self.__count,
+            "p50_ms": float(p50),
+            "p99_ms": float(p99),
+            "mean_ms": float(latencies.mean()),
+            "max_ms": float(latencies.max())
+        }
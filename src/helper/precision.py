@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+
+class PrecisionPolicy:
+    """
+    The dtypes of the pipeline stages.
+    Prices stay float64 up to the labels, so the percentage differences are exact. The scaled features and the
+    windows use the features dtype, float32 by default as Keras trains in float32 anyway, which halves the memory
+    and the bandwidth of the scaling and windowing stages. The labels are int8.
+    """
+
+    def __init__(self, config):
+        self.__config = config
+        pparams = config.precision
+
+        if pparams.features not in ("float32", "float64"):
+            raise ValueError("An invalid features dtype is given.")
+        self.__features_dtype = np.dtype(pparams.features)
+        self.__labels_dtype = np.dtype(np.int8)
+
+    @property
+    def config(self):
+        return self.__config
+
+    @property
+    def features_dtype(self):
+        return self.__features_dtype
+
+    @property
+    def labels_dtype(self):
+        return self.__labels_dtype
+
+    @property
+    def verify(self):
+        """ Whether the reduced precision results are checked against the float64 path. """
+        return self.__config.precision.verify and self.__features_dtype != np.float64
+
+    def transform(self, scaler, data: pd.DataFrame, chunk_size: int) -> np.ndarray:
+        """
+        Scale the data into an array of the features dtype.
+        The scaler works in float64 on one chunk at a time, so a full float64 copy of the data is never created.
+        """
+        if self.__features_dtype == np.float64:
+            return scaler.transform(data)
+
+        scaled = np.empty(data.shape, dtype=self.__features_dtype)
+        for start in range(0, len(data), chunk_size):
+            scaled[start:start + chunk_size] = scaler.transform(data.iloc[start:start + chunk_size])
+        return scaled
+
+    def verify_scaling(self, scaler, data: pd.DataFrame, scaled: np.ndarray, chunk_size: int) -> float:
+        """
+        Compare the scaled data with the float64 scaling, chunk by chunk.
+        The largest difference relative to the float64 values is returned, or an error is raised
+        if it exceeds the tolerance.
+        """
+        max_error = 0.0
+        for start in range(0, len(data), chunk_size):
+            reference = np.asarray(scaler.transform(data.iloc[start:start + chunk_size]), dtype=np.float64)
+            error = np.abs(scaled[start:start + chunk_size] - reference) / (1 + np.abs(reference))
+            max_error = max(max_error, float(np.nanmax(error, initial=0.0)))
+
+        if max_error > self.__config.precision.tolerance:
+            raise ValueError(f"The {self.__features_dtype} scaled features differ from the float64 ones "
+                             f"by {max_error:.2e}, more than the tolerance.")
+        return max_error
+
+    def verify_prices(self, prices: pd.Series) -> None:
+        """ The labels match the float64 path only if the prices they are computed from are float64. """
+        if prices.dtype != np.float64:
+            raise ValueError(f"The prices are {prices.dtype}. They must be float64 for exact percentage differences.")
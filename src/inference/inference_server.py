@@ -0,0 +1,84 @@
+import json
+import asyncio
+from ..config.config_loading import ConfigLoader
+from ..inference.online_predictor import OnlinePredictor
+
+
+class InferenceServer:
+    """
+    Minimal asyncio HTTP/1.1 endpoint in front of the online predictor, for local clients.
+        POST /predict   body: one bar as a JSON object of features   ->  {"prediction": class or null}
+        GET  /metrics   ->  p50/p99 latency of the recent predictions
+    Connections are kept alive, so a client streaming bars pays the connection set-up once.
+    The bars of all the clients go through one predictor, in the order they arrive.
+    """
+
+    def __init__(self, config: ConfigLoader, predictor: OnlinePredictor = None):
+        self.__config = config
+        self.__predictor = predictor if predictor is not None else OnlinePredictor(config=config)
+
+    @property
+    def config(self):
+        return self.__config
+
+    @property
+    def predictor(self):
+        return self.__predictor
+
+    @staticmethod
+    def __response(status: str, body: dict) -> bytes:
+        payload = json.dumps(body).encode()
+        head = (
+            f"HTTP/1.1 {status}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            f"Connection: keep-alive\r\n\r\n"
+        )
+        return head.encode() + payload
+
+    def __route(self, method: str, path: str, body: bytes) -> bytes:
+        """ Run the request and create its response. """
+        if method == "POST" and path == "/predict":
+            try:
+                prediction = self.__predictor.update(json.loads(body))
+            except (ValueError, KeyError) as error:
+                return self.__response("400 Bad Request", {"error": f"Invalid bar: {error}"})
+            return self.__response("200 OK", {"prediction": prediction, "bars": self.__predictor.n_bars})
+
+        if method == "GET" and path == "/metrics":
+            return self.__response("200 OK", self.__predictor.latency.summary())
+
+        return self.__response("404 Not Found", {"error": f"Unknown endpoint {method} {path}"})
+
+    async def __handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """ Serve the requests of one connection until the client closes it. """
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except asyncio.IncompleteReadError:
+                    break
+
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                method, path, _ = request_line.split(" ", 2)
+                headers = {
+                    name.strip().lower(): value.strip()
+                    for name, _, value in (line.partition(":") for line in header_lines if line)
+                }
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                writer.write(self.__route(method=method, path=path, body=body))
+                await writer.drain()
+
+                if headers.get("connection", "").lower() == "close":
+                    break
+        finally:
+            writer.close()
+
+    async def serve(self) -> None:
+        """ Serve until cancelled. """
+        iparams = self.config.inference
+        server = await asyncio.start_server(self.__handle_connection, host=iparams.host, port=iparams.port)
+        print(f"Serving predictions on http://{iparams.host}:{iparams.port}")
+        async with server:
+            await server.serve_forever()
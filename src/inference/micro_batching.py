@@ -0,0 +1,185 @@
+import time
+import typing as t
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import tensorflow as tf
+from ..config.config_loading import ConfigLoader
+from ..helper.latency_tracking import LatencyTracker
+from ..model_development.BiDirectional_LSTM.model_and_tuner_building import BiLstmBuilder
+
+
+class MicroBatchPredictor:
+    """
+    Score the windows of many instruments with batched forward passes.
+    Windows have the (window length, features) shape of one row of the "LstmReshaper" output.
+    Requests are queued, and a batch is closed when it is full or when its oldest request has waited
+    max_delay_ms. The batch is stacked into a preallocated array, scored in one forward pass and the
+    predicted classes are handed back to the waiting requests.
+    The forward pass runs in a worker thread, so new requests keep queueing while a batch is scored.
+    Windows of the wrong shape or dtype are rejected before they are queued, and a window that still cannot be
+    stacked fails its own request only.
+    """
+
+    def __init__(self, config: ConfigLoader, predict_fn: t.Callable[[np.ndarray], np.ndarray] = None):
+        self.__config = config
+        iparams = config.inference
+
+        self.__max_batch_size = iparams.max_batch_size
+        self.__max_delay = iparams.max_delay_ms / 1000
+        # Shape of one window, taken from the model or else from the first window that is queued.
+        self.__window_shape: t.Optional[tuple] = None
+        self.__predict_fn = predict_fn if predict_fn is not None else self.__load_model()
+
+        self.__queue: t.Optional[asyncio.Queue] = None
+        self.__batch: t.Optional[np.ndarray] = None
+        self.__executor = ThreadPoolExecutor(max_workers=1)
+
+        # Batching metrics.
+        self.__queue_delay = LatencyTracker(capacity=iparams.latency_window)
+        self.__forward_pass = LatencyTracker(capacity=iparams.latency_window)
+        self.__n_batches = 0
+        self.__n_windows = 0
+
+    @property
+    def config(self):
+        return self.__config
+
+    def __load_model(self) -> t.Callable[[np.ndarray], np.ndarray]:
+        """ Load the best model, traced once for batches of any size. """
+        model = tf.keras.models.load_model(BiLstmBuilder.best_model_path(self.config), compile=False)
+
+        self.__window_shape = tuple(model.input_shape[1:])
+        signature = [tf.TensorSpec(shape=(None,) + self.__window_shape, dtype=tf.float32)]
+
+        @tf.function(input_signature=signature)
+        def predict(windows: tf.Tensor) -> tf.Tensor:
+            return model(windows, training=False)
+
+        return lambda windows: predict(windows).numpy()
+
+    def __forward_pass_on(self, windows: np.ndarray) -> np.ndarray:
+        """ Predict the classes of a stacked batch. """
+        start_time = time.perf_counter()
+        classes = np.argmax(self.__predict_fn(windows), axis=1)
+        self.__forward_pass.record(time.perf_counter() - start_time)
+        return classes
+
+    def predict_many(self, windows: t.Union[np.ndarray, t.Dict[str, np.ndarray]]) -> t.Union[np.ndarray, dict]:
+        """
+        Score windows that are all available at once, e.g. every instrument at the close of a bar,
+        in batches of the maximum batch size. Windows are given as a 3D array or as a dict by instrument.
+        """
+        if isinstance(windows, dict):
+            instruments = list(windows)
+            classes = self.predict_many(np.stack([windows[name] for name in instruments]))
+            return dict(zip(instruments, classes.tolist()))
+
+        windows = np.asarray(windows, dtype=np.float32)
+        classes = [
+            self.__forward_pass_on(windows[start:start + self.__max_batch_size])
+            for start in range(0, len(windows), self.__max_batch_size)
+        ]
+        self.__n_batches += len(classes)
+        self.__n_windows += len(windows)
+        return np.concatenate(classes) if classes else np.empty(0, dtype=np.int64)
+
+    def __validate(self, window) -> np.ndarray:
+        """ Check that a window is a numeric array of the window shape. """
+        window = np.asarray(window)
+        if not (np.issubdtype(window.dtype, np.number) or window.dtype == bool):
+            raise TypeError(f"The window has the non-numeric dtype {window.dtype}.")
+        if window.ndim != 2:
+            raise ValueError(f"The window must be 2D (window length, features), but has the shape {window.shape}.")
+        if self.__window_shape is None:
+            self.__window_shape = window.shape
+        elif window.shape != self.__window_shape:
+            raise ValueError(f"The window has the shape {window.shape} instead of {self.__window_shape}.")
+        return window
+
+    async def predict(self, instrument: str, window: np.ndarray) -> int:
+        """ Queue the window of an instrument and wait for its predicted class. """
+        if self.__queue is None:
+            raise RuntimeError("The batching loop is not running. Start it with run().")
+
+        window = self.__validate(window)
+        future = asyncio.get_running_loop().create_future()
+        await self.__queue.put((instrument, window, future, time.perf_counter()))
+        return await future
+
+    async def __collect_batch(self) -> list:
+        """ Wait for the first request, then for more until the batch is full or the deadline has passed. """
+        first = await self.__queue.get()
+        requests = [first]
+        deadline = first[3] + self.__max_delay
+
+        while len(requests) < self.__max_batch_size:
+            # Requests that are already queued join the batch even after the deadline.
+            if not self.__queue.empty():
+                requests.append(self.__queue.get_nowait())
+                continue
+
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                requests.append(await asyncio.wait_for(self.__queue.get(), timeout=timeout))
+            except asyncio.TimeoutError:
+                break
+        return requests
+
+    async def run(self) -> None:
+        """ Batching loop. Run it as a task next to the requests, until it is cancelled. """
+        self.__queue = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+
+        while True:
+            requests = await self.__collect_batch()
+            start_time = time.perf_counter()
+            for request in requests:
+                self.__queue_delay.record(start_time - request[3])
+
+            # Stack the windows into the preallocated batch array. A window that cannot be stacked fails alone.
+            if self.__batch is None:
+                self.__batch = np.empty((self.__max_batch_size,) + self.__window_shape, dtype=np.float32)
+            stacked = []
+            for request in requests:
+                try:
+                    self.__batch[len(stacked)] = request[1]
+                except Exception as error:
+                    if not request[2].done():
+                        request[2].set_exception(error)
+                    continue
+                stacked.append(request)
+
+            requests, n_requests = stacked, len(stacked)
+            if not n_requests:
+                continue
+
+            try:
+                classes = await loop.run_in_executor(
+                    self.__executor, self.__forward_pass_on, self.__batch[:n_requests]
+                )
+            except Exception as error:
+                for request in requests:
+                    if not request[2].done():
+                        request[2].set_exception(error)
+                continue
+
+            self.__n_batches += 1
+            self.__n_windows += n_requests
+            for request, prediction in zip(requests, classes.tolist()):
+                if not request[2].done():
+                    request[2].set_result(prediction)
+
+    def metrics(self) -> dict:
+        """ Batching efficiency, queueing delay and forward pass latency. """
+        mean_batch_size = self.__n_windows / self.__n_batches if self.__n_batches else 0.0
+        return {
+            "batches": self.__n_batches,
+            "windows": self.__n_windows,
+            "mean_batch_size": mean_batch_size,
+            "batch_fill_ratio": mean_batch_size / self.__max_batch_size,
+            "queue_delay": self.__queue_delay.summary(),
+            "forward_pass": self.__forward_pass.summary()
+        }
@@ -0,0 +1,150 @@
+import os
+import time
+import typing as t
+import joblib
+import numpy as np
+import tensorflow as tf
+from sklearn.preprocessing import RobustScaler, MinMaxScaler, StandardScaler
+from ..config.config_loading import ConfigLoader
+from ..helper.latency_tracking import LatencyTracker
+from ..data_preprocessing.streaming_scaler import StreamingScaler
+from ..model_development.BiDirectional_LSTM.model_and_tuner_building import BiLstmBuilder
+
+
+class OnlinePredictor:
+    """
+    Predict the class of every incoming bar with the saved scaler and the best BiLSTM of the search.
+    The scaler and the model are loaded once. The model runs as a traced graph with a fixed input shape,
+    so a prediction does not go through the Keras predict loop.
+    The last window_length scaled bars are kept in a preallocated ring buffer of twice the window length.
+    Every bar is written twice, window_length rows apart, so the current window is always one contiguous
+    slice of the buffer and no bar is copied or shifted when a new one arrives.
+    """
+
+    def __init__(self, config: ConfigLoader):
+        self.__config = config
+        gparams = config.lstm_general_params
+
+        self.__scaler = self.__load_scaler()
+        self.__features = self.__find_feature_order()
+        self.__multiplier, self.__shift = self.__affine_parameters()
+
+        self.__window_length = gparams.window_length
+        self.__buffer = np.zeros((2 * self.__window_length, len(self.__features)), dtype=np.float32)
+        self.__position = 0
+        self.__n_bars = 0
+        self.__last_prediction: t.Optional[int] = None
+
+        self.__predict = self.__load_model()
+        self.__latency = LatencyTracker(capacity=config.inference.latency_window)
+
+    @property
+    def config(self):
+        return self.__config
+
+    @property
+    def features(self):
+        return self.__features
+
+    @property
+    def n_bars(self):
+        return self.__n_bars
+
+    @property
+    def last_prediction(self):
+        return self.__last_prediction
+
+    @property
+    def latency(self):
+        return self.__latency
+
+    def __load_scaler(self):
+        """ Load the scaler fitted on the train data. """
+        scaler_path = os.path.join(
+            self.config.paths.path2save_models,
+            self.config.model.name,
+            f"{self.config.scaling_method.method}_scaler.pkl"
+        )
+        return joblib.load(scaler_path)
+
+    def __find_feature_order(self) -> list:
+        """ Features in the order the scaler was fitted with. """
+        if isinstance(self.__scaler, StreamingScaler):
+            return list(self.__scaler.columns)
+        if hasattr(self.__scaler, "feature_names_in_"):
+            return list(self.__scaler.feature_names_in_)
+
+        dff = self.config.df_features
+        return [dff.open, dff.high, dff.low, dff.close]
+
+    def __affine_parameters(self) -> (np.ndarray, np.ndarray):
+        """
+        Multiplier and shift of every feature, so a bar is scaled with one multiply-add
+        instead of a call to the scaler.
+        """
+        scaler = self.__scaler
+        if isinstance(scaler, StreamingScaler):
+            multiplier, shift = scaler.affine_parameters()
+        elif isinstance(scaler, MinMaxScaler):
+            multiplier, shift = scaler.scale_, scaler.min_
+        elif isinstance(scaler, RobustScaler):
+            multiplier, shift = 1.0 / scaler.scale_, -scaler.center_ / scaler.scale_
+        elif isinstance(scaler, StandardScaler):
+            multiplier, shift = 1.0 / scaler.scale_, -scaler.mean_ / scaler.scale_
+        else:
+            raise ValueError("An unsupported scaler is given.")
+        return np.asarray(multiplier, dtype=np.float32), np.asarray(shift, dtype=np.float32)
+
+    def __load_model(self) -> t.Callable:
+        """ Load the best model and trace it once for a single window, so the first bar is not slower. """
+        model = tf.keras.models.load_model(BiLstmBuilder.best_model_path(self.config), compile=False)
+
+        @tf.function(input_signature=[
+            tf.TensorSpec(shape=(1, self.__window_length, len(self.__features)), dtype=tf.float32)
+        ])
+        def predict(window: tf.Tensor) -> tf.Tensor:
+            return model(window, training=False)
+
+        predict(tf.zeros((1, self.__window_length, len(self.__features)), dtype=tf.float32))
+        return predict
+
+    def __append(self, values: np.ndarray) -> None:
+        """ Scale a bar and write it at its ring buffer position and one window length after it. """
+        scaled = values * self.__multiplier + self.__shift
+        self.__buffer[self.__position] = scaled
+        self.__buffer[self.__position + self.__window_length] = scaled
+        self.__position = (self.__position + 1) % self.__window_length
+        self.__n_bars += 1
+
+    def __window(self) -> np.ndarray:
+        """ The last window_length bars, oldest first, as a contiguous view of the buffer. """
+        return self.__buffer[self.__position:self.__position + self.__window_length]
+
+    def update(self, bar: t.Union[dict, t.Sequence[float]]) -> t.Optional[int]:
+        """
+        Add a bar and predict its class. Bars are given as a dict of features or as values in feature order.
+        Nothing is predicted until window_length bars have arrived.
+        """
+        start_time = time.perf_counter()
+
+        if isinstance(bar, dict):
+            values = np.fromiter((bar[col] for col in self.__features), dtype=np.float32, count=len(self.__features))
+        else:
+            values = np.asarray(bar, dtype=np.float32)
+        self.__append(values=values)
+
+        if self.__n_bars < self.__window_length:
+            return None
+
+        probabilities = self.__predict(self.__window()[np.newaxis])
+        self.__last_prediction = int(np.argmax(probabilities.numpy()[0]))
+
+        self.__latency.record(time.perf_counter() - start_time)
+        return self.__last_prediction
+
+    def reset(self) -> None:
+        """ Forget the buffered bars, e.g. after a gap in the data. """
+        self.__buffer[:] = 0
+        self.__position = 0
+        self.__n_bars = 0
+        self.__last_prediction = None
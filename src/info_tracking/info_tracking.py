@@ -1,5 +1,12 @@
+import os
+import csv
+import json
+import time
+import inspect
+import functools
 import pandas as pd
 import numpy as np
+from ..helper.helper import Helper
 
 
 class InfoTracker:
@@ -7,9 +14,11 @@ class InfoTracker:
     def __init__(self):
         self.__duplicated_values: int = None
         self.__missing_values: dict = None
+        self.__engineering_peak_memory: int = None
         self.__scaling_method: str = None
         self.__train_data: pd.DataFrame = None
         self.__test_data: pd.DataFrame = None
+        self.__stage_reports: list = []
 
     @property
     def duplicated_values(self):
@@ -27,6 +36,14 @@ class InfoTracker:
     def missing_values(self, value: dict):
         self.__missing_values = value
 
+    @property
+    def engineering_peak_memory(self):
+        return self.__engineering_peak_memory
+
+    @engineering_peak_memory.setter
+    def engineering_peak_memory(self, value: int):
+        self.__engineering_peak_memory = value
+
     @property
     def scaling_method(self):
         return self.__scaling_method
@@ -50,3 +67,86 @@ class InfoTracker:
     @test_data.setter
     def test_data(self, value: pd.DataFrame):
         self.__test_data = value
+
+    @property
+    def stage_reports(self):
+        return self.__stage_reports
+
+    def add_stage_report(self, report: dict) -> None:
+        self.__stage_reports.append(report)
+
+    @staticmethod
+    def __measure_size(obj) -> (int, int):
+        """ Number of rows and size in bytes of a data frame, series, array or window generator. """
+        if obj is None:
+            return 0, 0
+        if isinstance(obj, pd.DataFrame):
+            return len(obj), int(obj.memory_usage(index=True, deep=False).sum())
+        if isinstance(obj, pd.Series):
+            return len(obj), int(obj.memory_usage(index=True, deep=False))
+
+        shape = getattr(obj, "shape", None)
+        rows = int(shape[0]) if shape else 0
+        return rows, int(getattr(obj, "nbytes", 0))
+
+    @staticmethod
+    def track_stage(inputs: tuple = (), outputs: tuple = ()):
+        """
+        Decorate the constructor of a pipeline stage, so its run is recorded in the stage info tracker.
+        The wall time, CPU time, peak RSS, rows and bytes of the given inputs and outputs are recorded.
+        The peak RSS is sampled while the stage runs, so it is the peak of the stage and not of the process,
+        and the peak RSS increase is the peak above the RSS at the start of the stage.
+        The inputs are constructor parameters and the outputs are attributes of the stage, after it runs.
+        The rows of the stage are the rows of its first input and output, the bytes are summed over all of them.
+        """
+        def decorator(init):
+            signature = inspect.signature(init)
+
+            @functools.wraps(init)
+            def wrapper(stage, *args, **kwargs):
+                arguments = signature.bind(stage, *args, **kwargs).arguments
+                input_sizes = {name: InfoTracker.__measure_size(arguments.get(name)) for name in inputs}
+
+                start_wall_time = time.perf_counter()
+                start_cpu_time = time.process_time()
+
+                with Helper.measure_peak_rss() as memory:
+                    init(stage, *args, **kwargs)
+
+                wall_time = time.perf_counter() - start_wall_time
+                cpu_time = time.process_time() - start_cpu_time
+                output_sizes = {name: InfoTracker.__measure_size(getattr(stage, name)) for name in outputs}
+
+                stage.info_tracker.add_stage_report({
+                    "stage": type(stage).__name__,
+                    "wall_time_s": wall_time,
+                    "cpu_time_s": cpu_time,
+                    "peak_rss_bytes": memory["peak"],
+                    "peak_rss_increase_bytes": (
+                        memory["peak"] - memory["start"] if memory["peak"] is not None else None
+                    ),
+                    "input_rows": input_sizes[inputs[0]][0] if inputs else 0,
+                    "output_rows": output_sizes[outputs[0]][0] if outputs else 0,
+                    "input_bytes": sum(size for _, size in input_sizes.values()),
+                    "output_bytes": sum(size for _, size in output_sizes.values()),
+                    "inputs": {name: {"rows": rows, "bytes": size} for name, (rows, size) in input_sizes.items()},
+                    "outputs": {name: {"rows": rows, "bytes": size} for name, (rows, size) in output_sizes.items()}
+                })
+            return wrapper
+        return decorator
+
+    def export_run_report(self, path: str) -> None:
+        """ Export the stage reports of the run in JSON, with all the details, and in CSV, one row per stage. """
+        os.makedirs(path, exist_ok=True)
+
+        with open(os.path.join(path, "run_report.json"), "w") as file:
+            json.dump(self.__stage_reports, file, indent=2)
+
+        csv_fields = [
+            "stage", "wall_time_s", "cpu_time_s", "peak_rss_bytes", "peak_rss_increase_bytes",
+            "input_rows", "output_rows", "input_bytes", "output_bytes"
+        ]
+        with open(os.path.join(path, "run_report.csv"), "w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=csv_fields, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(self.__stage_reports)
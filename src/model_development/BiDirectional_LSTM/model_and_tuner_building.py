@@ -1,27 +1,37 @@
 import os
+import typing as t
 import numpy as np
-import pandas as pd
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import Input, LSTM, Bidirectional, Dense, Dropout, Flatten
 from tensorflow.keras.initializers import GlorotUniform, Zeros, Orthogonal
 from tensorflow.keras.optimizers import Adam
 from tensorflow.keras.losses import BinaryCrossentropy, CategoricalCrossentropy
 from tensorflow.keras.metrics import AUC, Precision, Recall
-from keras_tuner.tuners import RandomSearch
+from tensorflow.keras.utils import to_categorical
+from tensorflow.keras.callbacks import EarlyStopping
+from keras_tuner import Tuner
 from ...config.config_loading import ConfigLoader
 from ...info_tracking.info_tracking import InfoTracker
+from ..BiDirectional_LSTM.window_generator import WindowGenerator
+from ..BiDirectional_LSTM.tuner_strategies import (
+    BudgetedRandomSearch,
+    BudgetedHyperband,
+    BudgetedBayesianOptimization
+)
 
 
 class BiLstmBuilder:
 
+    @InfoTracker.track_stage(inputs=("train_data", "test_data", "train_labels", "test_labels"))
     def __init__(
             self,
             config: ConfigLoader,
             info_tracker: InfoTracker,
-            train_data: pd.DataFrame,
-            test_data: pd.DataFrame,
-            train_labels: pd.Series,
-            test_labels: pd.Series
+            train_data: t.Union[np.ndarray, WindowGenerator],
+            test_data: t.Union[np.ndarray, WindowGenerator],
+            train_labels: t.Optional[np.ndarray],
+            test_labels: t.Optional[np.ndarray],
+            overwrite: bool = True
     ):
         self.__config = config
         self.__info_tracker = info_tracker
@@ -29,6 +39,7 @@ class BiLstmBuilder:
         self.__test_data = test_data
         self.__train_labels = train_labels
         self.__test_labels = test_labels
+        self.__overwrite = overwrite
 
         # self._reshape_data()
         self.keras_hypermodel = self._build_hypermodel()
@@ -57,6 +68,19 @@ class BiLstmBuilder:
     def test_labels(self):
         return self.__test_labels
 
+    @staticmethod
+    def tuner_project_dir(config: ConfigLoader) -> str:
+        """
+        Directory where Keras Tuner keeps the trials of the current model.
+        It is a directory of its own, as the tuner removes it when it overwrites a previous search.
+        """
+        return os.path.join(config.paths.path2save_models, config.model.name, "tuner")
+
+    @staticmethod
+    def best_model_path(config: ConfigLoader) -> str:
+        """ Path of the best model of the search, as loaded by the inference service. """
+        return os.path.join(BiLstmBuilder.tuner_project_dir(config), "best_model.keras")
+
     def _build_model(self, hp) -> None:
         """
         Build Tensorfow Bi-Directional LSTM model.
@@ -194,19 +218,89 @@ class BiLstmBuilder:
         print(f"The maximum trials are: {trials}")
         return trials
 
-    def _build_hypermodel(self) -> RandomSearch:
-        """ Initialise Keras Tuner. """
-        tuner = RandomSearch(
+    def _count_trial_budget(self) -> int:
+        """ Trial budget of the search. It never exceeds the maximum possible combinations. """
+        max_trials = self._count_max_trials()
+        budget = self.__config.lstm_tuner.max_trials
+        return min(budget, max_trials) if budget > 0 else max_trials
+
+    def _build_hypermodel(self) -> Tuner:
+        """ Initialise Keras Tuner based on the search strategy, set in the configurations. """
+        tuner_params = self.__config.lstm_tuner
+
+        common_params = dict(
             hypermodel=self._build_model,
             objective="val_loss",
-            max_trials=self._count_max_trials(),
-            project_name=self.__config.model.name,
-            overwrite=True,
-            directory=os.path.join(
-                *self.__config.paths.path2save_models
-            ),
-            seed=self.__config.lstm_general_params.seed
+            project_name=os.path.basename(self.tuner_project_dir(self.__config)),
+            overwrite=self.__overwrite,
+            directory=os.path.dirname(self.tuner_project_dir(self.__config)),
+            seed=self.__config.lstm_general_params.seed,
+            time_budget_seconds=tuner_params.time_budget_minutes * 60
         )
+
+        # if strategy is random search, sample the given number of trials
+        if tuner_params.strategy == "random":
+            tuner = BudgetedRandomSearch(max_trials=self._count_trial_budget(), **common_params)
+
+        # if strategy is hyperband, train many trials briefly and only the best ones up to the max epochs
+        elif tuner_params.strategy == "hyperband":
+            tuner = BudgetedHyperband(
+                max_epochs=self.__config.lstm_training_params.epochs,
+                factor=tuner_params.hyperband_factor,
+                **common_params
+            )
+
+        # if strategy is bayesian, pick the next trials based on the results of the previous ones
+        elif tuner_params.strategy == "bayesian":
+            tuner = BudgetedBayesianOptimization(max_trials=self._count_trial_budget(), **common_params)
+
+        else:
+            raise ValueError("An invalid search strategy is given.")
+
         tuner.search_space_summary(extended=False)
         return tuner
 
+    def _create_callbacks(self) -> list:
+        """ Stop the poor trials early, once the validation loss stops improving. """
+        patience = self.__config.lstm_tuner.early_stopping_patience
+        if patience <= 0:
+            return []
+        return [EarlyStopping(monitor="val_loss", patience=patience)]
+
+    def search_hyperparameters(self) -> None:
+        """
+        Run the hyper parameter search.
+        Window generators are consumed as tf.data pipelines, so the windows are cut lazily batch by batch.
+        Materialised windows are passed as they are, with one-hot encoded labels.
+        """
+        tparams = self.__config.lstm_training_params
+        number_of_classes = self.__config.lstm_general_params.number_of_classes
+
+        if isinstance(self.train_data, WindowGenerator):
+            self.keras_hypermodel.search(
+                self.train_data.to_dataset(),
+                validation_data=self.test_data.to_dataset(),
+                epochs=tparams.epochs,
+                callbacks=self._create_callbacks()
+            )
+        else:
+            self.keras_hypermodel.search(
+                self.train_data,
+                to_categorical(self.train_labels, num_classes=number_of_classes),
+                validation_data=(
+                    self.test_data,
+                    to_categorical(self.test_labels, num_classes=number_of_classes)
+                ),
+                batch_size=tparams.batch_size,
+                epochs=tparams.epochs,
+                callbacks=self._create_callbacks()
+            )
+
+        # The workers of a distributed search only run trials - the best model is saved once the search is over.
+        if "KERASTUNER_TUNER_ID" not in os.environ:
+            self.save_best_model()
+
+    def save_best_model(self) -> None:
+        """ Save the best model of the search, so it can be served without the tuner. """
+        best_model = self.keras_hypermodel.get_best_models(num_models=1)[0]
+        best_model.save(self.best_model_path(self.__config))
@@ -0,0 +1,226 @@
+import os
+import json
+import time
+import typing as t
+import numpy as np
+import tensorflow as tf
+from ...config.config_loading import ConfigLoader
+from ...helper.latency_tracking import LatencyTracker
+from ..BiDirectional_LSTM.model_and_tuner_building import BiLstmBuilder
+
+try:
+    import onnx
+    import tf2onnx
+    import onnxruntime
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    from onnxconverter_common import float16
+except ImportError:
+    onnx = None
+    tf2onnx = None
+    onnxruntime = None
+
+
+class TfliteRunner:
+    """ Run an exported TFLite model. The input is resized only when the batch size changes. """
+
+    def __init__(self, path: str):
+        self.__interpreter = tf.lite.Interpreter(model_path=path)
+        self.__interpreter.allocate_tensors()
+        self.__input = self.__interpreter.get_input_details()[0]
+        self.__output = self.__interpreter.get_output_details()[0]
+        self.__batch_size = self.__input["shape"][0]
+
+    def predict(self, windows: np.ndarray) -> np.ndarray:
+        windows = np.asarray(windows, dtype=self.__input["dtype"])
+        if len(windows) != self.__batch_size:
+            self.__interpreter.resize_tensor_input(self.__input["index"], windows.shape)
+            self.__interpreter.allocate_tensors()
+            self.__batch_size = len(windows)
+
+        self.__interpreter.set_tensor(self.__input["index"], windows)
+        self.__interpreter.invoke()
+        return self.__interpreter.get_tensor(self.__output["index"])
+
+
+class OnnxRunner:
+    """ Run an exported ONNX model on the CPU with ONNX Runtime. """
+
+    def __init__(self, path: str):
+        self.__session = onnxruntime.InferenceSession(path, providers=["CPUExecutionProvider"])
+        self.__input = self.__session.get_inputs()[0]
+        self.__dtype = np.float16 if self.__input.type == "tensor(float16)" else np.float32
+
+    def predict(self, windows: np.ndarray) -> np.ndarray:
+        return self.__session.run(None, {self.__input.name: np.asarray(windows, dtype=self.__dtype)})[0]
+
+
+class ModelExporter:
+    """
+    Export the best BiLSTM of the search to lightweight CPU runtimes, TFLite and/or ONNX,
+    with optional post-training float16 or int8 quantization.
+    The int8 quantization is calibrated on the given windows, e.g. a sample of the train windows.
+    The exported models are saved under models/<model name>/export and can be benchmarked
+    against the original Keras model for latency and prediction agreement.
+    """
+
+    def __init__(self, config: ConfigLoader, calibration_windows: np.ndarray = None):
+        self.__config = config
+        self.__calibration_windows = calibration_windows
+        self.__directory = os.path.join(config.paths.path2save_models, config.model.name, "export")
+        self.__model = tf.keras.models.load_model(BiLstmBuilder.best_model_path(config), compile=False)
+        self.__exported: dict = {}
+
+        os.makedirs(self.__directory, exist_ok=True)
+
+    @property
+    def config(self):
+        return self.__config
+
+    @property
+    def model(self):
+        return self.__model
+
+    @property
+    def exported(self):
+        """ Paths of the exported models by runtime. """
+        return self.__exported
+
+    def __input_signature(self) -> tf.TensorSpec:
+        """ Windows of any batch size. """
+        return tf.TensorSpec(shape=(None,) + tuple(self.__model.input_shape[1:]), dtype=tf.float32, name="windows")
+
+    def __representative_dataset(self) -> t.Iterator[list]:
+        """ Calibration windows for the int8 quantization, one at a time. """
+        for window in self.__calibration_windows[:self.config.lstm_export.calibration_windows]:
+            yield [np.asarray(window[np.newaxis], dtype=np.float32)]
+
+    def export_tflite(self, quantization: str = "none") -> str:
+        """ Convert the model to TFLite. """
+        model = self.__model
+        signature = [self.__input_signature()]
+        function = tf.function(lambda windows: model(windows, training=False), input_signature=signature)
+        converter = tf.lite.TFLiteConverter.from_concrete_functions([function.get_concrete_function()], model)
+        # The LSTM layers need the TensorFlow ops that have no TFLite builtin.
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS, tf.lite.OpsSet.SELECT_TF_OPS]
+
+        if quantization == "float16":
+            converter.optimizations = [tf.lite.Optimize.DEFAULT]
+            converter.target_spec.supported_types = [tf.float16]
+        elif quantization == "int8":
+            converter.optimizations = [tf.lite.Optimize.DEFAULT]
+            # Without calibration windows, only the weights are quantized.
+            if self.__calibration_windows is not None:
+                converter.representative_dataset = self.__representative_dataset
+        elif quantization != "none":
+            raise ValueError("An invalid quantization is given.")
+
+        path = os.path.join(self.__directory, f"model_{quantization}.tflite")
+        with open(path, "wb") as file:
+            file.write(converter.convert())
+
+        self.__exported[f"tflite_{quantization}"] = path
+        return path
+
+    def export_onnx(self, quantization: str = "none") -> str:
+        """ Convert the model to ONNX. The int8 quantization is dynamic, as ONNX Runtime runs LSTMs with it. """
+        if tf2onnx is None:
+            raise ImportError("onnx, tf2onnx, onnxruntime and onnxconverter-common are required for the ONNX export.")
+
+        path = os.path.join(self.__directory, "model_none.onnx")
+        tf2onnx.convert.from_keras(self.__model, input_signature=[self.__input_signature()], output_path=path)
+
+        if quantization == "float16":
+            quantized_path = os.path.join(self.__directory, "model_float16.onnx")
+            onnx.save(float16.convert_float_to_float16(onnx.load(path), keep_io_types=True), quantized_path)
+            path = quantized_path
+        elif quantization == "int8":
+            quantized_path = os.path.join(self.__directory, "model_int8.onnx")
+            quantize_dynamic(path, quantized_path, weight_type=QuantType.QInt8)
+            path = quantized_path
+        elif quantization != "none":
+            raise ValueError("An invalid quantization is given.")
+
+        self.__exported[f"onnx_{quantization}"] = path
+        return path
+
+    def export(self) -> dict:
+        """ Export to every runtime and quantization set in the configurations. """
+        export_params = self.config.lstm_export
+        for runtime in export_params.formats:
+            for quantization in export_params.quantizations:
+                if runtime == "tflite":
+                    self.export_tflite(quantization=quantization)
+                elif runtime == "onnx":
+                    self.export_onnx(quantization=quantization)
+                else:
+                    raise ValueError("An invalid export format is given.")
+        return self.__exported
+
+    def __create_runners(self) -> dict:
+        """ Predict functions of the Keras model and of every exported model. """
+        model = self.__model
+        # One trace for every batch size.
+        signature = [self.__input_signature()]
+        keras_predict = tf.function(lambda windows: model(windows, training=False), input_signature=signature)
+        runners = {"keras": lambda windows: keras_predict(tf.constant(windows, dtype=tf.float32)).numpy()}
+
+        for name, path in self.__exported.items():
+            runner = TfliteRunner(path) if name.startswith("tflite") else OnnxRunner(path)
+            runners[name] = runner.predict
+        return runners
+
+    def benchmark(self, windows: np.ndarray, labels: np.ndarray = None) -> dict:
+        """
+        Compare every exported model with the Keras model on the given windows:
+            - single-window latency, p50 and p99,
+            - batched latency per window,
+            - agreement of the predicted classes with the Keras model, and accuracy if labels are given.
+        The results are saved as export_benchmark.json.
+        """
+        export_params = self.config.lstm_export
+        windows = np.asarray(windows[:export_params.benchmark_windows], dtype=np.float32)
+        batch_size = self.config.lstm_training_params.batch_size
+
+        runners = self.__create_runners()
+        predictions = {}
+        results = {}
+
+        for name, predict in runners.items():
+            # Warm up, so the tracing and the allocations are not timed.
+            predict(windows[:1])
+            predict(windows[:batch_size])
+
+            latency = LatencyTracker(capacity=len(windows))
+            for i in range(len(windows)):
+                start_time = time.perf_counter()
+                predict(windows[i:i + 1])
+                latency.record(time.perf_counter() - start_time)
+
+            start_time = time.perf_counter()
+            outputs = np.concatenate([
+                predict(windows[start:start + batch_size]) for start in range(0, len(windows), batch_size)
+            ])
+            batched_ms = (time.perf_counter() - start_time) * 1000 / len(windows)
+
+            predictions[name] = np.argmax(outputs, axis=1)
+            single = latency.summary()
+            results[name] = {
+                "single_p50_ms": single["p50_ms"],
+                "single_p99_ms": single["p99_ms"],
+                "batched_ms_per_window": batched_ms,
+                "size_mb": os.path.getsize(self.__exported[name]) / 1024 ** 2 if name in self.__exported else None
+            }
+
+        for name, result in results.items():
+            result["agreement_with_keras"] = float(np.mean(predictions[name] == predictions["keras"]))
+            if labels is not None:
+                result["accuracy"] = float(np.mean(predictions[name] == np.asarray(labels[:len(windows)])))
+
+        with open(os.path.join(self.__directory, "export_benchmark.json"), "w") as file:
+            json.dump(results, file, indent=2)
+
+        for name, result in results.items():
+            print(f"{name}: p50 {result['single_p50_ms']:.3f} ms, p99 {result['single_p99_ms']:.3f} ms, "
+                  f"batched {result['batched_ms_per_window']:.4f} ms per window, "
+                  f"agreement {result['agreement_with_keras']:.4f}")
+        return results
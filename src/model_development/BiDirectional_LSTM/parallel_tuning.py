@@ -0,0 +1,176 @@
+import os
+import glob
+import json
+import time
+import shutil
+import socket
+import multiprocessing as mp
+import tensorflow as tf
+from ...config.config_loading import ConfigLoader
+from ...info_tracking.info_tracking import InfoTracker
+from ..BiDirectional_LSTM.window_dataset import MemmapWindowDataset
+from ..BiDirectional_LSTM.model_and_tuner_building import BiLstmBuilder
+
+
+def load_shared_generators(config: ConfigLoader, datasets_dir: str) -> dict:
+    """ Window generators over the memory-mapped train and test window datasets. """
+    generators = {}
+    for subset, shuffle in (("train", True), ("test", False)):
+        dataset = MemmapWindowDataset(directory=datasets_dir, name=subset)
+        generators[subset] = dataset.window_generator(config=config, shuffle=shuffle)
+    return generators
+
+
+def run_search_process(tuner_id: str,
+                       oracle_port: int,
+                       config: ConfigLoader,
+                       datasets_dir: str,
+                       intra_op_threads: int,
+                       inter_op_threads: int) -> None:
+    """
+    Run one process of the distributed Keras Tuner search.
+    The "chief" process serves the oracle, the others run the trials it hands out.
+    The shared data is memory-mapped read-only, so all the processes share one page-cached copy.
+    """
+    # Keras Tuner picks up its distribution role from the environment.
+    os.environ["KERASTUNER_TUNER_ID"] = tuner_id
+    os.environ["KERASTUNER_ORACLE_IP"] = "127.0.0.1"
+    os.environ["KERASTUNER_ORACLE_PORT"] = str(oracle_port)
+
+    # Limit the TensorFlow threads, so the workers do not compete for the same cores.
+    tf.config.threading.set_intra_op_parallelism_threads(intra_op_threads)
+    tf.config.threading.set_inter_op_parallelism_threads(inter_op_threads)
+
+    generators = load_shared_generators(config=config, datasets_dir=datasets_dir)
+
+    BiLstmBuilder(
+        config=config,
+        info_tracker=InfoTracker(),
+        train_data=generators["train"],
+        test_data=generators["test"],
+        train_labels=None,
+        test_labels=None,
+        overwrite=False
+    ).search_hyperparameters()
+
+
+class ParallelTuner:
+    """
+    Run the BiLSTM hyper parameter search with several trials at once, each in its own worker process.
+    The workers open the memory-mapped window datasets written by the "LstmReshaper" object,
+    so they cut their windows from one shared read-only copy.
+    """
+
+    @InfoTracker.track_stage()
+    def __init__(self,
+                 config: ConfigLoader,
+                 info_tracker: InfoTracker,
+                 datasets_dir: str):
+        self.__config = config
+        self.__info_tracker = info_tracker
+        self.__datasets_dir = datasets_dir
+        self.__completed_trials: int = 0
+        self.__trials_per_hour: float = 0.0
+
+        self.__run_parallel_search()
+
+    @property
+    def config(self):
+        return self.__config
+
+    @property
+    def info_tracker(self):
+        return self.__info_tracker
+
+    @property
+    def completed_trials(self):
+        return self.__completed_trials
+
+    @property
+    def trials_per_hour(self):
+        return self.__trials_per_hour
+
+    def __count_workers(self) -> int:
+        """ Number of worker processes. If it is not set, all the cores are used given the threads per worker. """
+        pparams = self.config.lstm_parallel_tuning
+        if pparams.n_workers > 0:
+            return pparams.n_workers
+        return max((os.cpu_count() or 1) // pparams.intra_op_threads, 1)
+
+    @staticmethod
+    def __find_free_port() -> int:
+        """ Find a free local port for the oracle. """
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            sock.bind(("127.0.0.1", 0))
+            return sock.getsockname()[1]
+
+    def __count_completed_trials(self) -> int:
+        """ Count the completed trials in the tuner project directory. """
+        trial_files = glob.glob(os.path.join(BiLstmBuilder.tuner_project_dir(self.config), "trial_*", "trial.json"))
+        completed = 0
+        for trial_file in trial_files:
+            with open(trial_file) as file:
+                if json.load(file).get("status") == "COMPLETED":
+                    completed += 1
+        return completed
+
+    def __clear_previous_trials(self) -> None:
+        """ Remove the trials and the tuner state of previous searches, as the processes must not reload them. """
+        project_dir = BiLstmBuilder.tuner_project_dir(self.config)
+        if os.path.isdir(project_dir):
+            shutil.rmtree(project_dir)
+
+    def __run_parallel_search(self) -> None:
+        """ Start the oracle and the workers, wait for the search to finish and report the trials per hour. """
+        pparams = self.config.lstm_parallel_tuning
+        n_workers = self.__count_workers()
+        oracle_port = self.__find_free_port()
+
+        # Start from a clean project, as the processes must not overwrite each other's results.
+        self.__clear_previous_trials()
+
+        # Spawned processes do not inherit the TensorFlow state of the current process.
+        context = mp.get_context("spawn")
+        process_params = dict(
+            oracle_port=oracle_port,
+            config=self.config,
+            datasets_dir=self.__datasets_dir,
+            intra_op_threads=pparams.intra_op_threads,
+            inter_op_threads=pparams.inter_op_threads
+        )
+
+        start_time = time.time()
+        chief = context.Process(target=run_search_process, kwargs=dict(tuner_id="chief", **process_params))
+        chief.start()
+
+        workers = [
+            context.Process(target=run_search_process, kwargs=dict(tuner_id=f"tuner{i}", **process_params))
+            for i in range(n_workers)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        # The oracle has nothing left to serve once all the workers are done.
+        chief.join(timeout=60)
+        if chief.is_alive():
+            chief.terminate()
+        elapsed_hours = (time.time() - start_time) / 3600
+
+        self.__completed_trials = self.__count_completed_trials()
+        self.__trials_per_hour = self.__completed_trials / elapsed_hours if elapsed_hours > 0 else 0.0
+        print(f"{self.__completed_trials} trials completed by {n_workers} workers "
+              f"at {self.__trials_per_hour:.1f} trials per hour")
+
+        # Reload the finished search in this process to save its best model.
+        generators = load_shared_generators(config=self.config, datasets_dir=self.__datasets_dir)
+        BiLstmBuilder(
+            config=self.config,
+            info_tracker=InfoTracker(),
+            train_data=generators["train"],
+            test_data=generators["test"],
+            train_labels=None,
+            test_labels=None,
+            overwrite=False
+        ).save_best_model()
@@ -1,28 +1,47 @@
+import os
 import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
 from ...config.config_loading import ConfigLoader
+from ...helper.precision import PrecisionPolicy
 from ...info_tracking.info_tracking import InfoTracker
-from ..BiDirectional_LSTM.model_and_tuner_building import BiLstmBuilder
+from ..BiDirectional_LSTM.window_generator import WindowGenerator
+from ..BiDirectional_LSTM.window_dataset import MemmapWindowDataset
 
 
 class LstmReshaper:
 
+    @InfoTracker.track_stage(
+        inputs=("scaled_train_data", "scaled_test_data"),
+        outputs=("reshaped_train_data", "reshaped_test_data", "reshaped_train_labels", "reshaped_test_labels")
+    )
     def __init__(self,
                  config: ConfigLoader,
                  info_tracker: InfoTracker,
                  scaled_train_data: np.array,
-                 scaled_test_data: np.array):
+                 scaled_test_data: np.array,
+                 materialize: bool = False):
         self.__config = config
         self.__info_tracker = info_tracker
         self.__scaled_train_data = scaled_train_data
         self.__scaled_test_data = scaled_test_data
+        self.__materialize = materialize
+        self.__features_dtype = PrecisionPolicy(config=config).features_dtype
 
         self.__reshaped_train_data: np.array = np.array([])
         self.__reshaped_test_data: np.array = np.array([])
         self.__reshaped_train_labels: np.array = np.array([])
         self.__reshaped_test_labels: np.array = np.array([])
 
-        self.__apply_sw_to_train_n_test()
+        # Either materialise the windows or create generators that cut them lazily.
+        if config.lstm_training_params.input_pipeline == "tensor":
+            self.__apply_sw_to_train_n_test()
+        elif config.lstm_training_params.input_pipeline == "generator":
+            self.__create_window_generators()
+        elif config.lstm_training_params.input_pipeline == "memmap":
+            self.__create_memmap_window_generators()
+        else:
+            raise ValueError("An invalid input pipeline is given.")
 
     @property
     def config(self):
@@ -48,41 +67,62 @@ class LstmReshaper:
     def reshaped_test_labels(self):
         return self.__reshaped_test_labels
 
+    @staticmethod
+    def build_windows(features: np.ndarray,
+                      targets: np.ndarray,
+                      window_length: int,
+                      materialize: bool = False) -> (np.ndarray, np.ndarray):
+        """
+        Build the sliding windows as a strided view over one contiguous 2D feature array.
+        Window i covers the rows i to i + window_length - 1 and its label is the label of the last row.
+        The last window is skipped, in line with the original sliding window process.
+        If materialize is True, a writable copy is returned instead of the read-only view.
+        """
+        n_windows = max(len(features) - window_length, 0)
+
+        # Not enough rows to build even one window.
+        if n_windows == 0:
+            return (np.empty((0, window_length, features.shape[1]), dtype=features.dtype),
+                    np.empty((0,), dtype=targets.dtype))
+
+        # Strided view with shape (windows, features, window length) - swap the last axes to get
+        # the (windows, window length, features) shape expected by the LSTM. No data is copied here.
+        windows = sliding_window_view(features, window_shape=window_length, axis=0)
+        windows = windows.swapaxes(1, 2)[:n_windows]
+
+        # Gather the labels at the last row of each window in one go.
+        labels = targets[np.arange(window_length - 1, window_length - 1 + n_windows)]
+
+        if materialize:
+            windows = np.array(windows)
+        return windows, labels
+
+    @staticmethod
+    def __split_features_n_targets(data: pd.DataFrame, dtype=float) -> (np.ndarray, np.ndarray):
+        """
+        Split the given data into one contiguous 2D float array of features and an array of labels.
+        The labels are the last column of the given data.
+        Timewise, they are already synchronised in the "LabelCreator" object.
+        """
+        features = np.ascontiguousarray(data.iloc[:, :-1].to_numpy(dtype=dtype))
+        targets = data.iloc[:, -1].to_numpy()
+        return features, targets
+
     def __sliding_window_process(self, data: pd.DataFrame) -> (np.array, np.array):
         """ Apply Sliding Window to the data, creating data batches and reshaping data. """
 
         # Load the Sliding Window length.
         window_length = self.config.lstm_general_params.window_length
-        # Create empty lists to store the temporary array and label that correspond to each data batch.
-        data_list = []
-        label_list = []
-
-        # In the for loop below:
-        # Move down into the data by one row and capture a data sub-part that
-        # starts from the current row index (i) and
-        # ends at the row that is equal to the sliding window length + the current row index (i)
-
-        # Iterate over the whole ramge minus the window length,
-        # because the last arrays have less rows than the window length.
-        for i in range(len(data) - window_length):
-
-            # Extract data with labels, based on the sliding window length.
-            temp_data = data.iloc[i:window_length + i, :]
-            # Convert dataframe to array.
-            temp_array = np.array(temp_data)
-            # Extract the corresponding label.
-            # We have a 2D array here - The corresponding label is at the right bottom corner.
-            # Timewise, this is the right label as sychronisation is conducted in "LabelCreator" object.
-            label = temp_array[-1, -1]
-            # Labels are removed from the data.
-            temp_array_no_labels = temp_array[:, :-1]
-
-            data_list.append(temp_array_no_labels)
-            label_list.append(label)
-
-        final_data = np.array(data_list)
-        final_labels = np.array(label_list)
-        return final_data, final_labels
+
+        # Keep the features in one contiguous float array, so the windows can be a view over it.
+        features, targets = self.__split_features_n_targets(data=data, dtype=self.__features_dtype)
+
+        return self.build_windows(
+            features=features,
+            targets=targets,
+            window_length=window_length,
+            materialize=self.__materialize
+        )
 
     def __apply_sw_to_train_n_test(self) -> None:
         """ Apply the sliding window to the train and test data. """
@@ -92,7 +132,71 @@ class LstmReshaper:
         self.__reshaped_test_data, \
             self.__reshaped_test_labels = self.__sliding_window_process(data=self.__scaled_test_data)
 
+    def __create_window_generator(self, data: pd.DataFrame, shuffle: bool) -> WindowGenerator:
+        """ Create a generator that cuts the windows lazily from the given 2D scaled data. """
+        gparams = self.config.lstm_general_params
+        features, targets = self.__split_features_n_targets(data=data, dtype=self.__features_dtype)
+
+        return WindowGenerator(
+            features=features,
+            targets=targets,
+            window_length=gparams.window_length,
+            number_of_classes=gparams.number_of_classes,
+            batch_size=self.config.lstm_training_params.batch_size,
+            shuffle=shuffle,
+            seed=gparams.seed
+        )
+
+    def __create_window_generators(self) -> None:
+        """
+        Create the window generators for the train and test data. Only the train windows are shuffled.
+        The labels are provided by the generators, so the reshaped labels are left empty.
+        """
+        self.__reshaped_train_data = self.__create_window_generator(data=self.__scaled_train_data, shuffle=True)
+        self.__reshaped_test_data = self.__create_window_generator(data=self.__scaled_test_data, shuffle=False)
+
+    @staticmethod
+    def window_datasets_dir(config: ConfigLoader) -> str:
+        """ Directory of the memory-mapped window datasets of the current model. """
+        return os.path.join(config.paths.path2save_data, config.model.name, "windows")
+
+    def write_window_datasets(self) -> dict:
+        """
+        Write the scaled train and test data to memory-mapped window datasets.
+        Datasets that are already written for the same data and features dtype are opened instead of written again.
+        """
+        directory = self.window_datasets_dir(self.config)
+        window_length = self.config.lstm_general_params.window_length
+
+        datasets = {}
+        for name, data in (("train", self.__scaled_train_data), ("test", self.__scaled_test_data)):
+            fingerprint = MemmapWindowDataset.fingerprint(data)
+            if MemmapWindowDataset.exists(directory, name, fingerprint, window_length, self.__features_dtype):
+                datasets[name] = MemmapWindowDataset(directory=directory, name=name)
+            else:
+                datasets[name] = MemmapWindowDataset.write(
+                    directory=directory,
+                    name=name,
+                    data=data,
+                    window_length=window_length,
+                    features_dtype=self.__features_dtype,
+                    chunk_size=self.config.scaling_method.chunk_size
+                )
+        return datasets
+
+    def __create_memmap_window_generators(self) -> None:
+        """
+        Create window generators over memory-mapped window datasets. Only the train windows are shuffled.
+        The labels are provided by the generators, so the reshaped labels are left empty.
+        """
+        datasets = self.write_window_datasets()
+        self.__reshaped_train_data = datasets["train"].window_generator(config=self.config, shuffle=True)
+        self.__reshaped_test_data = datasets["test"].window_generator(config=self.config, shuffle=False)
+
     def build_model_n_tuner(self):
+        # The model stages import TensorFlow, so they are imported only when the chain reaches them.
+        from ..BiDirectional_LSTM.model_and_tuner_building import BiLstmBuilder
+
         return BiLstmBuilder(
             config=self.config,
             info_tracker=self.info_tracker,
@@ -102,7 +206,12 @@ class LstmReshaper:
             test_labels=self.reshaped_test_labels
         )
 
+    def tune_in_parallel(self):
+        from ..BiDirectional_LSTM.parallel_tuning import ParallelTuner
 
-
-
-
+        self.write_window_datasets()
+        return ParallelTuner(
+            config=self.config,
+            info_tracker=self.info_tracker,
+            datasets_dir=self.window_datasets_dir(self.config)
+        )
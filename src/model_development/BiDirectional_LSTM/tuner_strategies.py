@@ -0,0 +1,113 @@
+import time
+from tensorflow.keras.callbacks import Callback
+from keras_tuner.tuners import RandomSearch, Hyperband, BayesianOptimization
+from keras_tuner.oracles import RandomSearchOracle, HyperbandOracle, BayesianOptimizationOracle
+from keras_tuner.engine.trial import TrialStatus
+
+
+class DeadlineCallback(Callback):
+    """ Stop the training of the current trial once the wall-clock deadline of the search has passed. """
+
+    def __init__(self, deadline: float):
+        super().__init__()
+        self.deadline = deadline
+
+    def on_epoch_end(self, epoch, logs=None):
+        if time.time() >= self.deadline:
+            self.model.stop_training = True
+
+
+class TimeBudgetOracleMixin:
+    """
+    Give a Keras Tuner oracle a wall-clock budget, which starts with the first trial it hands out.
+    Once the budget is spent, every request for a new trial is answered with a stopped trial, which ends
+    the search of the tuner that asked. In a distributed search the oracle runs in the chief only,
+    so the budget covers all the workers. A budget of 0 means no time limit.
+    """
+
+    def __init__(self, *args, time_budget_seconds: float = 0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.time_budget_seconds = time_budget_seconds
+        self.deadline = None
+
+    def populate_space(self, trial_id):
+        if self.time_budget_seconds > 0:
+            if self.deadline is None:
+                self.deadline = time.time() + self.time_budget_seconds
+            if time.time() >= self.deadline:
+                return {"status": TrialStatus.STOPPED, "values": None}
+        return super().populate_space(trial_id)
+
+
+class BudgetedRandomSearchOracle(TimeBudgetOracleMixin, RandomSearchOracle):
+    """ Random search oracle with a wall-clock budget. """
+
+
+class BudgetedHyperbandOracle(TimeBudgetOracleMixin, HyperbandOracle):
+    """ Hyperband oracle with a wall-clock budget. """
+
+
+class BudgetedBayesianOptimizationOracle(TimeBudgetOracleMixin, BayesianOptimizationOracle):
+    """ Bayesian optimisation oracle with a wall-clock budget. """
+
+
+class TimeBudgetMixin:
+    """
+    Give a Keras Tuner a wall-clock budget.
+    The budgeted oracle hands out no more trials once the budget is spent, and the running trial stops at the end
+    of its epoch. The tuners are created with their budgeted oracle, instead of the oracle of their parent class.
+    """
+
+    def _init_with_oracle(self, tuner_class: type, oracle, hypermodel, time_budget_seconds: float, **kwargs):
+        """ Skip the constructor of the parent tuner, which only creates its own oracle. """
+        super(tuner_class, self).__init__(oracle=oracle, hypermodel=hypermodel, **kwargs)
+        self.time_budget_seconds = time_budget_seconds
+
+    def search(self, *args, **kwargs):
+        if self.time_budget_seconds > 0:
+            deadline = time.time() + self.time_budget_seconds
+            kwargs["callbacks"] = list(kwargs.get("callbacks") or []) + [DeadlineCallback(deadline=deadline)]
+        return super().search(*args, **kwargs)
+
+
+class BudgetedRandomSearch(TimeBudgetMixin, RandomSearch):
+    """ Random search with a trial and wall-clock budget. """
+
+    def __init__(self, hypermodel, objective, max_trials: int, seed: int = None,
+                 time_budget_seconds: float = 0, **kwargs):
+        oracle = BudgetedRandomSearchOracle(
+            objective=objective,
+            max_trials=max_trials,
+            seed=seed,
+            time_budget_seconds=time_budget_seconds
+        )
+        self._init_with_oracle(RandomSearch, oracle, hypermodel, time_budget_seconds, **kwargs)
+
+
+class BudgetedHyperband(TimeBudgetMixin, Hyperband):
+    """ Hyperband - successive halving of the trials - with a wall-clock budget. """
+
+    def __init__(self, hypermodel, objective, max_epochs: int, factor: int = 3, seed: int = None,
+                 time_budget_seconds: float = 0, **kwargs):
+        oracle = BudgetedHyperbandOracle(
+            objective=objective,
+            max_epochs=max_epochs,
+            factor=factor,
+            seed=seed,
+            time_budget_seconds=time_budget_seconds
+        )
+        self._init_with_oracle(Hyperband, oracle, hypermodel, time_budget_seconds, **kwargs)
+
+
+class BudgetedBayesianOptimization(TimeBudgetMixin, BayesianOptimization):
+    """ Bayesian optimisation with a trial and wall-clock budget. """
+
+    def __init__(self, hypermodel, objective, max_trials: int, seed: int = None,
+                 time_budget_seconds: float = 0, **kwargs):
+        oracle = BudgetedBayesianOptimizationOracle(
+            objective=objective,
+            max_trials=max_trials,
+            seed=seed,
+            time_budget_seconds=time_budget_seconds
+        )
+        self._init_with_oracle(BayesianOptimization, oracle, hypermodel, time_budget_seconds, **kwargs)
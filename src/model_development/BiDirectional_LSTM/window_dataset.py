@@ -0,0 +1,155 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+from ...config.config_loading import ConfigLoader
+from ..BiDirectional_LSTM.window_generator import WindowGenerator
+
+
+class MemmapWindowDataset:
+    """
+    Disk-backed window dataset.
+    The 2D scaled features and the labels are written once to .npy files, together with a small JSON index that
+    describes the windows cut from them. The files are opened memory-mapped and read-only, so the data can be
+    larger than the memory and every process that opens them shares one page-cached copy.
+    Window i covers the rows i to i + window_length - 1 and its label is the label of the last row,
+    as in the sliding window process of the "LstmReshaper" object.
+    Datasets are reused only if they were written for the same data, window length, features dtype and file layout.
+    """
+
+    # Version of the file layout. Raise it whenever the files or the index change, so older datasets are rewritten.
+    LAYOUT_VERSION = 1
+
+    def __init__(self, directory: str, name: str):
+        self.__directory = directory
+        self.__name = name
+
+        with open(self.index_path(directory, name)) as file:
+            self.__index = json.load(file)
+
+        self.__features = np.load(os.path.join(directory, self.__index["features_file"]), mmap_mode="r")
+        self.__targets = np.load(os.path.join(directory, self.__index["targets_file"]), mmap_mode="r")
+
+    @property
+    def index(self):
+        return self.__index
+
+    @property
+    def features(self):
+        return self.__features
+
+    @property
+    def targets(self):
+        return self.__targets
+
+    @property
+    def window_length(self):
+        return self.__index["window_length"]
+
+    @property
+    def n_windows(self):
+        return self.__index["n_windows"]
+
+    @staticmethod
+    def index_path(directory: str, name: str) -> str:
+        return os.path.join(directory, f"{name}_index.json")
+
+    @staticmethod
+    def fingerprint(data: pd.DataFrame) -> dict:
+        """ Cheap fingerprint of the scaled data, so unchanged data is not written again. """
+        return {
+            "rows": len(data),
+            "columns": [str(col) for col in data.columns],
+            "dtypes": [str(dtype) for dtype in data.dtypes],
+            "first": str(data.index[0]) if len(data) else None,
+            "last": str(data.index[-1]) if len(data) else None,
+            "sums": [float(value) for value in data.sum(axis=0).to_numpy(dtype=float)]
+        }
+
+    @classmethod
+    def exists(cls,
+               directory: str,
+               name: str,
+               fingerprint: dict,
+               window_length: int,
+               features_dtype=np.float32) -> bool:
+        """ Check if the dataset is already written for the same data, window length, features dtype and layout. """
+        index_path = cls.index_path(directory, name)
+        if not os.path.isfile(index_path):
+            return False
+        with open(index_path) as file:
+            index = json.load(file)
+        return (
+            index.get("layout_version") == cls.LAYOUT_VERSION
+            and index.get("fingerprint") == fingerprint
+            and index.get("window_length") == window_length
+            and index.get("dtype") == np.dtype(features_dtype).name
+        )
+
+    @classmethod
+    def write(cls,
+              directory: str,
+              name: str,
+              data: pd.DataFrame,
+              window_length: int,
+              features_dtype=np.float32,
+              chunk_size: int = 100000) -> "MemmapWindowDataset":
+        """
+        Write the scaled data, whose last column holds the labels, chunk by chunk.
+        The index is written last, so a dataset that was not fully written is never opened.
+        """
+        os.makedirs(directory, exist_ok=True)
+        index_path = cls.index_path(directory, name)
+        if os.path.isfile(index_path):
+            os.remove(index_path)
+
+        n_rows, n_features = len(data), data.shape[1] - 1
+        features_file, targets_file = f"{name}_features.npy", f"{name}_targets.npy"
+
+        features = np.lib.format.open_memmap(
+            os.path.join(directory, features_file), mode="w+", dtype=features_dtype, shape=(n_rows, n_features)
+        )
+        for start in range(0, n_rows, chunk_size):
+            chunk = data.iloc[start:start + chunk_size, :-1]
+            features[start:start + chunk_size] = chunk.to_numpy(dtype=features_dtype)
+        features.flush()
+        del features
+
+        np.save(os.path.join(directory, targets_file), data.iloc[:, -1].to_numpy())
+
+        # The last window is skipped, in line with the sliding window process.
+        n_windows = max(n_rows - window_length, 0)
+        index = {
+            "layout_version": cls.LAYOUT_VERSION,
+            "features_file": features_file,
+            "targets_file": targets_file,
+            "rows": n_rows,
+            "features": n_features,
+            "dtype": np.dtype(features_dtype).name,
+            "window_length": window_length,
+            "n_windows": n_windows,
+            "window_stride": 1,
+            "first_window_start": 0,
+            "last_window_start": n_windows - 1,
+            "label_offset": window_length - 1,
+            "fingerprint": cls.fingerprint(data)
+        }
+        temp_path = f"{index_path}.tmp"
+        with open(temp_path, "w") as file:
+            json.dump(index, file, indent=2)
+        os.replace(temp_path, index_path)
+
+        return cls(directory=directory, name=name)
+
+    def window_generator(self, config: ConfigLoader, shuffle: bool = False) -> WindowGenerator:
+        """ Input pipeline that cuts the windows from the memory-mapped files. """
+        gparams = config.lstm_general_params
+        return WindowGenerator(
+            features=self.__features,
+            targets=self.__targets,
+            window_length=self.window_length,
+            number_of_classes=gparams.number_of_classes,
+            batch_size=config.lstm_training_params.batch_size,
+            shuffle=shuffle,
+            seed=gparams.seed
+        )
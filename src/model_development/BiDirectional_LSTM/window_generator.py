@@ -0,0 +1,119 @@
+import numpy as np
+
+
+class WindowGenerator:
+    """
+    Input pipeline that cuts the sliding windows lazily from the 2D scaled data.
+    Only the window start indices are shuffled and batched. Each batch of windows is gathered
+    from the 2D data by index, so the 3D windows tensor is never materialised in full.
+    Window i covers the rows i to i + window_length - 1 and its label is the label of the last row,
+    exactly as in the sliding window process of the "LstmReshaper" object.
+    """
+
+    def __init__(self,
+                 features: np.ndarray,
+                 targets: np.ndarray,
+                 window_length: int,
+                 number_of_classes: int,
+                 batch_size: int,
+                 shuffle: bool = False,
+                 seed: int = None):
+        self.__features = features
+        self.__targets = targets
+        self.__window_length = window_length
+        self.__number_of_classes = number_of_classes
+        self.__batch_size = batch_size
+        self.__shuffle = shuffle
+        self.__seed = seed
+
+        # The last window is skipped, in line with the sliding window process.
+        self.__n_windows = max(len(features) - window_length, 0)
+
+    @property
+    def features(self):
+        return self.__features
+
+    @property
+    def targets(self):
+        return self.__targets
+
+    @property
+    def window_length(self):
+        return self.__window_length
+
+    @property
+    def n_windows(self):
+        return self.__n_windows
+
+    @property
+    def nbytes(self):
+        """ Size of the 2D data the windows are cut from. """
+        return self.__features.nbytes + self.__targets.nbytes
+
+    @property
+    def shape(self):
+        """ Shape of the equivalent materialised windows tensor. """
+        return self.__n_windows, self.__window_length, self.__features.shape[1]
+
+    def __cut_windows_from_arrays(self, starts: np.ndarray) -> (np.ndarray, np.ndarray):
+        """ Gather the windows that start at the given rows, together with their one-hot labels, with NumPy. """
+        rows = starts[:, np.newaxis] + np.arange(self.__window_length)
+        windows = np.asarray(self.__features[rows], dtype=np.float32)
+        labels = np.eye(self.__number_of_classes, dtype=np.float32)[
+            np.asarray(self.__targets[starts + self.__window_length - 1], dtype=np.int64)
+        ]
+        return windows, labels
+
+    def to_dataset(self) -> "tf.data.Dataset":
+        """
+        Create a batched and prefetched tf.data pipeline of (windows, one-hot labels).
+        In-memory data is converted to tensors once and the windows are gathered by TensorFlow.
+        Memory-mapped data is gathered with NumPy instead, so it is never copied into TensorFlow
+        and processes that map the same files share one page-cached copy.
+        """
+        # TensorFlow is imported here, so the windows can be cut with NumPy where it is not installed.
+        import tensorflow as tf
+
+        # Window start indices.
+        dataset = tf.data.Dataset.range(self.__n_windows)
+
+        # Shuffle only the indices - the data itself is never copied or reordered.
+        if self.__shuffle:
+            dataset = dataset.shuffle(
+                buffer_size=max(self.__n_windows, 1),
+                seed=self.__seed,
+                reshuffle_each_iteration=True
+            )
+
+        dataset = dataset.batch(self.__batch_size)
+
+        if isinstance(self.__features, np.memmap):
+            n_features = self.__features.shape[1]
+
+            def cut_windows(starts: tf.Tensor) -> (tf.Tensor, tf.Tensor):
+                """ Gather the windows that start at the given rows from the memory-mapped data. """
+                windows, labels = tf.numpy_function(
+                    self.__cut_windows_from_arrays,
+                    inp=[starts],
+                    Tout=(tf.float32, tf.float32)
+                )
+                windows.set_shape([None, self.__window_length, n_features])
+                labels.set_shape([None, self.__number_of_classes])
+                return windows, labels
+        else:
+            # The 2D data is converted to tensors once. Windows are gathered from them batch by batch.
+            features = tf.convert_to_tensor(self.__features)
+            targets = tf.one_hot(
+                tf.convert_to_tensor(self.__targets.astype(np.int32)),
+                depth=self.__number_of_classes
+            )
+            offsets = tf.range(self.__window_length, dtype=tf.int64)
+            last_row = tf.constant(self.__window_length - 1, dtype=tf.int64)
+
+            def cut_windows(starts: tf.Tensor) -> (tf.Tensor, tf.Tensor):
+                """ Gather the windows that start at the given rows, together with their labels. """
+                rows = tf.expand_dims(starts, axis=1) + tf.expand_dims(offsets, axis=0)
+                return tf.gather(features, rows), tf.gather(targets, starts + last_row)
+
+        dataset = dataset.map(cut_windows, num_parallel_calls=tf.data.AUTOTUNE)
+        return dataset.prefetch(tf.data.AUTOTUNE)
@@ -0,0 +1,164 @@
+import os
+import typing as t
+import json
+import time
+import shutil
+import hashlib
+import dataclasses
+import joblib
+from ..config.config_loading import ConfigLoader
+
+
+class ArtifactStore:
+    """
+    Content-addressed store of the stage outputs.
+    Each entry is keyed by a hash of the stage, the keys of the entries its input artifacts come from and the
+    configuration sections the stage reads, so a change in a section only invalidates the stages that read it
+    and the stages after them. Stages without inputs are keyed by a fingerprint of their source instead.
+    Every entry is a directory with the pickled outputs and a manifest. The manifest is written last,
+    so an entry that was not fully written is never loaded, and its modification time is the last access.
+    """
+
+    MANIFEST = "manifest.json"
+    OUTPUTS = "outputs.pkl"
+
+    def __init__(self, config: ConfigLoader):
+        self.__config = config
+        self.__directory = os.path.join(config.paths.path2save_data, "artifact_store")
+
+    @property
+    def config(self):
+        return self.__config
+
+    @property
+    def directory(self):
+        return self.__directory
+
+    @staticmethod
+    def create_key(stage: str, input_keys: dict, config_sections: dict, fingerprint: str = None) -> str:
+        """ Hash the stage, the keys of its inputs, its configuration sections and the fingerprint of its source. """
+        key_content = {
+            "stage": stage,
+            "inputs": input_keys,
+            "config": config_sections,
+            "fingerprint": fingerprint
+        }
+        serialised = json.dumps(key_content, sort_keys=True, default=str)
+        return hashlib.sha256(serialised.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def read_sections(config: ConfigLoader, names: list) -> dict:
+        """
+        The configuration sections with the given ConfigLoader attribute names.
+        A name of the form "section.field" gives one field of a section only.
+        """
+        sections = {}
+        for name in names:
+            section, _, field = name.partition(".")
+            values = dataclasses.asdict(getattr(config, section))
+            sections[name] = values[field] if field else values
+        return sections
+
+    def __entry_path(self, key: str) -> str:
+        return os.path.join(self.__directory, key[:2], key)
+
+    def has_entry(self, key: str) -> bool:
+        return os.path.isfile(os.path.join(self.__entry_path(key), self.MANIFEST))
+
+    def load(self, key: str, memory_map: bool = False) -> dict:
+        """
+        Load the outputs of an entry and mark it as recently used.
+        Memory-mapped arrays are read-only and paged in from disk on demand.
+        """
+        entry_path = self.__entry_path(key)
+        outputs = joblib.load(os.path.join(entry_path, self.OUTPUTS), mmap_mode="r" if memory_map else None)
+        os.utime(os.path.join(entry_path, self.MANIFEST))
+        return outputs
+
+    def store(self, key: str, stage: str, outputs: dict, input_keys: dict, config_sections: dict) -> None:
+        """ Store the outputs of a stage, replacing an entry with the same key that was not fully written. """
+        entry_path = self.__entry_path(key)
+        if os.path.isdir(entry_path):
+            shutil.rmtree(entry_path)
+        os.makedirs(entry_path)
+
+        outputs_path = os.path.join(entry_path, self.OUTPUTS)
+        joblib.dump(outputs, outputs_path)
+
+        manifest = {
+            "key": key,
+            "stage": stage,
+            "outputs": sorted(outputs),
+            "inputs": input_keys,
+            "config": config_sections,
+            "created": time.time(),
+            "size": os.path.getsize(outputs_path)
+        }
+        manifest_path = os.path.join(entry_path, self.MANIFEST)
+        with open(f"{manifest_path}.tmp", "w") as file:
+            json.dump(manifest, file, indent=2, default=str)
+        os.replace(f"{manifest_path}.tmp", manifest_path)
+
+    def entries(self) -> list:
+        """ The manifests of all the entries, most recently used first, with their last access time. """
+        entries = []
+        if not os.path.isdir(self.__directory):
+            return entries
+
+        for prefix in os.listdir(self.__directory):
+            prefix_path = os.path.join(self.__directory, prefix)
+            if not os.path.isdir(prefix_path):
+                continue
+            for key in os.listdir(prefix_path):
+                manifest_path = os.path.join(prefix_path, key, self.MANIFEST)
+                if not os.path.isfile(manifest_path):
+                    continue
+                with open(manifest_path) as file:
+                    manifest = json.load(file)
+                manifest["last_access"] = os.path.getmtime(manifest_path)
+                entries.append(manifest)
+
+        return sorted(entries, key=lambda entry: entry["last_access"], reverse=True)
+
+    def latest_key(self, stage: str) -> t.Optional[str]:
+        """ The key of the most recently stored entry of a stage, under any configurations. """
+        stage_entries = [entry for entry in self.entries() if entry["stage"] == stage]
+        if not stage_entries:
+            return None
+        return max(stage_entries, key=lambda entry: entry["created"])["key"]
+
+    def remove(self, key: str) -> None:
+        entry_path = self.__entry_path(key)
+        if os.path.isdir(entry_path):
+            shutil.rmtree(entry_path)
+
+    def collect_garbage(self, keep_keys: set, keep_days: float = None, dry_run: bool = False) -> list:
+        """
+        Remove the entries that are not in the keys to keep and were not used within the given days,
+        together with the entries that were not fully written. The removed entries are returned.
+        """
+        keep_days = self.__config.artifact_store.keep_days if keep_days is None else keep_days
+        oldest_access = time.time() - keep_days * 24 * 3600
+
+        removed = [
+            entry for entry in self.entries()
+            if entry["key"] not in keep_keys and entry["last_access"] < oldest_access
+        ]
+        if dry_run:
+            return removed
+
+        for entry in removed:
+            self.remove(key=entry["key"])
+
+        # Entries without a manifest were interrupted while they were written.
+        if os.path.isdir(self.__directory):
+            for prefix in os.listdir(self.__directory):
+                prefix_path = os.path.join(self.__directory, prefix)
+                if not os.path.isdir(prefix_path):
+                    continue
+                for key in os.listdir(prefix_path):
+                    if not os.path.isfile(os.path.join(prefix_path, key, self.MANIFEST)):
+                        shutil.rmtree(os.path.join(prefix_path, key))
+                if not os.listdir(prefix_path):
+                    os.rmdir(prefix_path)
+        return removed
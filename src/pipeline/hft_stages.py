@@ -0,0 +1,250 @@
+import typing as t
+import numpy as np
+import pandas as pd
+from ..config.config_loading import ConfigLoader
+from ..info_tracking.info_tracking import InfoTracker
+from ..data_loading.data_loading import DataLoader
+from ..data_loading.data_cache import DataCache
+from ..data_preprocessing.s1_data_engineering import DataEngineer
+from ..data_preprocessing.s3_labels_creation import LabelCreator
+from ..data_preprocessing.s4_data_splitting import TrainTestSplitter
+from ..data_preprocessing.s5_data_scaling import DataScaler
+from ..model_development.BiDirectional_LSTM.sliding_window_for_LSTM import LstmReshaper
+from ..model_development.BiDirectional_LSTM.window_generator import WindowGenerator
+from ..pipeline.stage_graph import Stage
+
+
+class HftStages:
+    """ The stages of the HFT project, declared with their input and output artifacts. """
+
+    @staticmethod
+    def source_fingerprint(config: ConfigLoader) -> t.Optional[str]:
+        """
+        The loading stage has no inputs, so its outputs are keyed by the data source instead.
+        Sources that cannot be validated have no fingerprint, so no stage after the loading is stored.
+        """
+        return DataCache.fingerprint_source(link=config.data_link.link)
+
+    @staticmethod
+    def load(config: ConfigLoader, info_tracker: InfoTracker) -> dict:
+        loader = DataLoader(config=config, info_tracker=info_tracker)
+        return {"raw_data": loader.data, "from_cache": loader.from_cache, "data_cache": loader.data_cache}
+
+    @staticmethod
+    def engineer(config: ConfigLoader,
+                 info_tracker: InfoTracker,
+                 raw_data: pd.DataFrame,
+                 from_cache: bool,
+                 data_cache: t.Optional[DataCache]) -> dict:
+        engineer = DataEngineer(
+            data=raw_data,
+            config=config,
+            info_tracker=info_tracker,
+            data_cache=data_cache,
+            from_cache=from_cache
+        )
+        return {"engineered_data": engineer.data}
+
+    @staticmethod
+    def explore(config: ConfigLoader, info_tracker: InfoTracker, engineered_data: pd.DataFrame) -> dict:
+        # The exploration imports plotly and the profiling, so it is imported only when the stage runs.
+        from ..data_preprocessing.s2_data_exploration import DataExplorator
+
+        DataExplorator(data=engineered_data, config=config, info_tracker=info_tracker)
+        return {}
+
+    @staticmethod
+    def label(config: ConfigLoader, info_tracker: InfoTracker, engineered_data: pd.DataFrame) -> dict:
+        creator = LabelCreator(data=engineered_data, config=config, info_tracker=info_tracker)
+        return {"labelled_data": creator.data}
+
+    @staticmethod
+    def split(config: ConfigLoader, info_tracker: InfoTracker, labelled_data: pd.DataFrame) -> dict:
+        splitter = TrainTestSplitter(data=labelled_data, config=config, info_tracker=info_tracker)
+        return {
+            "train_data": splitter.train_data,
+            "test_data": splitter.test_data,
+            "train_labels": splitter.train_labels,
+            "test_labels": splitter.test_labels
+        }
+
+    @staticmethod
+    def scale(config: ConfigLoader,
+              info_tracker: InfoTracker,
+              train_data: pd.DataFrame,
+              test_data: pd.DataFrame,
+              train_labels: pd.Series,
+              test_labels: pd.Series) -> dict:
+        scaler = DataScaler(
+            config=config,
+            train_data=train_data,
+            test_data=test_data,
+            train_labels=train_labels,
+            test_labels=test_labels,
+            info_tracker=info_tracker
+        )
+        return {
+            "scaler": scaler.scaler,
+            "scaled_train_data": scaler.scaled_train_data,
+            "scaled_test_data": scaler.scaled_test_data
+        }
+
+    @staticmethod
+    def restore_scaler(config: ConfigLoader, outputs: dict) -> None:
+        """ Save the stored scaler again, as the streaming mode and the online predictor read it from its file. """
+        DataScaler.save_scaler(config=config, scaler=outputs["scaler"])
+
+    @staticmethod
+    def reshape(config: ConfigLoader,
+                info_tracker: InfoTracker,
+                scaled_train_data: pd.DataFrame,
+                scaled_test_data: pd.DataFrame) -> dict:
+        reshaper = LstmReshaper(
+            config=config,
+            info_tracker=info_tracker,
+            scaled_train_data=scaled_train_data,
+            scaled_test_data=scaled_test_data
+        )
+        return {
+            "reshaped_train_data": reshaper.reshaped_train_data,
+            "reshaped_test_data": reshaper.reshaped_test_data,
+            "reshaped_train_labels": reshaper.reshaped_train_labels,
+            "reshaped_test_labels": reshaper.reshaped_test_labels
+        }
+
+    @staticmethod
+    def tune(config: ConfigLoader,
+             info_tracker: InfoTracker,
+             reshaped_train_data: np.ndarray,
+             reshaped_test_data: np.ndarray,
+             reshaped_train_labels: np.ndarray,
+             reshaped_test_labels: np.ndarray) -> dict:
+        # The model stages import TensorFlow, so they are imported only when the stage runs.
+        from ..model_development.BiDirectional_LSTM.model_and_tuner_building import BiLstmBuilder
+
+        builder = BiLstmBuilder(
+            config=config,
+            info_tracker=info_tracker,
+            train_data=reshaped_train_data,
+            test_data=reshaped_test_data,
+            train_labels=reshaped_train_labels,
+            test_labels=reshaped_test_labels
+        )
+        builder.search_hyperparameters()
+        return {"tuner": builder.keras_hypermodel}
+
+    @staticmethod
+    def export(config: ConfigLoader,
+               info_tracker: InfoTracker,
+               reshaped_train_data: np.ndarray,
+               reshaped_test_data: np.ndarray,
+               reshaped_test_labels: np.ndarray) -> dict:
+        """ Export the saved best model, calibrated on train windows and benchmarked on test windows. """
+        from ..model_development.BiDirectional_LSTM.model_export import ModelExporter
+
+        window_length = config.lstm_general_params.window_length
+
+        # Window generators are cut into windows here, only as many as needed.
+        if isinstance(reshaped_train_data, WindowGenerator):
+            reshaped_train_data, _ = LstmReshaper.build_windows(
+                features=reshaped_train_data.features,
+                targets=reshaped_train_data.targets,
+                window_length=window_length
+            )
+            reshaped_test_data, reshaped_test_labels = LstmReshaper.build_windows(
+                features=reshaped_test_data.features,
+                targets=reshaped_test_data.targets,
+                window_length=window_length
+            )
+
+        exporter = ModelExporter(config=config, calibration_windows=reshaped_train_data)
+        exporter.export()
+        return {"export_benchmark": exporter.benchmark(windows=reshaped_test_data, labels=reshaped_test_labels)}
+
+    @classmethod
+    def create(cls) -> t.List[Stage]:
+        """
+        Create the stages in their execution order.
+        The config sections are the configurations each stage reads, so the stored outputs of a stage are reused
+        until one of them changes. The raw data, the windows, the tuner and the export are not stored. The raw data
+        is only read by the engineering, whose outputs are stored, and the tuner and the export keep their own files.
+        The windows are a strided view over the 2D scaled data, so pickling them would write every row window length
+        times. The 2D scaled data is stored and memory-mapped instead, and the windows are rebuilt over it.
+        The export loads the best model saved by the tuning, so it does not depend on the tuning stage.
+        """
+        return [
+            Stage(
+                name="loading",
+                inputs=[],
+                outputs=["raw_data", "from_cache", "data_cache"],
+                run=cls.load,
+                checkpoint=False,
+                config_sections=["data_link", "data_loading", "data_cache", "df_features"],
+                fingerprint=cls.source_fingerprint
+            ),
+            Stage(
+                name="engineering",
+                inputs=["raw_data", "from_cache", "data_cache"],
+                outputs=["engineered_data"],
+                run=cls.engineer,
+                config_sections=["df_features", "dataengin"]
+            ),
+            Stage(
+                name="exploration",
+                inputs=["engineered_data"],
+                outputs=[],
+                run=cls.explore,
+                checkpoint=False
+            ),
+            Stage(
+                name="labelling",
+                inputs=["engineered_data"],
+                outputs=["labelled_data"],
+                run=cls.label,
+                config_sections=["df_features", "labeltolerance", "precision"]
+            ),
+            Stage(
+                name="splitting",
+                inputs=["labelled_data"],
+                outputs=["train_data", "test_data", "train_labels", "test_labels"],
+                run=cls.split,
+                config_sections=["df_features", "data_splitting"]
+            ),
+            Stage(
+                name="scaling",
+                inputs=["train_data", "test_data", "train_labels", "test_labels"],
+                outputs=["scaler", "scaled_train_data", "scaled_test_data"],
+                run=cls.scale,
+                config_sections=["df_features", "scaling_method", "precision", "lstm_general_params.seed"],
+                memory_map=True,
+                restore=cls.restore_scaler
+            ),
+            Stage(
+                name="windowing",
+                inputs=["scaled_train_data", "scaled_test_data"],
+                outputs=[
+                    "reshaped_train_data", "reshaped_test_data",
+                    "reshaped_train_labels", "reshaped_test_labels"
+                ],
+                run=cls.reshape,
+                checkpoint=False,
+                config_sections=["lstm_general_params", "lstm_training_params", "scaling_method", "precision"]
+            ),
+            Stage(
+                name="tuning",
+                inputs=[
+                    "reshaped_train_data", "reshaped_test_data",
+                    "reshaped_train_labels", "reshaped_test_labels"
+                ],
+                outputs=["tuner"],
+                run=cls.tune,
+                checkpoint=False
+            ),
+            Stage(
+                name="export",
+                inputs=["reshaped_train_data", "reshaped_test_data", "reshaped_test_labels"],
+                outputs=["export_benchmark"],
+                run=cls.export,
+                checkpoint=False
+            )
+        ]
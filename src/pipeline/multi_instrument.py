@@ -0,0 +1,187 @@
+import os
+import copy
+import json
+import time
+import traceback
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from ..config.config_loading import ConfigLoader
+from ..helper.helper import Helper
+from ..info_tracking.info_tracking import InfoTracker
+from ..pipeline.stage_graph import StageGraph
+from ..pipeline.hft_stages import HftStages
+from ..model_development.BiDirectional_LSTM.window_generator import WindowGenerator
+
+
+def instrument_config(config: ConfigLoader, symbol: str, source: str) -> ConfigLoader:
+    """
+    Configuration of one instrument. It reads its own source and keeps its data, exploration plots
+    and models in its own directories, so the caches, stored artifacts and scalers of the instruments never mix.
+    """
+    config = copy.deepcopy(config)
+    config.data_link.link = source
+    config.paths.path2save_data = os.path.join(config.paths.path2save_data, symbol)
+    config.paths.path2save_exploration = os.path.join(config.paths.path2save_exploration, symbol)
+    config.paths.path2save_models = os.path.join(config.paths.path2save_models, symbol)
+    return config
+
+
+def processed_rows(artifacts: dict, window_length: int) -> int:
+    """
+    Rows of the data an instrument processed, from the earliest stage output that is available.
+    Stages loaded from the artifact store skip the stages before them, so the raw data is not always loaded.
+    """
+    for name in ("raw_data", "engineered_data", "labelled_data"):
+        if name in artifacts:
+            return len(artifacts[name])
+    for names in (("train_data", "test_data"), ("scaled_train_data", "scaled_test_data")):
+        if all(name in artifacts for name in names):
+            return sum(len(artifacts[name]) for name in names)
+
+    # Every split of n rows has n - window length windows.
+    rows = 0
+    for name in ("reshaped_train_data", "reshaped_test_data"):
+        if name in artifacts:
+            windows = artifacts[name]
+            rows += len(windows.features) if isinstance(windows, WindowGenerator) else len(windows) + window_length
+    return rows
+
+
+def run_instrument(config: ConfigLoader, symbol: str, source: str, targets: list) -> dict:
+    """
+    Run the target stages for one instrument and export its run report.
+    Failures are returned instead of raised, so one instrument never aborts the others.
+    """
+    start_time = time.perf_counter()
+    config = instrument_config(config=config, symbol=symbol, source=source)
+    info_tracker = InfoTracker()
+    graph = StageGraph(config=config, info_tracker=info_tracker, stages=HftStages.create())
+
+    try:
+        os.makedirs(config.paths.path2save_exploration, exist_ok=True)
+        graph.run(targets=targets)
+        status, error = "completed", None
+    except Exception as exc:
+        status, error = "failed", "".join(traceback.format_exception(type(exc), exc, exc.__traceback__))
+
+    # The report of a failed instrument shows the stages that completed before the failure.
+    info_tracker.export_run_report(path=os.path.join(config.paths.path2save_models, config.model.name))
+
+    return {
+        "symbol": symbol,
+        "source": source,
+        "status": status,
+        "error": error,
+        "rows": processed_rows(artifacts=graph.artifacts, window_length=config.lstm_general_params.window_length),
+        "wall_time_s": time.perf_counter() - start_time,
+        "peak_rss_bytes": Helper.peak_rss_bytes()
+    }
+
+
+class MultiInstrumentRunner:
+    """
+    Run the same pipeline for many instruments under one shared configuration.
+    Every instrument runs in a fresh process of its own, and as many run at once as fit in the cores and in the
+    available memory. A process handles one instrument only, so its memory is given back before the next one starts,
+    and a process that dies fails its own instrument only.
+    Failed instruments are reported next to the completed ones, together with the aggregate throughput.
+    """
+
+    def __init__(self, config: ConfigLoader, sources: dict = None, targets: list = None):
+        self.__config = config
+        self.__sources = sources or config.multi_instrument.sources
+        self.__targets = targets or config.multi_instrument.targets
+        self.__results: list = []
+        self.__summary: dict = {}
+
+        self.__run_instruments()
+        self.__save_report()
+
+    @property
+    def config(self):
+        return self.__config
+
+    @property
+    def results(self):
+        return self.__results
+
+    @property
+    def summary(self):
+        return self.__summary
+
+    @property
+    def failures(self):
+        return [result for result in self.__results if result["status"] != "completed"]
+
+    def __count_workers(self) -> int:
+        """ Workers that fit in the cores and in the available memory, if not set in the configurations. """
+        mparams = self.config.multi_instrument
+        if mparams.n_workers > 0:
+            return min(mparams.n_workers, len(self.__sources))
+
+        n_workers = os.cpu_count() or 1
+        available_memory = Helper.available_memory_bytes()
+        if available_memory is not None:
+            n_workers = min(n_workers, available_memory // (mparams.memory_per_worker_mb * 1024 ** 2))
+        return int(max(min(n_workers, len(self.__sources)), 1))
+
+    def __submit(self, symbol: str, source: str) -> tuple:
+        """
+        Start an instrument in a fresh single-process executor, which is shut down once the instrument completes.
+        The executor of every instrument has its own process, so no process is reused for a second instrument.
+        """
+        executor = ProcessPoolExecutor(max_workers=1, mp_context=mp.get_context("spawn"))
+        future = executor.submit(run_instrument, config=self.config, symbol=symbol, source=source,
+                                 targets=self.__targets)
+        return future, (symbol, source, executor)
+
+    def __run_instruments(self) -> None:
+        """ Run the instruments, at most as many at once as there are workers, and collect the results. """
+        n_workers = self.__count_workers()
+        print(f"Running {len(self.__sources)} instruments with {n_workers} workers")
+
+        start_time = time.perf_counter()
+        pending = list(self.__sources.items())
+        running = {}
+        while pending or running:
+            while pending and len(running) < n_workers:
+                future, instrument = self.__submit(*pending.pop(0))
+                running[future] = instrument
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                symbol, source, executor = running.pop(future)
+                try:
+                    result = future.result()
+                except Exception as exc:
+                    # The worker itself died, e.g. it was killed for running out of memory.
+                    result = {"symbol": symbol, "source": source, "status": "failed", "error": repr(exc),
+                              "rows": 0, "wall_time_s": None, "peak_rss_bytes": None}
+                executor.shutdown(wait=True)
+
+                self.__results.append(result)
+                print(f"{symbol}: {result['status']} ({len(self.__results)}/{len(self.__sources)})")
+
+        elapsed = time.perf_counter() - start_time
+        completed = [result for result in self.__results if result["status"] == "completed"]
+        total_rows = sum(result["rows"] for result in completed)
+
+        self.__summary = {
+            "instruments": len(self.__results),
+            "completed": len(completed),
+            "failed": len(self.__results) - len(completed),
+            "workers": n_workers,
+            "elapsed_s": elapsed,
+            "rows": total_rows,
+            "rows_per_s": total_rows / elapsed if elapsed > 0 else 0.0,
+            "instruments_per_hour": len(completed) / elapsed * 3600 if elapsed > 0 else 0.0
+        }
+        print(f"{self.__summary['completed']} instruments completed and {self.__summary['failed']} failed "
+              f"in {elapsed:.1f} s, {self.__summary['rows_per_s']:.0f} rows per second")
+
+    def __save_report(self) -> None:
+        """ Save the summary and the result of every instrument. """
+        os.makedirs(self.config.paths.path2save_models, exist_ok=True)
+        path = os.path.join(self.config.paths.path2save_models, "multi_instrument_report.json")
+        with open(path, "w") as file:
+            json.dump({"summary": self.__summary, "instruments": self.__results}, file, indent=2)
@@ -0,0 +1,209 @@
+import typing as t
+from dataclasses import dataclass, field
+from ..config.config_loading import ConfigLoader
+from ..info_tracking.info_tracking import InfoTracker
+from ..pipeline.artifact_store import ArtifactStore
+
+
+@dataclass
+class Stage:
+    """
+    A pipeline stage that declares the artifacts it reads and the artifacts it produces.
+    The run function receives the config, the info tracker and the input artifacts as keyword arguments,
+    and returns a dictionary with the output artifacts.
+    The config sections are the ConfigLoader attributes the stage reads, or "section.field" for one field of a
+    section. Stages without inputs give a fingerprint of their source instead, e.g. of the data file they load.
+    A fingerprint of None means the source cannot be validated, so the stage and the stages after it are not stored.
+    The arrays of memory-mapped stages are loaded read-only from the store, instead of into the memory.
+    Stages that also write files, e.g. a fitted model, return what the files hold among their outputs and give
+    a restore function, which writes the files again from the outputs when the stage is loaded from the store.
+    """
+    name: str
+    inputs: t.List[str]
+    outputs: t.List[str]
+    run: t.Callable[..., dict]
+    checkpoint: bool = True
+    config_sections: t.List[str] = field(default_factory=list)
+    fingerprint: t.Callable[[ConfigLoader], str] = None
+    memory_map: bool = False
+    restore: t.Callable[[ConfigLoader, dict], None] = None
+
+
+class StageGraph:
+    """
+    Lazy graph of pipeline stages.
+    A stage runs only when one of its outputs is requested, after the stages that produce its inputs.
+    The outputs of the checkpointed stages are kept in the artifact store, under a key of their inputs and
+    the config sections they read. If reuse is enabled, a stage whose key is already stored is loaded instead of run,
+    and the stages before it are not run at all, so a rerun only recomputes the stages whose inputs or
+    configurations changed.
+    A run can also resume from a named stage, loading every stage before it from the store - the entry of
+    the current configurations or else the latest one - and rerun a named stage and every stage after it,
+    whatever is stored for them.
+    """
+
+    def __init__(self,
+                 config: ConfigLoader,
+                 info_tracker: InfoTracker,
+                 stages: t.List[Stage],
+                 resume_from: str = None,
+                 rerun_from: str = None):
+        self.__config = config
+        self.__info_tracker = info_tracker
+        self.__stages = {stage.name: stage for stage in stages}
+        self.__producers = {output: stage.name for stage in stages for output in stage.outputs}
+        self.__artifacts: dict = {}
+        self.__completed_stages: list = []
+        self.__loaded_stages: list = []
+        self.__stage_keys: dict = {}
+        self.__store = ArtifactStore(config=config)
+
+        for name in (resume_from, rerun_from):
+            if name is not None and name not in self.__stages:
+                raise ValueError(f"An invalid stage to resume or rerun from is given: {name}")
+        self.__resumed_stages = self.upstream_stages(resume_from) if resume_from is not None else set()
+        self.__rerun_stages = {rerun_from} | self.downstream_stages(rerun_from) if rerun_from is not None else set()
+
+    @property
+    def config(self):
+        return self.__config
+
+    @property
+    def info_tracker(self):
+        return self.__info_tracker
+
+    @property
+    def stage_names(self):
+        return list(self.__stages)
+
+    @property
+    def artifacts(self):
+        return self.__artifacts
+
+    @property
+    def completed_stages(self):
+        return self.__completed_stages
+
+    @property
+    def loaded_stages(self):
+        """ The completed stages that were loaded from the artifact store. """
+        return self.__loaded_stages
+
+    def upstream_stages(self, name: str) -> set:
+        """ All the stages that the given stage depends on, directly or indirectly. """
+        upstream = set()
+        for artifact in self.__stages[name].inputs:
+            producer = self.__producers[artifact]
+            upstream.add(producer)
+            upstream.update(self.upstream_stages(producer))
+        return upstream
+
+    def downstream_stages(self, name: str) -> set:
+        """ All the stages that depend on the given stage, directly or indirectly. """
+        return {other for other in self.__stages if name in self.upstream_stages(other)}
+
+    def stage_key(self, name: str) -> t.Optional[str]:
+        """
+        The artifact store key of a stage, from the keys of the stages that produce its inputs.
+        Keys depend on the configurations and the source fingerprints only, so they are known before anything runs.
+        A stage has no key if its source cannot be validated or if one of its inputs has no key.
+        The fingerprint of every source is taken once per graph.
+        """
+        if name not in self.__stage_keys:
+            stage = self.__stages[name]
+            input_keys = {artifact: self.stage_key(self.__producers[artifact]) for artifact in stage.inputs}
+            fingerprint = stage.fingerprint(self.config) if stage.fingerprint is not None else None
+
+            if stage.fingerprint is not None and fingerprint is None:
+                print(f"The source of stage {name} cannot be validated, so it and the stages after it are not stored.")
+                self.__stage_keys[name] = None
+            elif None in input_keys.values():
+                self.__stage_keys[name] = None
+            else:
+                self.__stage_keys[name] = ArtifactStore.create_key(
+                    stage=name,
+                    input_keys=input_keys,
+                    config_sections=ArtifactStore.read_sections(self.config, stage.config_sections),
+                    fingerprint=fingerprint
+                )
+        return self.__stage_keys[name]
+
+    def stage_keys(self) -> dict:
+        """ The keys of the checkpointed stages under the current configurations, if they have one. """
+        keys = {name: self.stage_key(name) for name, stage in self.__stages.items() if stage.checkpoint}
+        return {name: key for name, key in keys.items() if key is not None}
+
+    def resolve(self, artifact: str):
+        """ Return an artifact, running the stage that produces it if it is not available yet. """
+        if artifact not in self.__artifacts:
+            if artifact not in self.__producers:
+                raise ValueError(f"No stage produces the artifact: {artifact}")
+            self.run_stage(name=self.__producers[artifact])
+        return self.__artifacts[artifact]
+
+    def __key_to_load(self, name: str) -> t.Optional[str]:
+        """
+        The key of the stored entry to load for a stage instead of running it, if any.
+        Stages to rerun are never loaded. Stages before the stage to resume from fall back to their latest entry.
+        """
+        if not self.__stages[name].checkpoint or name in self.__rerun_stages:
+            return None
+
+        resumed = name in self.__resumed_stages
+        key = self.stage_key(name)
+        if (self.config.artifact_store.reuse or resumed) and key is not None and self.__store.has_entry(key):
+            return key
+        if resumed:
+            return self.__store.latest_key(stage=name)
+        return None
+
+    def run_stage(self, name: str) -> None:
+        """ Run a stage, or load its outputs from the artifact store, and store its outputs. """
+        if name in self.__completed_stages:
+            return
+        stage = self.__stages[name]
+        key = self.__key_to_load(name=name)
+
+        if key is not None:
+            print(f"Loading the stored outputs of stage: {name}")
+            outputs = self.__store.load(key=key, memory_map=stage.memory_map)
+            if stage.restore is not None:
+                stage.restore(self.config, outputs)
+            self.__loaded_stages.append(name)
+        else:
+            inputs = {artifact: self.resolve(artifact) for artifact in stage.inputs}
+            print(f"Running stage: {name}")
+            outputs = stage.run(config=self.config, info_tracker=self.info_tracker, **inputs)
+
+            if set(outputs) != set(stage.outputs):
+                raise ValueError(f"Stage {name} did not return the outputs it declares.")
+
+            if stage.checkpoint and self.stage_key(name) is not None:
+                self.__store.store(
+                    key=self.stage_key(name),
+                    stage=name,
+                    outputs=outputs,
+                    input_keys={artifact: self.stage_key(self.__producers[artifact]) for artifact in stage.inputs},
+                    config_sections=ArtifactStore.read_sections(self.config, stage.config_sections)
+                )
+
+        self.__artifacts.update(outputs)
+        self.__completed_stages.append(name)
+
+    def run(self, targets: t.List[str], skip: t.List[str] = ()) -> None:
+        """
+        Run the target stages and whatever they depend on.
+        Skipped stages are left out of the targets. A skipped stage that another target needs cannot be left out.
+        """
+        for name in list(targets) + list(skip):
+            if name not in self.__stages:
+                raise ValueError(f"An invalid stage is given: {name}")
+
+        targets = [name for name in targets if name not in skip]
+        for name in targets:
+            needed_skipped = self.upstream_stages(name).intersection(skip)
+            if needed_skipped:
+                raise ValueError(f"Stage {name} needs the skipped stages: {sorted(needed_skipped)}")
+
+        for name in targets:
+            self.run_stage(name=name)